@@ -1,91 +1,140 @@
 # app/middleware.py
 from __future__ import annotations
 import json
-from typing import Optional
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.audit import write_audit_event
 from app.db import async_session_maker
+from app.config import AUDIT_MAX_BODY_BYTES
 
 SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 ACTOR_TYPE_DEFAULT = "user"  # or "system" for machine calls
 
-async def _read_json_safely(request: Request) -> Optional[dict]:
+def _parse_json_safely(raw_body: bytes) -> Optional[dict]:
     try:
-        body = await request.body()
-        if not body:
-            return None
-        return json.loads(body.decode("utf-8"))
+        return json.loads(raw_body.decode("utf-8")) if raw_body else None
     except Exception:
         return None
 
-def _reinject_body(request: Request, body: bytes):
-    async def receive():
-        return {"type": "http.request", "body": body, "more_body": False}
-    request._receive = receive  # type: ignore[attr-defined]
+async def _read_body(receive: Receive, limit: int) -> Tuple[bytes, bool, List[Message]]:
+    """
+    Read the request body until it ends or exceeds ``limit`` bytes. Returns the
+    bytes read, whether that is the whole body, and the messages to replay to
+    the app in place of the ones consumed.
+    """
+    chunks: List[bytes] = []
+    size = 0
+    complete = False
+    trailing: List[Message] = []
+    while size <= limit:
+        message = await receive()
+        if message["type"] != "http.request":
+            trailing.append(message)  # client went away mid-body
+            break
+        body = message.get("body", b"")
+        chunks.append(body)
+        size += len(body)
+        if not message.get("more_body", False):
+            complete = True
+            break
+    raw_body = b"".join(chunks)
+    replay: List[Message] = [{"type": "http.request", "body": raw_body, "more_body": not complete}]
+    return raw_body, complete, replay + trailing
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Read the body once; then put it back so downstream can read it
-        raw_body = await request.body()
-        _reinject_body(request, raw_body)
+def _audit_payload(raw_body: bytes, truncated: bool) -> Optional[dict]:
+    if truncated:
+        # Only a prefix was read; record that instead of a payload that never parses.
+        return {"truncated": True, "bytes_read": len(raw_body)}
+    return _parse_json_safely(raw_body)
 
-        # Process request
-        response: Response
+def _derive_action(method: str, route_path: str) -> str:
+    # e.g. POST /v1/tenants -> tenants.create
+    seg = [s for s in route_path.split("/") if s]
+    resource = seg[1] if len(seg) > 1 else seg[0] if seg else ""
+    return {
+        "POST":   f"{resource}.create",
+        "PUT":    f"{resource}.replace",
+        "PATCH":  f"{resource}.update",
+        "DELETE": f"{resource}.delete",
+    }.get(method, f"{resource}.{method.lower()}")
+
+class AuditMiddleware:
+    """
+    Pure ASGI audit layer: ``send`` is wrapped to read the response status.
+    For mutating methods the request body is read up front, up to
+    ``max_body_bytes``, and replayed to the app through ``receive``, so the
+    audited payload is complete even when the handler never reads it (requests
+    rejected by auth or validation). Larger bodies are streamed on to the app
+    and audited as truncated. Responses are never buffered; safe methods only
+    pay for the status hook.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int = AUDIT_MAX_BODY_BYTES) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, self._observe_status(send, {}))
+            return
+
+        raw_body, complete, replay = await _read_body(receive, self.max_body_bytes)
+
+        async def receive_replay() -> Message:
+            if replay:
+                return replay.pop(0)
+            return await receive()
+
+        observed = {"status_code": 500}  # If handler crashes before responding, still log a 500
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception:
-            # If handler crashes, still log a 500
-            status_code = 500
-            raise
+            await self.app(scope, receive_replay, self._observe_status(send, observed))
         finally:
-            # Only audit mutating methods
-            if request.method not in SAFE_METHODS:
-                try:
-                    payload = json.loads(raw_body.decode("utf-8")) if raw_body else None
-                except Exception:
-                    payload = None
-
-                # Pull common context (customize to your headers)
-                tenant_id        = request.headers.get("X-Tenant-Id")
-                actor_id         = request.headers.get("X-Actor-Id")
-                actor_type       = request.headers.get("X-Actor-Type", ACTOR_TYPE_DEFAULT)
-                correlation_id   = request.headers.get("X-Correlation-Id")
-                idempotency_key  = request.headers.get("Idempotency-Key")
-                user_agent       = request.headers.get("User-Agent")
-                source_ip        = request.client.host if request.client else None
-
-                # Derive action (e.g., POST /v1/tenants -> tenants.create)
-                route_path = request.url.path
-                seg = [s for s in route_path.split("/") if s]
-                resource = seg[1] if len(seg) > 1 else seg[0] if seg else ""
-                action = {
-                    "POST":   f"{resource}.create",
-                    "PUT":    f"{resource}.replace",
-                    "PATCH":  f"{resource}.update",
-                    "DELETE": f"{resource}.delete",
-                }.get(request.method, f"{resource}.{request.method.lower()}")
-
-                # Write audit row (synchronously for durability)
-                async with async_session_maker() as session:  # type: AsyncSession
-                    await write_audit_event(
-                        session=session,
-                        route=route_path,
-                        method=request.method,
-                        status_code=status_code,
-                        action=action,
-                        tenant_id=tenant_id,
-                        actor_id=actor_id,
-                        actor_type=actor_type,
-                        source_ip=source_ip,
-                        user_agent=user_agent,
-                        correlation_id=correlation_id,
-                        idempotency_key=idempotency_key,
-                        payload=payload,
-                    )
-            # else: skip auditing GET/HEAD/OPTIONS
-
-        return response
\ No newline at end of file
+            await self._write(scope, observed["status_code"], raw_body, truncated=not complete)
+
+    @staticmethod
+    def _observe_status(send: Send, observed: dict) -> Send:
+        async def send_observed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                observed["status_code"] = message["status"]
+            await send(message)
+
+        return send_observed
+
+    async def _write(self, scope: Scope, status_code: int, raw_body: bytes, truncated: bool = False) -> None:
+        # Pull common context (customize to your headers)
+        headers          = Headers(scope=scope)
+        tenant_id        = headers.get("X-Tenant-Id")
+        actor_id         = headers.get("X-Actor-Id")
+        actor_type       = headers.get("X-Actor-Type", ACTOR_TYPE_DEFAULT)
+        correlation_id   = headers.get("X-Correlation-Id")
+        idempotency_key  = headers.get("Idempotency-Key")
+        user_agent       = headers.get("User-Agent")
+        client           = scope.get("client")
+        source_ip        = client[0] if client else None
+
+        route_path = scope["path"]
+        method = scope["method"]
+
+        # Write audit row (synchronously for durability)
+        async with async_session_maker() as session:  # type: AsyncSession
+            await write_audit_event(
+                session=session,
+                route=route_path,
+                method=method,
+                status_code=status_code,
+                action=_derive_action(method, route_path),
+                tenant_id=tenant_id,
+                actor_id=actor_id,
+                actor_type=actor_type,
+                source_ip=source_ip,
+                user_agent=user_agent,
+                correlation_id=correlation_id,
+                idempotency_key=idempotency_key,
+                payload=_audit_payload(raw_body, truncated),
+            )
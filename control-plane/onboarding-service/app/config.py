@@ -2,4 +2,7 @@
 import os
 
 SERVICE_NAME = os.getenv("SERVICE_NAME", "onboarding-service")
-ENVIRONMENT  = os.getenv("ENVIRONMENT",  "dev")
\ No newline at end of file
+ENVIRONMENT  = os.getenv("ENVIRONMENT",  "dev")
+
+# Request bodies larger than this are audited as truncated instead of stored.
+AUDIT_MAX_BODY_BYTES = int(os.getenv("AUDIT_MAX_BODY_BYTES", str(1024 * 1024)))
@@ -2,7 +2,7 @@ import json
 import logging
 import os
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from hashlib import sha256
 from typing import Deque, Dict, Optional
 from uuid import uuid4
@@ -22,6 +22,9 @@ logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger("audit-worker")
 
 BATCH_SIZE = int(os.getenv("AUDIT_MANIFEST_BATCH", "3"))
+# Events replayed from a producer's spill log can arrive twice; remember this
+# many recent event_ids and skip repeats.
+DEDUP_WINDOW = int(os.getenv("AUDIT_DEDUP_WINDOW", "100000"))
 
 
 def _resolve_signer() -> LocalHmacSigner:
@@ -79,7 +82,11 @@ def main() -> None:
     s3_client = _s3_client(bucket)
 
     buffer: Deque[Dict] = deque()
+    # (event_id, attempt): a client retry reuses X-Event-Id with a higher
+    # x-attempt and is a separate record; a spill replay repeats both.
+    seen_events: "OrderedDict[tuple, None]" = OrderedDict()
     total_events = 0
+    duplicate_events = 0
     manifest_batches = 0
 
     def flush_buffer(force: bool = False):
@@ -121,7 +128,23 @@ def main() -> None:
     for record in consumer:
         payload_dict = record.value
         raw_bytes = json.dumps(payload_dict).encode("utf-8")
-        event_id = payload_dict.get("event_id") or str(uuid4())
+        event_id = payload_dict.get("event_id")
+        if event_id:
+            dedup_key = (event_id, payload_dict.get("attempt", 1))
+            if dedup_key in seen_events:
+                duplicate_events += 1
+                logger.info(
+                    "Skipping duplicate audit event %s attempt %s (duplicates=%s)",
+                    event_id,
+                    dedup_key[1],
+                    duplicate_events,
+                )
+                continue
+            seen_events[dedup_key] = None
+            if len(seen_events) > DEDUP_WINDOW:
+                seen_events.popitem(last=False)
+        else:
+            event_id = str(uuid4())
         buffer.append(
             {
                 "key": f"{event_id}-{record.offset}",
@@ -0,0 +1,134 @@
+"""
+Requests-per-second benchmark for the audit middleware on /translate and /healthz.
+
+Serves the translator's real /translate route plus a trivial /healthz endpoint
+in-process (httpx ASGITransport, no sockets) behind either the previous
+BaseHTTPMiddleware-based audit layer or the pure ASGI ``AuditMiddleware``, both
+emitting into a NoopEmitter so only the middleware overhead differs.
+
+    python scripts/benchmark_audit_middleware.py --requests 2000 --concurrency 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "src", SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import httpx  # noqa: E402
+import ulid  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from audit_emitter import NoopEmitter  # noqa: E402
+from audit_event import AuditEvent  # noqa: E402
+from audit_middleware import AuditMiddleware  # noqa: E402
+from audit_utils import set_audit_context  # noqa: E402
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.translator_api import routes  # noqa: E402
+
+
+class LegacyAuditMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation ``AuditMiddleware`` replaced."""
+
+    def __init__(self, app, emitter) -> None:
+        super().__init__(app)
+        self._emitter = emitter
+
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        tenant_id = request.headers.get("x-tenant-id", "")
+        tenant_uuid = request.headers.get("x-tenant-uuid", "")
+        x_request_id = request.headers.get("x-request-id", str(uuid4()))
+        event_id = request.headers.get("x-event-id") or ulid.new().str
+        set_audit_context(
+            {"tenant_id": tenant_id, "tenant_uuid": tenant_uuid, "x_request_id": x_request_id, "event_id": event_id, "attempt": 1}
+        )
+        status_code: Optional[int] = None
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            self._emitter.emit(
+                AuditEvent(
+                    ts=datetime.now(timezone.utc).isoformat(),
+                    tenant_id=tenant_id,
+                    tenant_uuid=tenant_uuid,
+                    event_id=event_id,
+                    x_request_id=x_request_id,
+                    route=request.url.path,
+                    result="accepted" if (status_code or 0) < 400 else "rejected",
+                    timing_ms={"total": int((time.perf_counter() - start) * 1000)},
+                    metadata={"method": request.method, "status_code": status_code},
+                ).ensure_event_id()
+            )
+
+
+def _build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.router.routes.extend(route for route in routes.app.router.routes if getattr(route, "path", "") == "/translate")
+
+    @app.get("/healthz")
+    def healthz():
+        return {"status": "ok"}
+
+    app.add_middleware(middleware, emitter=NoopEmitter())
+    return app
+
+
+async def _rps(app: FastAPI, method: str, path: str, payload: Optional[dict], total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"x-tenant-id": "TEN123", "x-request-id": "bench"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.request(method, path, json=payload, headers=headers)  # warm caches
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.request(method, path, json=payload, headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample", default=next(iter(CATEGORY1_SAMPLES)))
+    args = parser.parse_args()
+
+    sample = CATEGORY1_SAMPLES[args.sample]
+    translate = {"mt_raw": sample["mt_raw"], "force_type": sample.get("force_type"), "prevalidate": False}
+    endpoints = [("/healthz", "GET", None), ("/translate", "POST", translate)]
+    variants = [("BaseHTTPMiddleware", LegacyAuditMiddleware), ("pure ASGI", AuditMiddleware)]
+
+    print(f"{'endpoint':<12}{'middleware':<20}{'req/s':>10}")
+    for path, method, payload in endpoints:
+        results = []
+        for label, middleware in variants:
+            rps = asyncio.run(_rps(_build_app(middleware), method, path, payload, args.requests, args.concurrency))
+            results.append(rps)
+            print(f"{path:<12}{label:<20}{rps:>10.0f}")
+        print(f"{path:<12}{'speedup':<20}{results[1] / results[0]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Batch prevalidation benchmark: one ``validate`` call per message versus
+``validate_many``, which groups a chunk by MT type and evaluates each field
+check column-wise with one rule/format evaluation per distinct value.
+
+The batch is built from the category-1 samples with unique references, the
+way an upstream file repeats types, currencies and codes. Both paths must
+return the same results.
+
+    python scripts/benchmark_batch_prevalidation.py --messages 5000 --chunk-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.prevalidator_core import PrevalidationEngine  # noqa: E402
+
+
+def _batch(messages: int) -> List[Tuple[str, Optional[str]]]:
+    samples = [(sample["mt_raw"], sample.get("force_type")) for sample in CATEGORY1_SAMPLES.values()]
+    items = []
+    for number, (raw, force_type) in enumerate(islice(cycle(samples), messages)):
+        items.append((raw.replace(":20:", f":20:B{number:07d}", 1) if ":20:" in raw else raw, force_type))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--formats", action="store_true", help="also check field formats")
+    args = parser.parse_args()
+
+    engine = PrevalidationEngine(check_formats=args.formats)
+    items = _batch(args.messages)
+    chunks = [items[start : start + args.chunk_size] for start in range(0, len(items), args.chunk_size)]
+    single = [engine.validate(raw, force_type=force_type) for raw, force_type in items]
+    grouped = [result for chunk in chunks for result in engine.validate_many(chunk)]
+    assert [r.to_dict() for r in single] == [r.to_dict() for r in grouped]
+
+    started = time.perf_counter()
+    for raw, force_type in items:
+        engine.validate(raw, force_type=force_type)
+    per_message = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for chunk in chunks:
+        engine.validate_many(chunk)
+    batched = time.perf_counter() - started
+
+    print(f"{'path':<16}{'messages':>10}{'msg/s':>12}{'us/msg':>10}")
+    print(f"{'validate':<16}{len(items):>10}{len(items) / per_message:>12.0f}{per_message * 1e6 / len(items):>10.1f}")
+    print(f"{'validate_many':<16}{len(items):>10}{len(items) / batched:>12.0f}{batched * 1e6 / len(items):>10.1f}")
+    print(f"speedup {per_message / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
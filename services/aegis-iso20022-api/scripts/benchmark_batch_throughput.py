@@ -0,0 +1,68 @@
+"""
+Throughput benchmark for the batch engine over batch-mode-samples.
+
+Replicates the messages of every sample batch up to --messages and reports
+messages/sec for each worker count, for the process pool and for threads.
+
+    python scripts/benchmark_batch_throughput.py --messages 2000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from src.translator_api.batch import parse_batch_payload  # noqa: E402
+from src.translator_api.batch_engine import BatchEngine  # noqa: E402
+
+
+def _load_items(messages: int) -> list[tuple[int, int, str, str]]:
+    sources = []
+    for sample in sorted((SERVICE_ROOT / "batch-mode-samples").glob("*.dat")):
+        for batch in parse_batch_payload(sample.name, sample.read_bytes()):
+            sources.extend(message.mt_raw for message in batch.messages)
+    if not sources:
+        raise SystemExit("no batch samples found")
+    return [(0, index, mt_raw, "benchmark") for index, mt_raw in enumerate(islice(cycle(sources), messages), start=1)]
+
+
+def _throughput(engine: BatchEngine, items: list, workers: int) -> float:
+    engine.warm()
+    started = time.perf_counter()
+    count = sum(1 for _ in engine.map(items, prevalidate=True, max_workers=workers))
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=16)
+    args = parser.parse_args()
+
+    items = _load_items(args.messages)
+    print(f"{len(items)} messages, {os.cpu_count()} CPU core(s)")
+    print(f"{'workers':>8}{'process msg/s':>16}{'thread msg/s':>16}")
+    for workers in sorted(set(args.workers)):
+        rates = []
+        for kind in ("process", "thread"):
+            engine = BatchEngine(max_workers=workers, chunk_size=args.chunk_size, executor=kind)
+            try:
+                rates.append(_throughput(engine, items, workers))
+            finally:
+                engine.shutdown()
+        print(f"{workers:>8}{rates[0]:>16.1f}{rates[1]:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Microbenchmark for MTParser over the category-1 samples and a synthetic MT940.
+
+Compares the previous rescanning parser (kept here as a reference) with the
+single-pass tokenizer, both for parsing alone and for parsing plus touching
+every field value.
+
+    python scripts/benchmark_mt_parser.py --iterations 2000 --statement-lines 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.translator_core.mt_parser import MTParser  # noqa: E402
+
+_LEGACY_BLOCK_RE = re.compile(r"\{(\d):([^}]*)\}", re.S)
+_LEGACY_TAG_RE = re.compile(r"(?m)^:(\d{2}[A-Z]?):")
+
+
+def legacy_parse(mt_type: str, raw: str) -> dict:
+    """The parser as it was before the single-pass tokenizer."""
+    blocks = dict(_LEGACY_BLOCK_RE.findall(raw))
+    b4 = blocks.get("4") or raw
+    fields, order = {}, []
+    for m in _LEGACY_TAG_RE.finditer(b4):
+        tag = m.group(1)
+        start = m.end()
+        nxt = _LEGACY_TAG_RE.search(b4, start)
+        val = b4[start:(nxt.start() if nxt else len(b4))].strip()
+        if val.endswith("-}"):
+            val = val[:-2].rstrip()
+        if "\n" in val:
+            last_line = val.splitlines()[-1].strip()
+            if last_line == "-":
+                val = "\n".join(val.splitlines()[:-1]).rstrip()
+        if val.endswith("-}"):
+            val = val[:-2].rstrip()
+        fields.setdefault(tag, []).append(val)
+        order.append(tag)
+    return {"mt_type": mt_type, "blocks": blocks, "fields": fields, "order": order}
+
+
+def synthetic_mt940(statement_lines: int) -> str:
+    lines = [
+        "{1:F01BANKDEFFXXXX0000000000}{2:I940BANKUS33XXXXN}{4:",
+        ":20:STMT20251030",
+        ":25:DE44500105175407324931",
+        ":28C:00001/001",
+        ":60F:C251029EUR1000000,00",
+    ]
+    for i in range(statement_lines):
+        lines.append(f":61:2510301030C{i % 9000 + 1},00NTRFREF{i:08d}//BANKREF{i:08d}")
+        lines.append(f":86:/EREF/E2E{i:08d}/REMI/Invoice {i}")
+    lines.append(":62F:C251030EUR2000000,00")
+    lines.append("-}")
+    return "\n".join(lines)
+
+
+def _touch_all(parsed: dict) -> None:
+    fields = parsed["fields"]
+    for tag in fields:
+        fields[tag]
+
+
+def _us_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def _report(label: str, raw: str, iterations: int) -> None:
+    parser = MTParser()
+    legacy = _us_per_call(lambda: _touch_all(legacy_parse("MT", raw)), iterations)
+    tokenize = _us_per_call(lambda: parser.parse("MT", raw), iterations)
+    full = _us_per_call(lambda: _touch_all(parser.parse("MT", raw)), iterations)
+    print(f"{label:<22}{legacy:>14.1f}{tokenize:>14.1f}{full:>14.1f}{legacy / full:>9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--statement-lines", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'message':<22}{'legacy us':>14}{'parse us':>14}{'parse+all us':>14}{'speedup':>10}")
+    for label, sample in CATEGORY1_SAMPLES.items():
+        _report(label, sample["mt_raw"], args.iterations)
+    big = synthetic_mt940(args.statement_lines)
+    _report(f"MT940 x{args.statement_lines}", big, max(1, args.iterations // 100))
+
+
+if __name__ == "__main__":
+    main()
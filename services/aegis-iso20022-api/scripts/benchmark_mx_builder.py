@@ -0,0 +1,138 @@
+"""
+Microbenchmark for MXBuilder on pacs.008 and camt.053 documents with many entries.
+
+Compares the previous builder, which re-walked every path from the root with
+``find("{*}tag")`` (kept here as a reference), with the indexed builder. Both
+emit the same document (checked before timing), so the difference is the cost
+of locating parents.
+
+    python scripts/benchmark_mx_builder.py --iterations 20 --entries 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from lxml import etree  # noqa: E402
+
+from src.translator_core.mx_builder import NS_BY_MSG, MXBuilder  # noqa: E402
+
+
+def legacy_build(mx_type: str, flat: dict) -> str:
+    """
+    The previous strategy: re-walk every path from the root with ``find``. It is
+    extended to honour ``Tag[n]`` and repeated values (which the old builder
+    collapsed) so both builders emit the same document.
+    """
+    root = etree.Element("Document", nsmap={None: NS_BY_MSG[mx_type]})
+    for xpath, values in flat.items():
+        parts = [p for p in xpath.split("/") if p and p != "Document"]
+        node = root
+        for part in parts:
+            if part.startswith("@"):
+                for v in values:
+                    node.set(part[1:], v)
+                break
+            tag, _, rest = part.partition("[")
+            occurrence = int(rest.rstrip("]")) if rest else 1
+            matches = node.findall(f"{{*}}{tag}")
+            while len(matches) < occurrence:
+                matches.append(etree.SubElement(node, tag))
+            node = matches[occurrence - 1]
+        else:
+            node.text = values[0]
+            for v in values[1:]:
+                sibling = node.makeelement(node.tag)
+                sibling.text = v
+                node.addnext(sibling)
+                node = sibling
+    return etree.tostring(root, pretty_print=True, encoding="UTF-8", xml_declaration=True).decode()
+
+
+def pacs008_flat(transactions: int) -> dict:
+    root = "/Document/FIToFICstmrCdtTrf"
+    flat = {
+        f"{root}/GrpHdr/MsgId": ["BENCH-PACS008"],
+        f"{root}/GrpHdr/CreDtTm": ["2025-10-30T10:00:00Z"],
+        f"{root}/GrpHdr/NbOfTxs": [str(transactions)],
+        f"{root}/GrpHdr/SttlmInf/SttlmMtd": ["INDA"],
+    }
+    for i in range(1, transactions + 1):
+        tx = f"{root}/CdtTrfTxInf[{i}]"
+        flat[f"{tx}/PmtId/InstrId"] = [f"INSTR{i:08d}"]
+        flat[f"{tx}/PmtId/EndToEndId"] = [f"E2E{i:08d}"]
+        flat[f"{tx}/IntrBkSttlmAmt"] = [f"{i}.00"]
+        flat[f"{tx}/IntrBkSttlmAmt/@Ccy"] = ["EUR"]
+        flat[f"{tx}/ChrgBr"] = ["SHAR"]
+        flat[f"{tx}/Dbtr/Nm"] = [f"DEBTOR {i}"]
+        flat[f"{tx}/Dbtr/PstlAdr/AdrLine"] = [f"{i} MARKET STREET", "NEW YORK"]
+        flat[f"{tx}/DbtrAgt/FinInstnId/BICFI"] = ["BANKUS33XXX"]
+        flat[f"{tx}/CdtrAgt/FinInstnId/BICFI"] = ["BANKDEFFXXX"]
+        flat[f"{tx}/Cdtr/Nm"] = [f"CREDITOR {i}"]
+        flat[f"{tx}/CdtrAcct/Id/IBAN"] = ["DE44500105175407324931"]
+        flat[f"{tx}/RmtInf/Ustrd"] = [f"INVOICE {i}"]
+    return flat
+
+
+def camt053_flat(entries: int) -> dict:
+    stmt = "/Document/BkToCstmrStmt/Stmt"
+    flat = {
+        "/Document/BkToCstmrStmt/GrpHdr/MsgId": ["BENCH-CAMT053"],
+        "/Document/BkToCstmrStmt/GrpHdr/CreDtTm": ["2025-10-30T10:00:00Z"],
+        f"{stmt}/Id": ["STMT20251030"],
+        f"{stmt}/Acct/Id/IBAN": ["DE44500105175407324931"],
+    }
+    for i in range(1, entries + 1):
+        ntry = f"{stmt}/Ntry[{i}]"
+        flat[f"{ntry}/Amt"] = [f"{i}.00"]
+        flat[f"{ntry}/Amt/@Ccy"] = ["EUR"]
+        flat[f"{ntry}/CdtDbtInd"] = ["CRDT"]
+        flat[f"{ntry}/Sts/Cd"] = ["BOOK"]
+        flat[f"{ntry}/BookgDt/Dt"] = ["2025-10-30"]
+        flat[f"{ntry}/ValDt/Dt"] = ["2025-10-30"]
+        flat[f"{ntry}/AcctSvcrRef"] = [f"BANKREF{i:08d}"]
+        flat[f"{ntry}/BkTxCd/Prtry/Cd"] = ["NTRF"]
+        flat[f"{ntry}/NtryDtls/TxDtls/Refs/EndToEndId"] = [f"E2E{i:08d}"]
+        flat[f"{ntry}/AddtlNtryInf"] = [f"/EREF/E2E{i:08d}/REMI/Invoice {i}"]
+    return flat
+
+
+def _ms_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+
+def _report(label: str, mx_type: str, flat: dict, iterations: int) -> None:
+    builder = MXBuilder()
+    assert legacy_build(mx_type, flat) == builder.build(mx_type, flat)
+    legacy = _ms_per_call(lambda: legacy_build(mx_type, flat), iterations)
+    indexed = _ms_per_call(lambda: builder.build(mx_type, flat), iterations)
+    print(f"{label:<26}{len(flat):>8}{legacy:>14.2f}{indexed:>14.2f}{legacy / indexed:>9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'document':<26}{'paths':>8}{'legacy ms':>14}{'indexed ms':>14}{'speedup':>10}")
+    for entries in (10, args.entries):
+        iterations = args.iterations * 10 if entries == 10 else args.iterations
+        _report(f"pacs.008 x{entries}", "pacs.008.001.13", pacs008_flat(entries), iterations)
+        _report(f"camt.053 x{entries}", "camt.053.001.08", camt053_flat(entries), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Per-message benchmark for field prevalidation across every pre-validateMT type.
+
+Compares the previous interpreter (two passes over the raw fieldvalidations.yaml
+dicts, optioned-tag scans and rule lookup by name per value) with the compiled
+PrevalidationPlan on the category-1 sample of each message type, on parsed
+fields so only rule evaluation is timed. Both must report the same errors.
+
+    python scripts/benchmark_prevalidation.py --iterations 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.prevalidator_core import PrevalidationEngine  # noqa: E402
+from src.prevalidator_core.loader import ALIASES, PREVALIDATE_DIR  # noqa: E402
+from src.prevalidator_core.models import ValidationError  # noqa: E402
+from src.prevalidator_core.plan import compile_definitions  # noqa: E402
+from src.prevalidator_core.rules import apply_rule  # noqa: E402
+from src.translator_core.parsed_message import ParsedMessage  # noqa: E402
+
+
+def legacy_validate(definitions: List[dict], fields: Mapping[str, List[str]]) -> List[ValidationError]:
+    """The interpreter ``PrevalidationEngine.validate`` ran before plans were compiled."""
+    errors: List[ValidationError] = []
+
+    def get_field_values(tag: str) -> List[str]:
+        upper_tag = tag.upper()
+        if upper_tag in fields:
+            return fields[upper_tag]
+        if tag in fields:
+            return fields[tag]
+        if len(tag) > 2 and tag[-1].isalpha() and tag[-1].islower():
+            base = tag[:-1]
+            if base in fields:
+                return fields[base]
+            if base.upper() in fields:
+                return fields[base.upper()]
+            prefix = base.upper()
+            collected: List[str] = []
+            for key, vals in fields.items():
+                upper_key = key.upper()
+                if upper_key == prefix or (upper_key.startswith(prefix) and len(upper_key) == len(prefix) + 1 and upper_key[-1].isalpha()):
+                    collected.extend(vals)
+            if collected:
+                return collected
+        return []
+
+    for field_def in definitions:
+        tag, presence = field_def.get("tag"), field_def.get("presence")
+        if not tag or not presence:
+            continue
+        values = get_field_values(tag)
+        if presence == "mandatory" and (not values or all(v.strip() == "" for v in values)):
+            errors.append(ValidationError(field=tag, message="Field is mandatory but missing", code="PRESENCE"))
+    for field_def in definitions:
+        tag = field_def.get("tag")
+        validations = field_def.get("validations") or []
+        if not tag or not validations:
+            continue
+        for idx, value in enumerate(get_field_values(tag), start=1):
+            for validation in validations:
+                rule_name = validation.get("rule") if isinstance(validation, dict) else None
+                if not rule_name:
+                    continue
+                error_message = apply_rule(rule_name, value)
+                if error_message:
+                    errors.append(ValidationError(field=tag, message=error_message, code=validation.get("error_code"), occurrence=idx))
+    return errors
+
+
+def _samples() -> Dict[str, dict]:
+    """First category-1 sample per pre-validateMT folder."""
+    folders = {path.parent.name for path in PREVALIDATE_DIR.glob("*/fieldvalidations.yaml")}
+    samples: Dict[str, dict] = {}
+    for label, sample in CATEGORY1_SAMPLES.items():
+        mt_type = (sample.get("force_type") or label).upper()
+        folder = ALIASES.get(mt_type, mt_type)
+        if folder in folders and folder not in samples:
+            samples[folder] = {"mt_type": mt_type, **sample}
+    return samples
+
+
+def _per_message_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = PrevalidationEngine()
+    print(f"{'type':<14}{'checks':>8}{'legacy us':>12}{'plan us':>10}{'speedup':>10}")
+    total_legacy = total_plan = 0.0
+    samples = _samples()
+    for folder, sample in sorted(samples.items()):
+        mt_type = sample["mt_type"]
+        definitions = engine.loader.get_definitions(mt_type) or []
+        fields = ParsedMessage.from_raw(sample["mt_raw"], force_type=sample.get("force_type")).fields
+        plan = compile_definitions(definitions)
+        assert [e.to_dict() for e in legacy_validate(definitions, fields)] == [e.to_dict() for e in plan.validate(fields)]
+        legacy = _per_message_us(lambda: legacy_validate(definitions, fields), args.iterations)
+        compiled = _per_message_us(lambda: plan.validate(fields), args.iterations)
+        total_legacy += legacy
+        total_plan += compiled
+        print(f"{folder:<14}{len(plan.checks):>8}{legacy:>12.1f}{compiled:>10.1f}{legacy / compiled:>9.2f}x")
+    if samples:
+        print(f"{'mean':<14}{'':>8}{total_legacy / len(samples):>12.1f}{total_plan / len(samples):>10.1f}{total_legacy / total_plan:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-value benchmark for the compiled SWIFT charset and format validators.
+
+Compares the previous per-character X charset loop with the compiled charset
+regex, and times the compiled format check (length, charset and structure in
+one ``fullmatch``) over every formatted field of the category-1 samples. The
+charset results must match.
+
+    python scripts/benchmark_swift_formats.py --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.prevalidator_core import PrevalidationEngine  # noqa: E402
+from src.prevalidator_core.plan import compile_definitions  # noqa: E402
+from src.prevalidator_core.rules import RuleFunc, value_must_use_x_charset  # noqa: E402
+from src.translator_core.parsed_message import ParsedMessage  # noqa: E402
+
+LEGACY_X_CHARSET = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789/ -?:().,'+\r\n")
+
+
+def legacy_x_charset(value: str) -> Optional[str]:
+    """The rule ``value_must_use_x_charset`` ran before the charset was compiled."""
+    for ch in value:
+        if ch not in LEGACY_X_CHARSET:
+            return f"Character '{ch}' not allowed in X charset"
+    return None
+
+
+def _formatted_values() -> List[Tuple[RuleFunc, str]]:
+    """(compiled format, value) for every formatted field of the category-1 samples."""
+    engine = PrevalidationEngine(check_formats=True)
+    pairs: List[Tuple[RuleFunc, str]] = []
+    for sample in CATEGORY1_SAMPLES.values():
+        parsed = ParsedMessage.from_raw(sample["mt_raw"], force_type=sample.get("force_type"))
+        mt_type = (sample.get("force_type") or parsed.mt_type or "").upper()
+        plan = compile_definitions(engine.loader.get_definitions(mt_type) or [], check_formats=True)
+        for check in plan.checks:
+            if check.format is not None:
+                pairs.extend((check.format, value) for key in check.keys for value in parsed.fields.get(key, ()))
+            for key, validator in check.option_formats:
+                pairs.extend((validator, value) for value in parsed.fields.get(key, ()))
+    return pairs
+
+
+def _per_value_us(fn, values: list, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for value in values:
+            fn(value)
+    return (time.perf_counter() - started) * 1_000_000 / (iterations * len(values))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    pairs = _formatted_values()
+    texts = [value for _validator, value in pairs] + ["PLEASE CONFIRM RECEIPT OF THE PAYMENT\n" * 35]
+    for text in texts:
+        assert legacy_x_charset(text) == value_must_use_x_charset(text)
+    legacy = _per_value_us(legacy_x_charset, texts, args.iterations)
+    compiled = _per_value_us(value_must_use_x_charset, texts, args.iterations)
+    print(f"{'check':<22}{'values':>8}{'legacy us':>12}{'compiled us':>13}{'speedup':>10}")
+    print(f"{'X charset':<22}{len(texts):>8}{legacy:>12.2f}{compiled:>13.2f}{legacy / compiled:>9.2f}x")
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        for validator, value in pairs:
+            validator(value)
+    per_value = (time.perf_counter() - started) * 1_000_000 / (args.iterations * len(pairs))
+    print(f"{'format (one match)':<22}{len(pairs):>8}{'':>12}{per_value:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-message benchmark for the flat transformer over the category-1 samples.
+
+Compares re-reading the mapping template on every message (compile + execute,
+which is what the interpreter did before plans were cached) with executing the
+cached MappingPlan only.
+
+    python scripts/benchmark_transformer.py --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = CURRENT_DIR.parent
+
+for path in (SERVICE_ROOT, SERVICE_ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.translator_core.detector import Detector  # noqa: E402
+from src.translator_core.mapping_store import MappingStore  # noqa: E402
+from src.translator_core.mt_parser import MTParser  # noqa: E402
+from src.translator_core.transformer import compile_mapping, get_mapping_plan  # noqa: E402
+
+
+def _load_cases() -> list[tuple[str, dict, dict, str]]:
+    store = MappingStore()
+    parser = MTParser()
+    detector = Detector()
+    cases = []
+    for label, sample in CATEGORY1_SAMPLES.items():
+        mt_type = (sample.get("force_type") or detector.detect(sample["mt_raw"]) or "").replace("-", "")
+        try:
+            mapping, mx_type, _xsd_dir = store.load_profile(mt_type, variant=sample.get("variant"))
+        except FileNotFoundError:
+            continue
+        if not mapping or not mx_type:
+            continue
+        fields = parser.parse(mt_type, sample["mt_raw"])["fields"]
+        mx_root = mapping.get("meta", {}).get("mx_root") or mapping.get("mx_root") or "FIToFICstmrCdtTrf"
+        cases.append((label, fields, mapping, mx_root))
+    return cases
+
+
+def _per_message_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    cases = _load_cases()
+    print(f"{'sample':<18}{'interpreted us':>16}{'plan us':>12}{'speedup':>10}")
+    total_interp = total_plan = 0.0
+    for label, fields, mapping, mx_root in cases:
+        interp = _per_message_us(lambda: compile_mapping(mapping, mx_root).execute(fields), args.iterations)
+        plan = get_mapping_plan(mapping, mx_root)
+        cached = _per_message_us(lambda: plan.execute(fields), args.iterations)
+        total_interp += interp
+        total_plan += cached
+        print(f"{label:<18}{interp:>16.1f}{cached:>12.1f}{interp / cached:>9.2f}x")
+    if cases:
+        print(f"{'mean':<18}{total_interp / len(cases):>16.1f}{total_plan / len(cases):>12.1f}{total_interp / total_plan:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
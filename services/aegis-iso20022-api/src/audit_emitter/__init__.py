@@ -5,6 +5,9 @@ ensure_vendor_modules()
 from .base import AuditEmitter
 from .logging import LoggingEmitter
 from .noop import NoopEmitter
+from .lazy import LazyConnectEmitter
+from .queued import QueuedAuditEmitter, queued_emitter_from_env
+from .spill_log import SpillLog, spill_log_from_env
 
 try:
     from .kafka import KafkaAuditEmitter  # type: ignore
@@ -16,4 +19,9 @@ __all__ = [
     "LoggingEmitter",
     "NoopEmitter",
     "KafkaAuditEmitter",
+    "LazyConnectEmitter",
+    "QueuedAuditEmitter",
+    "queued_emitter_from_env",
+    "SpillLog",
+    "spill_log_from_env",
 ]
@@ -2,25 +2,46 @@
 from __future__ import annotations
 
 import json
-from typing import Optional
+import logging
+import threading
+from typing import List, Optional, Tuple
 
 from audit_event import AuditEvent
 from .base import AuditEmitter
+from .spill_log import SpillLog
 
 try:
     from kafka import KafkaProducer
+    from kafka.errors import KafkaError
 except ImportError:
     KafkaProducer = None  # type: ignore
+    KafkaError = RuntimeError  # type: ignore
+
+logger = logging.getLogger("audit")
 
 
 class KafkaAuditEmitter(AuditEmitter):
-    """Emit audit events to a Kafka topic."""
+    """
+    Emit audit events to a Kafka topic.
+
+    With a ``spill_log``, events the producer cannot take (buffer full past
+    ``max_block_ms``, broker down) or later fails to deliver are appended to the
+    local log instead of being lost. While the log holds undelivered events new
+    ones are appended behind them, and a background replayer drains it to Kafka
+    in order once sends succeed again. Every record keeps its ``event_id``
+    (payload and header), so a batch resent after a crash between delivery and
+    cursor commit is recognisable as a duplicate downstream.
+    """
 
     def __init__(
         self,
         bootstrap_servers: str,
         topic: str = "audit.events",
         client_id: str = "aegis-audit-producer",
+        spill_log: Optional[SpillLog] = None,
+        max_block_ms: int = 60000,
+        replay_interval: float = 5.0,
+        replay_batch_size: int = 500,
     ) -> None:
         if KafkaProducer is None:  # pragma: no cover - handled in CI env
             raise RuntimeError("kafka-python is required for KafkaAuditEmitter")
@@ -33,21 +54,93 @@ class KafkaAuditEmitter(AuditEmitter):
             acks="all",
             linger_ms=5,
             retries=3,
+            max_block_ms=max_block_ms,
         )
+        self._spill = spill_log
+        self._replay_interval = replay_interval
+        self._replay_batch_size = max(1, replay_batch_size)
+        self._stop = threading.Event()
+        self._replayer: Optional[threading.Thread] = None
+        if spill_log is not None:
+            self._replayer = threading.Thread(target=self._replay_forever, name="audit-spill-replayer", daemon=True)
+            self._replayer.start()
 
-    def emit(self, event: AuditEvent) -> None:
-        prepared = event.ensure_event_id()
-        payload = prepared.to_dict()
+    @staticmethod
+    def _record(payload: dict) -> Tuple[Optional[str], List[tuple]]:
         key = payload.get("tenant_id") or payload.get("tenant_uuid")
         headers = []
         event_id = payload.get("event_id")
         if event_id:
             headers.append(("event_id", event_id.encode("utf-8")))
         headers.append(("schema_version", payload.get("v", "1.0").encode("utf-8")))
-        self._producer.send(self._topic, value=payload, key=key, headers=headers)
+        return key, headers
+
+    def _send(self, payload: dict):
+        key, headers = self._record(payload)
+        return self._producer.send(self._topic, value=payload, key=key, headers=headers)
+
+    def emit(self, event: AuditEvent) -> None:
+        prepared = event.ensure_event_id()
+        payload = prepared.to_dict()
+        if self._spill is None:
+            self._send(payload)
+            return
+        if self._spill.pending():
+            # Keep order: nothing goes direct until the backlog is replayed.
+            self._spill.append(payload)
+            return
+        try:
+            future = self._send(payload)
+        except KafkaError as exc:
+            logger.warning("Kafka unavailable (%s); spilling audit event %s", exc, payload["event_id"])
+            self._spill.append(payload)
+            return
+        future.add_errback(self._spill_failed, payload)
+
+    def _spill_failed(self, exc: Exception, payload: dict) -> None:
+        logger.warning("Kafka delivery failed (%s); spilling audit event %s", exc, payload["event_id"])
+        self._spill.append(payload)  # type: ignore[union-attr]
+
+    def replay_spilled(self, timeout: float = 10.0) -> int:
+        """
+        Send one batch of spilled events and wait for their delivery before
+        committing the cursor; returns the number replayed. Raises (leaving the
+        cursor in place) when Kafka is still unavailable.
+        """
+        if self._spill is None:
+            return 0
+        records, position = self._spill.read(self._replay_batch_size)
+        if not records:
+            if self._spill.pending():
+                self._spill.commit(position)
+            return 0
+        futures = [self._send(payload) for payload in records]
+        self._producer.flush(timeout)
+        for future in futures:
+            future.get(timeout=timeout)
+        self._spill.commit(position, len(records))
+        return len(records)
+
+    def _replay_forever(self) -> None:
+        while not self._stop.wait(self._replay_interval):
+            try:
+                while self._spill.pending() and self.replay_spilled():  # type: ignore[union-attr]
+                    pass
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.info("Audit spill replay deferred: %s", exc)
+
+    def stats(self) -> dict:
+        return {"spill": self._spill.stats() if self._spill is not None else None}
 
     def flush(self) -> None:
         self._producer.flush()
+        if self._spill is not None:
+            self._spill.sync()
 
     def close(self) -> None:
+        self._stop.set()
+        if self._replayer is not None:
+            self._replayer.join(timeout=self._replay_interval + 1)
         self._producer.close()
+        if self._spill is not None:
+            self._spill.close()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from audit_event import AuditEvent
+from .base import AuditEmitter
+from .spill_log import SpillLog
+
+logger = logging.getLogger("audit")
+
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_FALLBACK = "fallback"
+STATE_CLOSED = "closed"
+
+
+class LazyConnectEmitter(AuditEmitter):
+    """
+    Emitter that starts immediately and connects its real target in the background.
+
+    ``connect`` (for example a ``KafkaAuditEmitter`` factory) is retried on a
+    daemon thread with exponential backoff from ``initial_delay`` up to
+    ``max_delay`` seconds. Until it succeeds events are buffered: in
+    ``spill_log`` when one is configured (the Kafka emitter replays it once
+    connected), otherwise in a bounded in-memory deque that is drained into the
+    target on connect. After ``fallback_after`` failed attempts events go to
+    ``fallback`` instead while retries continue at ``max_delay``, so a broker
+    that comes back later is still picked up. Without a fallback the emitter
+    keeps buffering and retrying.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], AuditEmitter],
+        fallback: Optional[AuditEmitter] = None,
+        fallback_after: int = 5,
+        initial_delay: float = 1.0,
+        max_delay: float = 60.0,
+        buffer_size: int = 10000,
+        spill_log: Optional[SpillLog] = None,
+    ) -> None:
+        self._connect = connect
+        self._fallback = fallback
+        self.fallback_after = max(1, fallback_after)
+        self.initial_delay = initial_delay
+        self.max_delay = max(initial_delay, max_delay)
+        self._spill = spill_log
+        self._buffer: Deque[AuditEvent] = deque(maxlen=max(1, buffer_size))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._target: Optional[AuditEmitter] = None
+        self.state = STATE_CONNECTING
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._connect_forever, name="audit-emitter-connect", daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self.state == STATE_CONNECTED
+
+    def emit(self, event: AuditEvent) -> None:
+        with self._lock:
+            target = self._target
+            if target is None:
+                if self._spill is not None:
+                    self._spill.append(event.ensure_event_id().to_dict())
+                    return
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped += 1
+                self._buffer.append(event)
+                return
+        target.emit(event)
+
+    def _delay(self) -> float:
+        return min(self.max_delay, self.initial_delay * 2 ** max(0, self.attempts - 1))
+
+    def _connect_forever(self) -> None:
+        while not self._stop.is_set():
+            self.attempts += 1
+            try:
+                emitter = self._connect()
+            except Exception as exc:  # pylint: disable=broad-except
+                self.last_error = str(exc)
+                delay = self._delay()
+                logger.warning("Audit emitter connect attempt %s failed: %s (retry in %.1fs)", self.attempts, exc, delay)
+                if self.attempts >= self.fallback_after and self._fallback is not None and self._target is None:
+                    logger.warning("Audit events go to %s until the connection succeeds", type(self._fallback).__name__)
+                    self._switch(self._fallback, STATE_FALLBACK)
+                self._stop.wait(delay)
+                continue
+            if self._stop.is_set():
+                _close(emitter)
+                return
+            logger.info("Audit emitter connected after %s attempt(s)", self.attempts)
+            self.last_error = None
+            self._switch(emitter, STATE_CONNECTED)
+            return
+
+    def _switch(self, target: AuditEmitter, state: str) -> None:
+        with self._lock:
+            pending = list(self._buffer)
+            self._buffer.clear()
+            self._target = target
+            self.state = state
+            # Drained under the lock so events emitted meanwhile cannot overtake the backlog.
+            for event in pending:
+                try:
+                    target.emit(event)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Audit emitter failed to deliver buffered event %s", event.event_id)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+        }
+
+    def stats(self) -> dict:
+        stats = {"connection": self.status()}
+        target_stats = getattr(self._target, "stats", None)
+        if callable(target_stats):
+            stats.update(target_stats())
+        return stats
+
+    def flush(self) -> None:
+        flush = getattr(self._target, "flush", None)
+        if callable(flush):
+            flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        with self._lock:
+            target, self._target = self._target, None
+            self.state = STATE_CLOSED
+        if target is not None:
+            _close(target)
+        if target is not self._fallback and self._fallback is not None:
+            _close(self._fallback)
+
+
+def _close(emitter: AuditEmitter) -> None:
+    close = getattr(emitter, "close", None)
+    if callable(close):
+        close()
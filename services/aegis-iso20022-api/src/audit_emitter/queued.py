@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from audit_event import AuditEvent
+from .base import AuditEmitter
+from .spill_log import SpillLog, spill_log_from_env
+
+logger = logging.getLogger("audit")
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK, OVERFLOW_SPILL)
+
+
+class QueuedAuditEmitter(AuditEmitter):
+    """
+    Non-blocking front for a slower emitter.
+
+    ``emit`` only appends to a bounded in-memory ring buffer; a background thread
+    drains it in batches into the wrapped emitter, so serialisation and
+    ``KafkaProducer.send`` no longer run on the request path. When the buffer is
+    full the ``overflow`` policy decides what happens:
+
+    - ``drop_oldest`` discards the oldest queued event (counted in ``dropped``);
+    - ``block`` waits up to ``block_timeout`` seconds for room, then drops the
+      new event;
+    - ``spill`` appends the event to ``spill_log``. While the log has a backlog
+      every new event is appended behind it, and the drain thread replays it
+      after the (older) buffered events, so delivery keeps emit order.
+    """
+
+    def __init__(
+        self,
+        delegate: AuditEmitter,
+        max_size: int = 10000,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+        batch_size: int = 256,
+        block_timeout: float = 0.05,
+        spill_log: Optional[SpillLog] = None,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit queue overflow policy '{overflow}'")
+        if overflow == OVERFLOW_SPILL and spill_log is None:
+            raise ValueError("spill_log is required for the spill overflow policy")
+        self.delegate = delegate
+        self.max_size = max(1, max_size)
+        self.overflow = overflow
+        self.batch_size = max(1, batch_size)
+        self.block_timeout = block_timeout
+        self.spill_log = spill_log
+        self._queue: Deque[AuditEvent] = deque()
+        self._cond = threading.Condition()
+        # True from the first spilled event until the log is replayed; a backlog
+        # left by a previous process counts too.
+        self._spilling = bool(spill_log is not None and spill_log.pending())
+        self._spill_writers = 0
+        self._closed = False
+        self._busy = False
+        self.enqueued = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._drain_forever, name="audit-emitter", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: AuditEvent) -> None:
+        with self._cond:
+            if not self._spilling and len(self._queue) >= self.max_size:
+                if self.overflow == OVERFLOW_DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.overflow == OVERFLOW_BLOCK:
+                    if not self._cond.wait_for(lambda: len(self._queue) < self.max_size, self.block_timeout):
+                        self.dropped += 1
+                        return
+                else:
+                    self._spilling = True
+            if not self._spilling:
+                self._queue.append(event)
+                self.enqueued += 1
+                self._cond.notify_all()
+                return
+            self._spill_writers += 1
+        self._spill(event)
+
+    def _spill(self, event: AuditEvent) -> None:
+        # Disk I/O happens outside ``_cond`` so it never holds up the drain thread.
+        try:
+            self.spill_log.append(event.to_dict())  # type: ignore[union-attr]
+            spilled = True
+        except OSError:
+            spilled = False
+            logger.exception("Audit queue could not spill event %s", event.event_id)
+        with self._cond:
+            self._spill_writers -= 1
+            if spilled:
+                self.spilled += 1
+            else:
+                self.dropped += 1
+            self._cond.notify_all()
+
+    def _replay_spilled(self) -> None:
+        """Deliver one batch from the spill log; stop spilling once it is fully replayed."""
+        spill_log = self.spill_log
+        records, position = spill_log.read(self.batch_size)  # type: ignore[union-attr]
+        if records:
+            self._deliver([AuditEvent.from_dict(record) for record in records])
+            spill_log.commit(position, len(records))  # type: ignore[union-attr]
+            return
+        if spill_log.pending():  # type: ignore[union-attr]
+            # Only the end of a rolled-over segment was left.
+            spill_log.commit(position)  # type: ignore[union-attr]
+        with self._cond:
+            if self._spill_writers:
+                self._cond.wait_for(lambda: not self._spill_writers, 0.05)
+            elif not spill_log.pending():  # type: ignore[union-attr]
+                self._spilling = False
+
+    def _drain_forever(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed or self._spilling, timeout=1.0)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                # Buffered events are older than anything in the spill log.
+                replay = not batch and self._spilling
+                if not batch and not replay:
+                    if self._closed:
+                        return
+                    continue
+                self._busy = True
+                self._cond.notify_all()
+            if batch:
+                self._deliver(batch)
+            else:
+                self._replay_spilled()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _deliver(self, batch: List[AuditEvent]) -> None:
+        emitted = failed = 0
+        for event in batch:
+            try:
+                self.delegate.emit(event)
+                emitted += 1
+            except Exception:  # pylint: disable=broad-except
+                failed += 1
+                logger.exception("Audit emitter failed to deliver event %s", event.event_id)
+        with self._cond:
+            self.emitted += emitted
+            self.failed += failed
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued event reached the wrapped emitter; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            drained = self._cond.wait_for(
+                lambda: not self._queue and not self._busy and not self._spilling,
+                max(0.0, deadline - time.monotonic()),
+            )
+        flush = getattr(self.delegate, "flush", None)
+        if callable(flush):
+            flush()
+        return drained
+
+    def close(self, timeout: float = 10.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self.spill_log is not None:
+            self.spill_log.close()
+        close = getattr(self.delegate, "close", None)
+        if callable(close):
+            close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = {
+                "delegate": type(self.delegate).__name__,
+                "overflow": self.overflow,
+                "capacity": self.max_size,
+                "depth": len(self._queue),
+                "enqueued": self.enqueued,
+                "emitted": self.emitted,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "failed": self.failed,
+            }
+        if self.spill_log is not None:
+            stats["spill_log"] = self.spill_log.stats()
+        return stats
+
+
+def queued_emitter_from_env(delegate: AuditEmitter) -> QueuedAuditEmitter:
+    """
+    Wrap ``delegate`` using ``AUDIT_QUEUE_SIZE`` (default 10000),
+    ``AUDIT_QUEUE_OVERFLOW`` (``drop_oldest``, ``block`` or ``spill``),
+    ``AUDIT_QUEUE_BATCH_SIZE`` (default 256) and ``AUDIT_QUEUE_BLOCK_TIMEOUT``
+    seconds (default 0.05). The ``spill`` policy keeps its log in the ``queue``
+    subdirectory of ``AUDIT_SPILL_DIR``, with the other ``AUDIT_SPILL_*`` settings.
+    """
+    overflow = os.getenv("AUDIT_QUEUE_OVERFLOW", OVERFLOW_DROP_OLDEST).lower()
+    spill_log = None
+    if overflow == OVERFLOW_SPILL:
+        spill_log = spill_log_from_env("queue")
+        if spill_log is None:
+            raise ValueError("AUDIT_QUEUE_OVERFLOW=spill requires AUDIT_SPILL_DIR")
+    return QueuedAuditEmitter(
+        delegate,
+        max_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+        overflow=overflow,
+        batch_size=int(os.getenv("AUDIT_QUEUE_BATCH_SIZE", "256")),
+        block_timeout=float(os.getenv("AUDIT_QUEUE_BLOCK_TIMEOUT", "0.05")),
+        spill_log=spill_log,
+    )
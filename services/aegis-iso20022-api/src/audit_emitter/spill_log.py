@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# (segment number, byte offset inside that segment)
+SpillPosition = Tuple[int, int]
+
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".jsonl"
+_CURSOR_FILE = "cursor.json"
+
+
+class SpillLog:
+    """
+    Local append-only log for audit payloads that could not be handed to Kafka.
+
+    Records are JSON lines in numbered segment files (rolled over at
+    ``segment_bytes``). Appends are fsynced in batches, every ``fsync_every``
+    records or ``fsync_interval`` seconds, whichever comes first, so an
+    outage does not turn every event into a disk flush. A replayer reads from the
+    persisted cursor in append order and ``commit``s the position it delivered;
+    fully replayed segments are deleted. A torn last line (crash mid-write) is
+    never returned.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync_every: int = 100,
+        fsync_interval: float = 0.2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = max(1, segment_bytes)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.appended = 0
+        self.replayed = 0
+        segments = self._segment_numbers()
+        self._cursor = self._load_cursor(segments[0] if segments else 1)
+        self._active = segments[-1] if segments else self._cursor[0]
+        self._trim_torn_tail(self._segment_path(self._active))
+        self._writer = open(self._segment_path(self._active), "ab")
+        if self._cursor > self._end():
+            self._cursor = (self._active, 0)
+
+    @staticmethod
+    def _trim_torn_tail(path: Path) -> None:
+        """Drop a partial last line left by a crash so new appends start on a line boundary."""
+        if not path.exists():
+            return
+        data = path.read_bytes()
+        if data and not data.endswith(b"\n"):
+            with open(path, "r+b") as out:
+                out.truncate(data.rfind(b"\n") + 1)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"{_SEGMENT_PREFIX}{number:09d}{_SEGMENT_SUFFIX}"
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(
+            int(path.name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+            for path in self.directory.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}")
+        )
+
+    def _load_cursor(self, default_segment: int) -> SpillPosition:
+        try:
+            data = json.loads((self.directory / _CURSOR_FILE).read_text(encoding="utf-8"))
+            return int(data["segment"]), int(data["offset"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return default_segment, 0
+
+    def append(self, record: dict) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._writer.tell() and self._writer.tell() + len(line) > self.segment_bytes:
+                self._roll()
+            self._writer.write(line)
+            self.appended += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _roll(self) -> None:
+        self._sync()
+        self._writer.close()
+        self._active += 1
+        self._writer = open(self._segment_path(self._active), "ab")
+
+    def _sync(self) -> None:
+        self._writer.flush()
+        if self._unsynced:
+            os.fsync(self._writer.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def _end(self) -> SpillPosition:
+        return self._active, self._writer.tell()
+
+    def pending(self) -> bool:
+        """True while records appended earlier have not been committed as replayed."""
+        with self._lock:
+            return self._cursor < self._end()
+
+    def read(self, limit: int = 500) -> Tuple[List[dict], SpillPosition]:
+        """Return up to ``limit`` records after the cursor and the position following them."""
+        with self._lock:
+            self._writer.flush()
+            end = self._end()
+        records: List[dict] = []
+        segment, offset = self._cursor
+        while len(records) < limit and (segment, offset) < end:
+            path = self._segment_path(segment)
+            if path.exists():
+                with open(path, "rb") as src:
+                    src.seek(offset)
+                    for line in src:
+                        if not line.endswith(b"\n"):
+                            break  # torn or still-buffered tail
+                        offset += len(line)
+                        records.append(json.loads(line))
+                        if len(records) >= limit:
+                            return records, (segment, offset)
+            if segment >= end[0]:
+                break
+            segment, offset = segment + 1, 0
+        return records, (segment, offset)
+
+    def commit(self, position: SpillPosition, count: int = 0) -> None:
+        """Persist ``position`` as replayed and delete the segments before it."""
+        with self._lock:
+            self._cursor = position
+            self.replayed += count
+            cursor_path = self.directory / _CURSOR_FILE
+            tmp_path = cursor_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                json.dump({"segment": position[0], "offset": position[1]}, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, cursor_path)
+            for number in self._segment_numbers():
+                if number < position[0]:
+                    self._segment_path(number).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+            self._writer.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            end = self._end()
+            return {
+                "directory": str(self.directory),
+                "segments": end[0] - self._cursor[0] + 1,
+                "pending": self._cursor < end,
+                "appended": self.appended,
+                "replayed": self.replayed,
+            }
+
+
+def spill_log_from_env(subdirectory: str = "") -> Optional[SpillLog]:
+    """
+    Build a spill log from ``AUDIT_SPILL_DIR`` (unset disables spilling),
+    ``AUDIT_SPILL_SEGMENT_BYTES`` (default 16 MiB), ``AUDIT_SPILL_FSYNC_EVERY``
+    records (default 100) and ``AUDIT_SPILL_FSYNC_INTERVAL`` seconds (default
+    0.2). The Kafka emitter uses the directory itself; other users pass a
+    ``subdirectory`` so each log keeps its own segments and cursor.
+    """
+    directory = os.getenv("AUDIT_SPILL_DIR")
+    if not directory:
+        return None
+    return SpillLog(
+        str(Path(directory) / subdirectory) if subdirectory else directory,
+        segment_bytes=int(os.getenv("AUDIT_SPILL_SEGMENT_BYTES", str(16 * 1024 * 1024))),
+        fsync_every=int(os.getenv("AUDIT_SPILL_FSYNC_EVERY", "100")),
+        fsync_interval=float(os.getenv("AUDIT_SPILL_FSYNC_INTERVAL", "0.2")),
+    )
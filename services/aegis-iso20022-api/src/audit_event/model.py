@@ -56,6 +56,11 @@ class AuditEvent:
             self.event_id = _generate_event_id()
         return self
 
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "AuditEvent":
+        """Rebuild an event from ``to_dict`` output, ignoring unknown keys."""
+        return cls(**{key: value for key, value in payload.items() if key in cls.__dataclass_fields__})
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "v": self.v,
@@ -3,33 +3,46 @@ from __future__ import annotations
 
 import time
 from datetime import datetime, timezone
-from typing import Callable, Optional
+from typing import Optional
 from uuid import uuid4
 
 import ulid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from audit_event import AuditEvent
 from audit_utils import set_audit_context
 from audit_emitter.base import AuditEmitter
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Capture request metadata and emit audit events."""
+class AuditMiddleware:
+    """
+    Capture request metadata and emit audit events.
 
-    def __init__(self, app, emitter: AuditEmitter) -> None:
-        super().__init__(app)
+    Pure ASGI: ``receive`` and ``send`` are wrapped to count body bytes and read
+    the response status as messages pass through, so nothing is buffered and
+    streaming responses are forwarded chunk by chunk. The audit context is set
+    in the request's own task, where the endpoint sees it.
+    """
+
+    def __init__(self, app: ASGIApp, emitter: AuditEmitter) -> None:
+        self.app = app
         self._emitter = emitter
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start = time.perf_counter()
-        tenant_id = request.headers.get("x-tenant-id", "")
-        tenant_uuid = request.headers.get("x-tenant-uuid", "")
-        x_request_id = request.headers.get("x-request-id", str(uuid4()))
-        incoming_event_id = request.headers.get("x-event-id")
-        attempt_header = request.headers.get("x-attempt")
+        headers = Headers(scope=scope)
+        tenant_id = headers.get("x-tenant-id", "")
+        tenant_uuid = headers.get("x-tenant-uuid", "")
+        x_request_id = headers.get("x-request-id")
+        if x_request_id is None:
+            x_request_id = str(uuid4())
+        incoming_event_id = headers.get("x-event-id")
+        attempt_header = headers.get("x-attempt")
         try:
             attempt = int(attempt_header) if attempt_header else 1
         except ValueError:
@@ -48,10 +61,26 @@ class AuditMiddleware(BaseHTTPMiddleware):
         )
 
         status_code: Optional[int] = None
+        request_bytes = 0
+        response_bytes = 0
+
+        async def receive_counted() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_observed(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive_counted, send_observed)
         except Exception:  # pragma: no cover - re-raised after audit
             status_code = 500
             raise
@@ -65,9 +94,14 @@ class AuditMiddleware(BaseHTTPMiddleware):
                 event_id=event_id,
                 attempt=attempt,
                 x_request_id=x_request_id,
-                route=request.url.path,
+                route=scope["path"],
                 result="accepted" if (status_code or 0) < 400 else "rejected",
                 timing_ms={"total": elapsed_ms},
-                metadata={"method": request.method, "status_code": status_code},
+                metadata={
+                    "method": scope["method"],
+                    "status_code": status_code,
+                    "request_bytes": request_bytes,
+                    "response_bytes": response_bytes,
+                },
             ).ensure_event_id()
             self._emitter.emit(event)
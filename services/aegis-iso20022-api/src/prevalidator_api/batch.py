@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..prevalidator_core import PrevalidationEngine, ValidationResult
+from ..translator_api.batch import BatchParseError, iter_batch_payload
+
+
+@dataclass(frozen=True)
+class PrevalidateItem:
+    source: str
+    index: int
+    mt_raw: str
+    force_type: Optional[str] = None
+
+
+def iter_ndjson_items(body: bytes, source: str = "request") -> Iterator[PrevalidateItem]:
+    """
+    Items from an NDJSON body (one ``{"mt_raw": ..., "force_type": ...}`` object
+    per line) or a JSON array of such objects. Raises BatchParseError on the
+    first bad line, or when the body holds no messages at all.
+    """
+    text = body.decode("utf-8", errors="replace").strip()
+    if not text:
+        raise BatchParseError("Request body is empty")
+    if text.startswith("["):
+        try:
+            entries = json.loads(text)
+        except ValueError as exc:
+            raise BatchParseError(f"Invalid JSON array: {exc}") from exc
+        lines: Iterable[Tuple[int, object]] = enumerate(entries, start=1)
+    else:
+        lines = ((number, line) for number, line in enumerate(text.splitlines(), start=1) if line.strip())
+    index = 0
+    for number, entry in lines:
+        if isinstance(entry, str):
+            try:
+                entry = json.loads(entry)
+            except ValueError as exc:
+                raise BatchParseError(f"Line {number}: invalid JSON ({exc})") from exc
+        if not isinstance(entry, dict) or not isinstance(entry.get("mt_raw"), str) or not entry["mt_raw"].strip():
+            raise BatchParseError(f"Entry {number}: expected an object with a non-empty 'mt_raw'")
+        force_type = entry.get("force_type")
+        if force_type is not None and not isinstance(force_type, str):
+            raise BatchParseError(f"Entry {number}: 'force_type' must be a string")
+        index += 1
+        yield PrevalidateItem(source, index, entry["mt_raw"], force_type)
+    if not index:
+        raise BatchParseError("Request body contains no messages")
+
+
+def iter_file_items(filename: str, stream: BinaryIO) -> Iterator[PrevalidateItem]:
+    """Items from an uploaded ``.dat``/``.txt`` batch file or ``.zip`` of batch files."""
+    for batch in iter_batch_payload(filename, stream):
+        for message in batch.messages:
+            yield PrevalidateItem(batch.source_name, message.index, message.mt_raw)
+
+
+def iter_validated(
+    engine: PrevalidationEngine,
+    items: Iterable[PrevalidateItem],
+    chunk_size: int = 500,
+) -> Iterator[Tuple[PrevalidateItem, ValidationResult]]:
+    """
+    Validate ``items`` ``chunk_size`` at a time with ``engine.validate_many`` so
+    each chunk is grouped by MT type and checked column-wise, while only one
+    chunk is held in memory. Results are yielded in input order; when reading
+    ``items`` fails partway through a chunk, the items already read are still
+    validated and yielded before the error is re-raised.
+    """
+    iterator = iter(items)
+    while True:
+        chunk: List[PrevalidateItem] = []
+        try:
+            for item in islice(iterator, max(1, chunk_size)):
+                chunk.append(item)
+        except BatchParseError:
+            yield from _validate_chunk(engine, chunk)
+            raise
+        if not chunk:
+            return
+        yield from _validate_chunk(engine, chunk)
+
+
+def _validate_chunk(
+    engine: PrevalidationEngine, chunk: List[PrevalidateItem]
+) -> Iterator[Tuple[PrevalidateItem, ValidationResult]]:
+    if chunk:
+        yield from zip(chunk, engine.validate_many([(item.mt_raw, item.force_type) for item in chunk]))
+
+
+def columnar_results(events: Iterable[Tuple[PrevalidateItem, ValidationResult]]) -> dict:
+    """
+    Collect results into parallel arrays: ``messages`` has one entry per message
+    in every column, ``errors`` one entry per error with ``row`` pointing into
+    ``messages``. Sources and MT types are listed once and referenced by position.
+    """
+    sources: Dict[str, int] = {}
+    types: Dict[str, int] = {}
+    messages: Dict[str, list] = {"source": [], "index": [], "mt_type": [], "valid": [], "error_count": []}
+    errors: Dict[str, list] = {"row": [], "field": [], "code": [], "message": [], "occurrence": []}
+    by_type: Dict[str, List[int]] = {}
+    for row, (item, result) in enumerate(events):
+        messages["source"].append(sources.setdefault(item.source, len(sources)))
+        messages["index"].append(item.index)
+        messages["mt_type"].append(types.setdefault(result.mt_type, len(types)))
+        messages["valid"].append(result.valid)
+        messages["error_count"].append(len(result.errors))
+        counts = by_type.setdefault(result.mt_type, [0, 0])
+        counts[0 if result.valid else 1] += 1
+        for error in result.errors:
+            errors["row"].append(row)
+            errors["field"].append(error.field)
+            errors["code"].append(error.code)
+            errors["message"].append(error.message)
+            errors["occurrence"].append(error.occurrence)
+    total = len(messages["valid"])
+    valid = sum(messages["valid"])
+    return {
+        "sources": list(sources),
+        "mt_types": list(types),
+        "messages": messages,
+        "errors": errors,
+        "summary": {
+            "total": total,
+            "valid": valid,
+            "invalid": total - valid,
+            "by_type": {mt_type: {"valid": ok, "invalid": bad} for mt_type, (ok, bad) in by_type.items()},
+        },
+    }
+
+
+def iter_ndjson_results(events: Iterable[Tuple[PrevalidateItem, ValidationResult]]) -> Iterator[bytes]:
+    """
+    Yield one ``type: "result"`` JSON line per message as its chunk completes,
+    then a ``type: "summary"`` line; a mid-stream parse error adds ``type: "error"``.
+    """
+    total = valid = 0
+    try:
+        for item, result in events:
+            total += 1
+            valid += result.valid
+            line = {"type": "result", "source": item.source, "index": item.index, **result.to_dict()}
+            yield (json.dumps(line) + "\n").encode("utf-8")
+    except BatchParseError as exc:
+        yield (json.dumps({"type": "error", "status_code": 400, "detail": str(exc)}) + "\n").encode("utf-8")
+    yield (json.dumps({"type": "summary", "total": total, "valid": valid, "invalid": total - valid}) + "\n").encode("utf-8")
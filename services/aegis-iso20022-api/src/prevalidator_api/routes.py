@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from enum import Enum
+from itertools import chain
+
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from ..prevalidator_core import PrevalidationEngine
+from ..translator_api.batch import BatchParseError
+from .batch import columnar_results, iter_file_items, iter_ndjson_items, iter_ndjson_results, iter_validated
 
 router = APIRouter(prefix="/prevalidate", tags=["prevalidate"])
 engine = PrevalidationEngine()
@@ -20,3 +27,45 @@ def prevalidate(req: PrevalidateRequest):
         raise HTTPException(status_code=400, detail="mt_raw must not be empty")
     result = engine.validate(req.mt_raw, force_type=req.force_type)
     return result.to_dict()
+
+
+class BatchPrevalidateFormat(str, Enum):
+    columnar = "columnar"
+    ndjson = "ndjson"
+
+
+@router.post("/batch", summary="Prevalidate a batch file or NDJSON list of MT messages")
+async def prevalidate_batch(
+    request: Request,
+    file: UploadFile | None = File(None),
+    responseFileFormat: BatchPrevalidateFormat = BatchPrevalidateFormat.columnar,
+    chunk_size: int = 500,
+):
+    """
+    Accepts a multipart ``file`` (``.dat``/``.txt`` batch or ``.zip`` of batches)
+    or an NDJSON / JSON-array body of ``{"mt_raw", "force_type"}`` objects.
+    Messages are validated in chunks grouped by MT type; ``columnar`` returns
+    parallel arrays, ``ndjson`` streams one line per message.
+    """
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be at least 1")
+    if file is not None:
+        items = iter_file_items(file.filename or "batch.dat", file.file)
+    else:
+        items = iter_ndjson_items(await request.body())
+    events = iter_validated(engine, items, chunk_size)
+
+    if responseFileFormat is BatchPrevalidateFormat.ndjson:
+        # Pull the first result before committing to a 200 so upload/header errors
+        # still map to a 400; later parse errors are reported inside the stream.
+        try:
+            first = await run_in_threadpool(next, events, None)
+        except BatchParseError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        stream = chain([first], events) if first is not None else events
+        return StreamingResponse(iter_ndjson_results(stream), media_type="application/x-ndjson")
+
+    try:
+        return await run_in_threadpool(columnar_results, events)
+    except BatchParseError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,92 +1,107 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..translator_core.detector import Detector
 from ..translator_core.mt_parser import MTParser
+from ..translator_core.parsed_message import ParsedMessage
 
 from .loader import FieldDefinitionsLoader
+from .lookups import LookupIndex, get_lookup_index
 from .models import ValidationError, ValidationResult
-from .rules import apply_rule
+from .network_rules import NetworkRulePlan, compile_network_rules
+from .plan import PrevalidationPlan, compile_definitions
+
+_NO_NETWORK_RULES = NetworkRulePlan(slots=(), checks=(), skipped=())
 
 
 class PrevalidationEngine:
-    def __init__(self) -> None:
+    def __init__(self, check_formats: Optional[bool] = None) -> None:
+        if check_formats is None:
+            check_formats = os.getenv("PREVALIDATE_FORMAT_CHECKS", "false").lower() == "true"
+        self.check_formats = check_formats
         self.loader = FieldDefinitionsLoader()
         self.detector = Detector()
         self.parser = MTParser()
+        self._plans: Dict[str, Tuple[List[Dict[str, Any]], Optional[LookupIndex], PrevalidationPlan]] = {}
+        self._network_plans: Dict[str, Tuple[LookupIndex, NetworkRulePlan]] = {}
 
-    def _detect_type(self, raw: str, force_type: Optional[str]) -> Optional[str]:
-        if force_type:
-            return force_type.upper()
-        return self.detector.detect(raw)
-
-    def validate(self, raw: str, force_type: Optional[str] = None) -> ValidationResult:
-        mt_type = self._detect_type(raw, force_type)
-        if not mt_type:
-            return ValidationResult(mt_type="UNKNOWN", valid=False, errors=[ValidationError(field="__message__", message="Unable to detect MT type")])
-
-        definitions = self.loader.get_definitions(mt_type)
-        if definitions is None:
-            return ValidationResult(mt_type=mt_type, valid=False, errors=[ValidationError(field="__message__", message=f"No field validations defined for {mt_type}")])
+    def get_plan(self, mt_type: str) -> PrevalidationPlan:
+        """Return the compiled plan for ``mt_type``, compiling its definitions on first use."""
+        definitions = self.loader.get_definitions(mt_type) or []
+        # Compiled formats depend on the lookups charsets, so a reload recompiles.
+        index = get_lookup_index() if self.check_formats else None
+        entry = self._plans.get(mt_type)
+        if entry is None or entry[0] is not definitions or entry[1] is not index:
+            entry = (definitions, index, compile_definitions(definitions, check_formats=self.check_formats))
+            self._plans[mt_type] = entry
+        return entry[2]
 
-        parsed = self.parser.parse(mt_type, raw)
-        fields: Dict[str, List[str]] = parsed.get("fields", {})  # type: ignore
+    def get_network_plan(self, mt_type: str) -> NetworkRulePlan:
+        """
+        Return the compiled network validation rules for ``mt_type`` (empty when
+        the type has none), recompiling when the lookup index has been reloaded.
+        """
+        index = get_lookup_index()
+        entry = self._network_plans.get(mt_type)
+        if entry is None or entry[0] is not index:
+            rules = self.loader.get_network_rules(mt_type)
+            plan = compile_network_rules(rules, index.codes) if rules else _NO_NETWORK_RULES
+            entry = (index, plan)
+            self._network_plans[mt_type] = entry
+        return entry[1]
 
-        errors: List[ValidationError] = []
+    def _detect_type(self, force_type: Optional[str], message: ParsedMessage) -> Optional[str]:
+        mt_type = force_type or message.mt_type
+        return mt_type.upper() if mt_type else None
 
-        def get_field_values(tag: str) -> List[str]:
-            if not tag:
-                return []
-            upper_tag = tag.upper()
-            if upper_tag in fields:
-                return fields[upper_tag]
-            if tag in fields:
-                return fields[tag]
-            if len(tag) > 2 and tag[-1].isalpha() and tag[-1].islower():
-                base = tag[:-1]
-                if base in fields:
-                    return fields[base]
-                if base.upper() in fields:
-                    return fields[base.upper()]
-                # Handle optioned fields (e.g. 59a -> 59A, 59F, etc.).
-                prefix = base.upper()
-                collected: List[str] = []
-                for key, vals in fields.items():
-                    upper_key = key.upper()
-                    if upper_key == prefix or (upper_key.startswith(prefix) and len(upper_key) == len(prefix) + 1 and upper_key[-1].isalpha()):
-                        collected.extend(vals)
-                if collected:
-                    return collected
-            return []
+    def validate(
+        self,
+        raw: str,
+        force_type: Optional[str] = None,
+        parsed: Optional[ParsedMessage] = None,
+    ) -> ValidationResult:
+        """Validate ``raw``; pass ``parsed`` (the ParsedMessage for ``raw``) to skip re-tokenising."""
+        if parsed is None:
+            parsed = ParsedMessage.from_raw(raw, force_type=force_type, parser=self.parser, detector=self.detector)
+        mt_type = self._detect_type(force_type, parsed)
+        unsupported = self._unsupported(mt_type)
+        if unsupported is not None:
+            return unsupported
 
-        # Presence checks
-        for field_def in definitions:
-            tag = field_def.get("tag")
-            presence = field_def.get("presence")
-            if not tag or not presence:
-                continue
-            values = get_field_values(tag)
-            if presence == "mandatory" and (not values or all(v.strip() == "" for v in values)):
-                errors.append(ValidationError(field=tag, message="Field is mandatory but missing", code="PRESENCE"))
+        errors = self.get_plan(mt_type).validate(parsed.fields)
+        errors += self.get_network_plan(mt_type).validate(parsed.fields, parsed.blocks)
+        return ValidationResult(mt_type=mt_type, valid=not errors, errors=errors)
 
-        # Value validations
-        for field_def in definitions:
-            tag = field_def.get("tag")
-            if not tag:
-                continue
-            validations = field_def.get("validations") or []
-            if not validations:
-                continue
-            values = get_field_values(tag)
-            for idx, value in enumerate(values, start=1):
-                for validation in validations:
-                    rule_name = validation.get("rule") if isinstance(validation, dict) else None
-                    error_code = validation.get("error_code") if isinstance(validation, dict) else None
-                    if not rule_name:
-                        continue
-                    error_message = apply_rule(rule_name, value)
-                    if error_message:
-                        errors.append(ValidationError(field=tag, message=error_message, code=error_code, occurrence=idx))
+    def validate_many(self, items: Sequence[Tuple[str, Optional[str]]]) -> List[ValidationResult]:
+        """
+        Validate ``(raw, force_type)`` pairs. Messages are grouped by MT type and
+        each group's field checks run column-wise (``PrevalidationPlan.validate_many``);
+        results come back in input order, equal to calling ``validate`` on each.
+        """
+        results: List[Optional[ValidationResult]] = [None] * len(items)
+        groups: Dict[str, List[Tuple[int, ParsedMessage]]] = {}
+        for position, (raw, force_type) in enumerate(items):
+            parsed = ParsedMessage.from_raw(raw, force_type=force_type, parser=self.parser, detector=self.detector)
+            mt_type = self._detect_type(force_type, parsed)
+            unsupported = self._unsupported(mt_type)
+            if unsupported is not None:
+                results[position] = unsupported
+            else:
+                groups.setdefault(mt_type, []).append((position, parsed))  # type: ignore[arg-type]
+        for mt_type, members in groups.items():
+            field_errors = self.get_plan(mt_type).validate_many([parsed.fields for _position, parsed in members])
+            network_plan = self.get_network_plan(mt_type)
+            for (position, parsed), errors in zip(members, field_errors):
+                errors += network_plan.validate(parsed.fields, parsed.blocks)
+                results[position] = ValidationResult(mt_type=mt_type, valid=not errors, errors=errors)
+        return results  # type: ignore[return-value]
 
-        return ValidationResult(mt_type=mt_type, valid=not errors, errors=errors)
+    def _unsupported(self, mt_type: Optional[str]) -> Optional[ValidationResult]:
+        """The result for a message whose type is unknown or has no field validations, else None."""
+        if not mt_type:
+            return ValidationResult(mt_type="UNKNOWN", valid=False, errors=[ValidationError(field="__message__", message="Unable to detect MT type")])
+        if self.loader.get_definitions(mt_type) is None:
+            return ValidationResult(mt_type=mt_type, valid=False, errors=[ValidationError(field="__message__", message=f"No field validations defined for {mt_type}")])
+        return None
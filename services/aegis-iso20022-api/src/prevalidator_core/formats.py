@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import functools
+import re
+from typing import List, Optional, Tuple
+
+from .lookups import get_lookup_index
+
+Charsets = Tuple[Tuple[str, str], ...]
+
+# Fallback when lookups.yaml has no X definition: the SWIFT FIN X set.
+_DEFAULT_X = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789/-?:().,'+ \r\n"
+
+_KIND_CLASSES = {"n": "0-9", "a": "A-Z", "c": "A-Z0-9", "h": "0-9A-F", "e": " "}
+_ELEMENT = re.compile(r"(\d+)(!?)([nacdehxyz])")
+_REPEAT = re.compile(r"(\d+)\*")
+
+
+def _char_class(kind: str, charsets: Charsets, multiline: bool = False) -> str:
+    if kind in _KIND_CLASSES:
+        return f"[{_KIND_CLASSES[kind]}]"
+    chars = dict(charsets).get(kind.upper(), _DEFAULT_X if kind == "x" else None)
+    if chars is None:
+        raise ValueError(f"unknown charset '{kind}'")
+    if not multiline:
+        chars = chars.replace("\r", "").replace("\n", "")
+    return "[" + "".join(re.escape(ch) for ch in chars) + "]"
+
+
+@functools.lru_cache(maxsize=None)
+def _charset_pattern(name: str, charsets: Charsets) -> "re.Pattern[str]":
+    return re.compile("[^" + _char_class(name.lower(), charsets, multiline=True)[1:])
+
+
+def charset_pattern(name: str) -> "re.Pattern[str]":
+    """Regex matching the first character outside charset ``name`` of the current lookups (line breaks allowed)."""
+    index = get_lookup_index()
+    pattern = index.charset_violations.get(name)
+    return pattern if pattern is not None else _charset_pattern(name, index.charsets)
+
+
+class _SpecParser:
+    """Recursive-descent parser for SWIFT field format notation (``4!c[/30x]``, ``[/34x] 4*35x``)."""
+
+    def __init__(self, spec: str, charsets: Charsets) -> None:
+        self.spec = spec
+        self.charsets = charsets
+        self.pos = 0
+
+    def parse(self) -> str:
+        lines: List[Tuple[str, bool]] = []
+        for segment in self._split_lines():
+            parser = _SpecParser(segment, self.charsets)
+            regex, optional = parser._sequence("")
+            lines.append((regex, optional))
+        pattern = ""
+        emitted = False
+        for regex, optional in lines:
+            if not optional:
+                pattern += ("\n" if emitted else "") + regex
+                emitted = True
+            elif emitted:
+                pattern += f"(?:\n{regex})?"
+            else:
+                # A leading optional line brings its own line break when it is present.
+                pattern += f"(?:(?=[^\n]){regex}\n)?"
+        return pattern
+
+    def _split_lines(self) -> List[str]:
+        segments, depth, start = [], 0, 0
+        for index, ch in enumerate(self.spec):
+            if ch in "[(":
+                depth += 1
+            elif ch in "])":
+                depth -= 1
+            elif ch == " " and depth == 0:
+                segments.append(self.spec[start:index])
+                start = index + 1
+        segments.append(self.spec[start:])
+        return [segment for segment in segments if segment]
+
+    def _sequence(self, closing: str) -> Tuple[str, bool]:
+        """Regex for items up to ``closing``; the flag is True when every item is optional."""
+        parts: List[str] = []
+        optional = True
+        while self.pos < len(self.spec) and self.spec[self.pos] != closing:
+            ch = self.spec[self.pos]
+            if ch == "[":
+                self.pos += 1
+                inner, _ = self._sequence("]")
+                self._expect("]")
+                parts.append(f"(?:{inner})?")
+                continue
+            optional = False
+            repeat = _REPEAT.match(self.spec, self.pos)
+            lines = 1
+            if repeat:
+                lines = int(repeat.group(1))
+                self.pos = repeat.end()
+            if self.spec.startswith("(", self.pos):
+                self.pos += 1
+                unit, _ = self._sequence(")")
+                self._expect(")")
+            else:
+                element = _ELEMENT.match(self.spec, self.pos)
+                if element:
+                    self.pos = element.end()
+                    unit = self._element(int(element.group(1)), bool(element.group(2)), element.group(3))
+                elif repeat or ch.isalnum():
+                    raise ValueError(f"cannot parse format '{self.spec}' at {self.pos}")
+                else:
+                    self.pos += 1
+                    parts.append(re.escape(ch))
+                    continue
+            parts.append(unit if lines == 1 else f"{unit}(?:\n{unit}){{0,{lines - 1}}}")
+        return "".join(parts), optional
+
+    def _expect(self, ch: str) -> None:
+        if not self.spec.startswith(ch, self.pos):
+            raise ValueError(f"unbalanced format '{self.spec}'")
+        self.pos += 1
+
+    def _element(self, length: int, exact: bool, kind: str) -> str:
+        if kind == "d":
+            # Digits with exactly one decimal comma; the comma counts towards the length.
+            return f"(?=[0-9,]{{1,{length}}}(?![0-9,]))[0-9]+,[0-9]*"
+        count = f"{{{length}}}" if exact else f"{{1,{length}}}"
+        return _char_class(kind, self.charsets, multiline=kind == "z") + count
+
+
+class FormatValidator:
+    """
+    One SWIFT format spec compiled to a single regex, so length, charset and
+    structure are checked by one ``fullmatch`` per value. The slower
+    explanation (which character or line is wrong) is only computed on failure.
+    """
+
+    __slots__ = ("spec", "pattern", "charset")
+
+    def __init__(self, spec: str, charsets: Charsets = ()) -> None:
+        self.spec = spec
+        self.pattern = re.compile(_SpecParser(spec, charsets).parse())
+        kinds = set(re.findall(r"\d+!?([xyz])", spec))
+        self.charset = kinds.pop().upper() if len(kinds) == 1 else None
+
+    def __call__(self, value: str) -> Optional[str]:
+        if "\r" in value:
+            value = value.replace("\r\n", "\n")
+        if self.pattern.fullmatch(value):
+            return None
+        if self.charset:
+            bad = charset_pattern(self.charset).search(value)
+            if bad:
+                return f"Character '{bad.group()}' not allowed in {self.charset} charset"
+        return f"Value does not match format {self.spec}"
+
+    def __repr__(self) -> str:
+        return f"FormatValidator({self.spec!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_format(spec: str, charsets: Charsets) -> Optional[FormatValidator]:
+    try:
+        return FormatValidator(spec.strip(), charsets)
+    except (ValueError, re.error):
+        return None
+
+
+def compile_format(spec: str) -> Optional[FormatValidator]:
+    """
+    FormatValidator for ``spec`` against the current lookups charsets, cached by
+    spec string (and charset definitions), or None when the notation is not understood.
+    """
+    return _compile_format(spec, get_lookup_index().charsets)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import functools
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -15,13 +14,22 @@ ALIASES = {
     "MT196": "MTn96",
 }
 
+NETWORK_RULES_SUFFIX = "networkvalidation_rules.yaml"
+
+
+def _network_rules_key(name: str) -> str:
+    """``MT103-STP`` / ``mt103STPnetworkvalidation_rules.yaml`` -> ``mt103stp``."""
+    if name.lower().endswith(NETWORK_RULES_SUFFIX):
+        name = name[: -len(NETWORK_RULES_SUFFIX)]
+    return name.replace("-", "").lower()
+
 
 class FieldDefinitionsLoader:
     """Loads field validation metadata for MT messages."""
 
     def __init__(self) -> None:
         self._cache: Dict[str, List[Dict[str, Any]]] = {}
-        self._lookups: Optional[Dict[str, Any]] = None
+        self._network_cache: Dict[str, Optional[List[Dict[str, Any]]]] = {}
 
     def get_definitions(self, mt_type: str) -> Optional[List[Dict[str, Any]]]:
         mt_type = mt_type.upper()
@@ -38,12 +46,28 @@ class FieldDefinitionsLoader:
         self._cache[mt_type] = data
         return data
 
-    @functools.lru_cache(maxsize=1)
-    def get_lookups(self) -> Dict[str, Any]:
-        if not LOOKUPS_FILE.exists():
-            return {}
-        with LOOKUPS_FILE.open("r", encoding="utf-8") as fh:
-            data = yaml.safe_load(fh) or {}
-        if not isinstance(data, dict):
-            raise ValueError("Invalid lookups.yaml structure")
-        return data
+    def get_network_rules(self, mt_type: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the ``*networkvalidation_rules.yaml`` rule list for ``mt_type``
+        (``MT103-STP`` uses ``MT103STP...``); variants without their own file
+        (``MT103-REMIT``) use the base type's rules.
+        """
+        mt_type = mt_type.upper()
+        if mt_type in self._network_cache:
+            return self._network_cache[mt_type]
+        files = {_network_rules_key(path.name): path for path in PREVALIDATE_DIR.glob(f"*/*{NETWORK_RULES_SUFFIX}")}
+        folder = ALIASES.get(mt_type, mt_type)
+        path = files.get(_network_rules_key(folder)) or files.get(_network_rules_key(folder.split("-", 1)[0]))
+        rules = None
+        if path is not None:
+            with path.open("r", encoding="utf-8") as fh:
+                data = yaml.safe_load(fh) or []
+            if isinstance(data, dict):
+                # {<Type>_Usage_Rules: {rules: [...]}}
+                data = next(iter(data.values()), None) or {}
+                data = data.get("rules", []) if isinstance(data, dict) else data
+            if not isinstance(data, list):
+                raise ValueError(f"Unexpected network validation rules structure in {path.name}")
+            rules = data
+        self._network_cache[mt_type] = rules
+        return rules
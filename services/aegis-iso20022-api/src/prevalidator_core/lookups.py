@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+import yaml
+
+from .loader import LOOKUPS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Typographic characters used in the charset literals for their ASCII equivalents.
+_TYPOGRAPHIC = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-"})
+_LITERAL_TOKENS = {"[CRLF]": "\r\n", "[CR]": "\r", "[LF]": "\n", "[SPACE]": " "}
+_NO_CODES: FrozenSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class LookupIndex:
+    """
+    Immutable view of ``lookups.yaml``: every list under ``lookups:`` as a
+    frozenset of upper-cased codes with a compiled whole-word matcher, and the
+    allowed characters of each ``charsets`` entry. ``raw`` is the parsed file
+    and must be treated as read-only.
+    """
+
+    raw: Mapping[str, Any]
+    codes: Mapping[str, FrozenSet[str]]
+    matchers: Mapping[str, "re.Pattern[str]"]
+    # (name, allowed characters) per charset, hashable so compiled formats can be cached against it.
+    charsets: Tuple[Tuple[str, str], ...]
+    # Per charset, a regex finding the first character outside it.
+    charset_violations: Mapping[str, "re.Pattern[str]"]
+    mtime: Optional[int]
+
+    def codes_for(self, name: str) -> FrozenSet[str]:
+        return self.codes.get(name, _NO_CODES)
+
+    def find_code(self, name: str, text: str) -> Optional[str]:
+        """First code of list ``name`` appearing as a whole word in ``text``."""
+        matcher = self.matchers.get(name)
+        match = matcher.search(text) if matcher is not None else None
+        return match.group() if match else None
+
+
+def _charset_chars(literal: str) -> str:
+    chars = "".join(_LITERAL_TOKENS.get(token) or token.translate(_TYPOGRAPHIC) for token in literal.split())
+    return "".join(dict.fromkeys(chars))
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def build_index(path: Path = LOOKUPS_FILE) -> LookupIndex:
+    """Parse ``path`` and precompute code sets, matchers and charsets."""
+    mtime = _mtime_ns(path)
+    data: Dict[str, Any] = {}
+    if mtime is not None:
+        with path.open("r", encoding="utf-8") as fh:
+            data = yaml.safe_load(fh) or {}
+    if not isinstance(data, dict):
+        raise ValueError("Invalid lookups.yaml structure")
+
+    codes: Dict[str, FrozenSet[str]] = {}
+    matchers: Dict[str, "re.Pattern[str]"] = {}
+    for name, entries in (data.get("lookups") or {}).items():
+        if isinstance(entries, dict):
+            values = entries.keys()
+        elif isinstance(entries, list):
+            values = entries
+        else:
+            continue
+        code_set = frozenset(str(code).upper() for code in values)
+        codes[name] = code_set
+        if code_set:
+            alternation = "|".join(re.escape(code) for code in sorted(code_set, key=lambda code: (-len(code), code)))
+            matchers[name] = re.compile(rf"\b(?:{alternation})\b")
+
+    charsets = tuple(
+        (str(name).upper(), _charset_chars(str(spec.get("allowed_chars_literal") or "")))
+        for name, spec in (data.get("charsets") or {}).items()
+        if isinstance(spec, dict)
+    )
+    violations = {name: re.compile("[^" + "".join(re.escape(ch) for ch in chars) + "]") for name, chars in charsets}
+    return LookupIndex(
+        raw=MappingProxyType(data),
+        codes=MappingProxyType(codes),
+        matchers=MappingProxyType(matchers),
+        charsets=charsets,
+        charset_violations=MappingProxyType(violations),
+        mtime=mtime,
+    )
+
+
+class LookupStore:
+    """
+    Holds the current LookupIndex. Readers take ``index`` (one attribute
+    read); ``reload`` builds a complete new index and swaps it in with a
+    single reference assignment, so a rule never sees a half-loaded file.
+    """
+
+    def __init__(self, path: Path = LOOKUPS_FILE) -> None:
+        self.path = path
+        self._reload_lock = threading.Lock()
+        self._stop_event: Optional[threading.Event] = None
+        self._reload_thread: Optional[threading.Thread] = None
+        self._failed_mtime: Optional[int] = None
+        self.index = build_index(path)
+
+    def reload(self) -> None:
+        """Rebuild the index from disk and swap it in atomically."""
+        with self._reload_lock:
+            self.index = build_index(self.path)
+
+    def reload_if_changed(self) -> bool:
+        current = _mtime_ns(self.path)
+        if current == self.index.mtime or (current is not None and current == self._failed_mtime):
+            return False
+        try:
+            self.reload()
+        except Exception:  # pylint: disable=broad-except
+            # Keep serving the previous index until the file is fixed.
+            self._failed_mtime = current
+            logger.exception("Lookup reload failed; keeping previous lookups")
+            return False
+        self._failed_mtime = None
+        logger.info("Lookups reloaded from %s", self.path)
+        return True
+
+    def start_auto_reload(self, interval: float) -> None:
+        """Poll ``lookups.yaml`` every ``interval`` seconds from a daemon thread."""
+        if interval <= 0 or self._reload_thread is not None:
+            return
+        stop_event = threading.Event()
+
+        def _poll() -> None:
+            while not stop_event.wait(interval):
+                self.reload_if_changed()
+
+        self._stop_event = stop_event
+        self._reload_thread = threading.Thread(target=_poll, name="lookup-store-reload", daemon=True)
+        self._reload_thread.start()
+
+    def stop_auto_reload(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout=5)
+        self._stop_event = None
+        self._reload_thread = None
+
+
+_LOOKUP_STORE: Optional[LookupStore] = None
+_LOOKUP_STORE_LOCK = threading.Lock()
+
+
+def get_lookup_store() -> LookupStore:
+    """Return the process-wide lookup store, loading ``lookups.yaml`` on first use."""
+    global _LOOKUP_STORE
+    if _LOOKUP_STORE is None:
+        with _LOOKUP_STORE_LOCK:
+            if _LOOKUP_STORE is None:
+                _LOOKUP_STORE = LookupStore()
+    return _LOOKUP_STORE
+
+
+def get_lookup_index() -> LookupIndex:
+    return get_lookup_store().index
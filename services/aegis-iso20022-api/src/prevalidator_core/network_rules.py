@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .models import ValidationError
+
+# ---------------------------------------------------------------------------
+# Message view: field lookups shared by every predicate of one evaluation
+# ---------------------------------------------------------------------------
+
+_CURRENCY_RE = re.compile(r"^(?:\d{6})?([A-Z]{3})")
+
+
+class MessageView:
+    """
+    Read-only accessors over one parsed message. Values of an optioned tag
+    (``53a``: 53, 53A, 53B, ...) are collected once per tag and reused by every
+    predicate that reads it.
+    """
+
+    __slots__ = ("fields", "blocks", "_occurrences")
+
+    def __init__(self, fields: Mapping[str, List[str]], blocks: Optional[Mapping[str, str]] = None) -> None:
+        self.fields = fields
+        self.blocks = blocks or {}
+        self._occurrences: Dict[str, List[Tuple[str, str]]] = {}
+
+    def occurrences(self, tag: str) -> List[Tuple[str, str]]:
+        """``(option letter, value)`` for every occurrence of ``tag``; the letter is "" for unlettered tags."""
+        cached = self._occurrences.get(tag)
+        if cached is not None:
+            return cached
+        if tag[-1:].islower():
+            prefix = tag[:-1]
+            found = []
+            for key, values in self.fields.items():
+                if key == prefix or (key[:-1] == prefix and key[-1:].isalpha()):
+                    letter = key[len(prefix):]
+                    found.extend((letter, value) for value in values)
+        else:
+            found = [("", value) for value in self.fields.get(tag, ())]
+        self._occurrences[tag] = found
+        return found
+
+    def party_country(self, party: str) -> Optional[str]:
+        """Country code of the sender's or receiver's BIC taken from the basic/application headers."""
+        block1, block2 = self.blocks.get("1", ""), self.blocks.get("2", "")
+        if block2.startswith("I"):
+            address = block1[3:15] if party == "sender" else block2[4:16]
+        elif block2.startswith("O"):
+            address = block2[14:26] if party == "sender" else block1[3:15]
+        else:
+            return None
+        return address[4:6] or None
+
+
+def _code(value: str) -> str:
+    """Leading code of a value: ``SPRI``, ``CHQB/123`` -> ``CHQB``."""
+    return value.strip().split("\n", 1)[0].split("/", 1)[0].strip()
+
+
+# ---------------------------------------------------------------------------
+# Predicate trees
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Present:
+    tag: str
+
+    def evaluate(self, view: MessageView) -> bool:
+        return any(value.strip() for _letter, value in view.occurrences(self.tag))
+
+
+@dataclass(frozen=True)
+class OptionIn:
+    """Any (or, with ``every``, each) occurrence of ``tag`` uses one of ``letters``."""
+
+    tag: str
+    letters: FrozenSet[str]
+    every: bool = False
+
+    def evaluate(self, view: MessageView) -> bool:
+        matches = (letter in self.letters for letter, _value in view.occurrences(self.tag))
+        return all(matches) if self.every else any(matches)
+
+
+@dataclass(frozen=True)
+class CodeIn:
+    """Any (or, with ``every``, each) occurrence of ``tag`` starts with one of ``codes``."""
+
+    tag: str
+    codes: FrozenSet[str]
+    every: bool = False
+
+    def evaluate(self, view: MessageView) -> bool:
+        matches = (_code(value) in self.codes for _letter, value in view.occurrences(self.tag))
+        return all(matches) if self.every else any(matches)
+
+
+@dataclass(frozen=True)
+class StartsWith:
+    """The first line of ``tag`` starts with ``prefix`` (``/`` account or party identifier, ``//`` clearing code)."""
+
+    tag: str
+    prefix: str
+
+    def evaluate(self, view: MessageView) -> bool:
+        occurrences = view.occurrences(self.tag)
+        return bool(occurrences) and occurrences[0][1].lstrip().startswith(self.prefix)
+
+
+@dataclass(frozen=True)
+class SameCurrency:
+    tag: str
+    other: str
+
+    def evaluate(self, view: MessageView) -> bool:
+        return _currency(view, self.tag) == _currency(view, self.other)
+
+
+@dataclass(frozen=True)
+class CountryIn:
+    party: str
+    countries: FrozenSet[str]
+
+    def evaluate(self, view: MessageView) -> bool:
+        return view.party_country(self.party) in self.countries
+
+
+@dataclass(frozen=True)
+class Not:
+    node: Any
+
+
+@dataclass(frozen=True)
+class AllOf:
+    nodes: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    nodes: Tuple[Any, ...]
+
+
+TRUE = AllOf(())
+
+
+def _currency(view: MessageView, tag: str) -> Optional[str]:
+    occurrences = view.occurrences(tag)
+    match = _CURRENCY_RE.match(occurrences[0][1].strip()) if occurrences else None
+    return match.group(1) if match else None
+
+
+def _optional(tag: str, node: Any) -> Any:
+    """``node`` only constrains ``tag`` when it is present."""
+    return AnyOf((Not(Present(tag)), node))
+
+
+# ---------------------------------------------------------------------------
+# Compiled plan
+# ---------------------------------------------------------------------------
+
+Slot = Callable[[MessageView, List[bool]], bool]
+
+
+@dataclass(frozen=True)
+class NetworkCheck:
+    rule_id: str
+    guard: int
+    assertion: int
+    field: str
+    code: Optional[str]
+    message: str
+
+
+@dataclass(frozen=True)
+class NetworkRulePlan:
+    """
+    Network validation rules of one MT type compiled to predicate trees.
+
+    Every distinct predicate node is interned into one slot, children before
+    parents, so evaluation is a single pass over ``slots``: a sub-expression
+    shared by several rules ("56a present", "option of 53a", "23B in SPRI,
+    SSTD, SPAY") is computed once per message. ``checks`` then read their guard
+    and assertion slots. Rules whose shape the compiler does not understand
+    (sequence-scoped or cross-message rules) are listed in ``skipped``.
+    """
+
+    slots: Tuple[Slot, ...]
+    checks: Tuple[NetworkCheck, ...]
+    skipped: Tuple[Tuple[str, str], ...]
+
+    def evaluate_slots(self, view: MessageView) -> List[bool]:
+        results: List[bool] = []
+        for slot in self.slots:
+            results.append(slot(view, results))
+        return results
+
+    def validate(self, fields: Mapping[str, List[str]], blocks: Optional[Mapping[str, str]] = None) -> List[ValidationError]:
+        if not self.checks:
+            return []
+        results = self.evaluate_slots(MessageView(fields, blocks))
+        return [
+            ValidationError(field=check.field, message=check.message, code=check.code)
+            for check in self.checks
+            if results[check.guard] and not results[check.assertion]
+        ]
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.index: Dict[Any, int] = {}
+        self.slots: List[Slot] = []
+
+    def add(self, node: Any) -> int:
+        slot = self.index.get(node)
+        if slot is not None:
+            return slot
+        if isinstance(node, Not):
+            child = self.add(node.node)
+            fn: Slot = lambda _view, results, child=child: not results[child]
+        elif isinstance(node, (AllOf, AnyOf)):
+            children = tuple(self.add(child) for child in node.nodes)
+            combine = all if isinstance(node, AllOf) else any
+            fn = lambda _view, results, children=children, combine=combine: combine(results[c] for c in children)
+        else:
+            fn = lambda view, _results, evaluate=node.evaluate: evaluate(view)
+        slot = self.index[node] = len(self.slots)
+        self.slots.append(fn)
+        return slot
+
+
+# ---------------------------------------------------------------------------
+# Compiler for the *networkvalidation_rules.yaml grammar
+# ---------------------------------------------------------------------------
+
+
+class UnsupportedRule(ValueError):
+    """Raised while compiling a rule whose shape has no predicate translation."""
+
+
+_RULE_KEYS = {"id", "rule_id", "description", "error_code", "error_codes", "notes", "lookup_reference", "conditions", "enforcement", "fallback"}
+_FIELD_KEY = re.compile(r"^field_(\d{2}[A-Za-z]?)(?:_(.+))?$")
+_LIST_SPEC = re.compile(r"^(allowed_values|must_not_contain)\s*\[(.*)\]$")
+
+
+def _field(key: str) -> Tuple[str, Optional[str]]:
+    match = _FIELD_KEY.match(key)
+    if not match:
+        raise UnsupportedRule(f"unknown condition '{key}'")
+    return match.group(1), match.group(2)
+
+
+def _letters(spec: Any) -> FrozenSet[str]:
+    items = spec if isinstance(spec, list) else [spec]
+    return frozenset(str(item).strip().upper() for item in items)
+
+
+def _words(text: str) -> FrozenSet[str]:
+    return frozenset(part.strip() for part in text.split(",") if part.strip())
+
+
+class _RuleCompiler:
+    def __init__(self, rule: Dict[str, Any], lookups: Mapping[str, Any]) -> None:
+        self.rule = rule
+        self.lookups = lookups
+        self.rule_id = str(rule.get("id") or rule.get("rule_id") or "?")
+        self.message = " ".join(str(rule.get("description") or self.rule_id).split())
+        self.error_code = rule.get("error_code")
+        self.error_codes = rule.get("error_codes") or {}
+        self.checks: List[Tuple[Any, Any, str, Optional[str]]] = []
+
+    def compile(self) -> List[Tuple[Any, Any, str, Optional[str]]]:
+        unknown = set(self.rule) - _RULE_KEYS
+        if unknown:
+            raise UnsupportedRule(f"unsupported section(s) {sorted(unknown)}")
+        conditions = self.rule.get("conditions") or {}
+        enforcement = self.rule.get("enforcement")
+        if not isinstance(conditions, dict) or (enforcement is not None and not isinstance(enforcement, dict)):
+            raise UnsupportedRule("conditions/enforcement must be mappings")
+
+        guards: List[Any] = []
+        constraints: Dict[str, Any] = {}
+        switches: List[Tuple[str, Dict[str, Any]]] = []
+        for key, spec in conditions.items():
+            if isinstance(spec, dict):
+                switches.append((key, spec))
+            elif enforcement is None and self._is_constraint(key, spec):
+                constraints[key] = spec
+            else:
+                guards.append(self._guard(key, spec))
+        guard = AllOf(tuple(guards)) if guards else TRUE
+
+        self._constrain(guard, constraints, self.error_code)
+        for key, branches in switches:
+            tag, attr = _field(key)
+            if attr:
+                raise UnsupportedRule(f"cannot switch on '{key}'")
+            for branch, branch_constraints in branches.items():
+                if not isinstance(branch_constraints, dict):
+                    raise UnsupportedRule(f"branch '{branch}' of '{key}' must be a mapping")
+                if branch == "present":
+                    branch_guard = Present(tag)
+                elif branch == "not_present":
+                    branch_guard = Not(Present(tag))
+                else:
+                    branch_guard = CodeIn(tag, frozenset(str(branch).split("_")))
+                code = self.error_codes.get(branch, self.error_code)
+                self._constrain(AllOf((guard, branch_guard)), branch_constraints, code)
+        if enforcement:
+            self._constrain(guard, enforcement, self.error_code)
+        if self.rule.get("fallback"):
+            self._constrain(Not(guard), self.rule["fallback"], self.error_code)
+        return self.checks
+
+    @staticmethod
+    def _is_constraint(key: str, spec: Any) -> bool:
+        if key.startswith("if_") or key.endswith("_option") or key.endswith("_currency"):
+            return True
+        return isinstance(spec, str) and spec.split(" ", 1)[0] in {"must_not_contain", "allowed_values", "mandatory", "not_allowed"}
+
+    def _guard(self, key: str, spec: Any) -> Any:
+        if key == "currency_mismatch":
+            tags = re.findall(r"field_(\w+)", str(spec))
+            if len(tags) != 2:
+                raise UnsupportedRule(f"cannot read currency_mismatch '{spec}'")
+            return AllOf((Present(tags[0]), Present(tags[1]), Not(SameCurrency(tags[0], tags[1]))))
+        if key in ("sender_bic_country_code", "receiver_bic_country_code"):
+            name = str(spec).split("lookup.", 1)[1] if "lookup." in str(spec) else self.rule.get("lookup_reference")
+            codes = self.lookups.get(name) if name else None
+            if not codes:
+                raise UnsupportedRule(f"lookup '{name}' not available")
+            return CountryIn(key.split("_", 1)[0], frozenset(str(code) for code in codes))
+        tag, attr = _field(key)
+        if attr and attr.startswith("or_"):
+            if spec != "present":
+                raise UnsupportedRule(f"unsupported '{key}: {spec}'")
+            return AnyOf((Present(tag), Present(attr[3:])))
+        if attr == "option":
+            return OptionIn(tag, _letters(spec))
+        if attr:
+            raise UnsupportedRule(f"unsupported condition '{key}'")
+        if spec == "present":
+            return Present(tag)
+        if spec in ("not_present", "not present"):
+            return Not(Present(tag))
+        if isinstance(spec, list):
+            return CodeIn(tag, frozenset(str(item) for item in spec))
+        if isinstance(spec, str) and spec.startswith("contains "):
+            return CodeIn(tag, _words(spec[len("contains "):]))
+        raise UnsupportedRule(f"unsupported condition '{key}: {spec}'")
+
+    def _constrain(self, guard: Any, constraints: Mapping[str, Any], code: Optional[str]) -> None:
+        option_tag = None
+        for key, spec in constraints.items():
+            if key in ("error_code",):
+                continue
+            if key.startswith("if_"):
+                if option_tag is None:
+                    raise UnsupportedRule(f"'{key}' without a preceding option constraint")
+                letter = key[3:].upper()
+                prefix = {"clearing_code_required": "//", "party_identifier_required": "/"}.get(spec)
+                if prefix is None:
+                    raise UnsupportedRule(f"unsupported '{key}: {spec}'")
+                assertion = AnyOf((Not(OptionIn(option_tag, frozenset({letter}))), StartsWith(option_tag, prefix)))
+                self._add(guard, assertion, option_tag, code)
+                continue
+            tag, attr = _field(key)
+            assertion = self._assertion(tag, attr, spec)
+            if attr == "option":
+                option_tag = tag
+            if assertion is not None:
+                self._add(guard, assertion, tag, code)
+
+    def _assertion(self, tag: str, attr: Optional[str], spec: Any) -> Any:
+        if attr == "option":
+            if isinstance(spec, str) and spec.startswith("must_not_be_"):
+                return Not(OptionIn(tag, _letters(spec[len("must_not_be_"):])))
+            if isinstance(spec, str) and spec.startswith("must_be_"):
+                spec = spec[len("must_be_"):]
+            return _optional(tag, OptionIn(tag, _letters(spec), every=True))
+        if attr in ("account", "party_identifier"):
+            if spec == "mandatory":
+                return _optional(tag, StartsWith(tag, "/"))
+            if spec == "not_allowed":
+                return Not(StartsWith(tag, "/"))
+            raise UnsupportedRule(f"unsupported '{attr}: {spec}'")
+        if attr == "currency":
+            match = re.match(r"^must_equal field_(\w+?)_currency$", str(spec))
+            if not match:
+                raise UnsupportedRule(f"unsupported currency constraint '{spec}'")
+            other = match.group(1)
+            return AnyOf((Not(Present(tag)), Not(Present(other)), SameCurrency(tag, other)))
+        if attr:
+            raise UnsupportedRule(f"unsupported constraint 'field_{tag}_{attr}'")
+        if spec == "optional":
+            return None
+        if spec == "mandatory":
+            return Present(tag)
+        if spec == "not_allowed":
+            return Not(Present(tag))
+        list_spec = _LIST_SPEC.match(str(spec))
+        if list_spec:
+            codes = _words(list_spec.group(2))
+            if list_spec.group(1) == "allowed_values":
+                return _optional(tag, CodeIn(tag, codes, every=True))
+            return Not(CodeIn(tag, codes))
+        raise UnsupportedRule(f"unsupported constraint '{tag}: {spec}'")
+
+    def _add(self, guard: Any, assertion: Any, tag: str, code: Optional[str]) -> None:
+        self.checks.append((guard, assertion, tag, code))
+
+
+def compile_network_rules(rules: Iterable[Dict[str, Any]], lookups: Optional[Mapping[str, Any]] = None) -> NetworkRulePlan:
+    """Compile the rules of one ``*networkvalidation_rules.yaml`` file into a NetworkRulePlan."""
+    interner = _Interner()
+    checks: List[NetworkCheck] = []
+    skipped: List[Tuple[str, str]] = []
+    for rule in rules:
+        compiler = _RuleCompiler(rule, lookups or {})
+        if "sequence" in rule:
+            skipped.append((compiler.rule_id, f"sequence {rule['sequence']} rules are evaluated per occurrence"))
+            continue
+        try:
+            compiled = compiler.compile()
+        except UnsupportedRule as exc:
+            skipped.append((compiler.rule_id, str(exc)))
+            continue
+        for guard, assertion, tag, code in compiled:
+            checks.append(
+                NetworkCheck(
+                    rule_id=compiler.rule_id,
+                    guard=interner.add(guard),
+                    assertion=interner.add(assertion),
+                    field=tag,
+                    code=code,
+                    message=compiler.message,
+                )
+            )
+    return NetworkRulePlan(slots=tuple(interner.slots), checks=tuple(checks), skipped=tuple(skipped))
+
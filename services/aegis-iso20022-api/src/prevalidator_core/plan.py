@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .formats import compile_format
+from .models import ValidationError
+from .rules import RULES, RuleFunc
+
+_NO_VALUES: List[str] = []
+
+
+@dataclass(frozen=True)
+class FieldCheck:
+    """One ``fieldvalidations.yaml`` entry with its tag lookups and rules resolved."""
+
+    tag: str
+    # Exact parsed-field keys tried in order (``59a`` -> 59A, 59a, 59).
+    keys: Tuple[str, ...]
+    # Option prefix collected across ``<prefix><letter>`` keys (``59a`` -> "59"), or None.
+    option_prefix: Optional[str]
+    mandatory: bool
+    # (bound rule, error code); unknown rule names are dropped at compile time.
+    rules: Tuple[Tuple[RuleFunc, Optional[str]], ...]
+    # Compiled ``format`` of the tag, applied to every value found for it.
+    format: Optional[RuleFunc] = None
+    # (parsed-field key, compiled ``option_X.format``) for optioned tags (``53a`` -> 53A, 53B, 53D).
+    option_formats: Tuple[Tuple[str, RuleFunc], ...] = ()
+
+
+def _field_keys(tag: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+    keys = [tag.upper(), tag]
+    option_prefix = None
+    if len(tag) > 2 and tag[-1].isalpha() and tag[-1].islower():
+        base = tag[:-1]
+        keys += [base, base.upper()]
+        option_prefix = base.upper()
+    return tuple(dict.fromkeys(keys)), option_prefix
+
+
+def option_index(fields: Mapping[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Group field values by option prefix in one pass: ``59A`` and ``59F`` both
+    land under ``"59"`` (a key equal to the prefix is included too), in field order.
+    """
+    index: Dict[str, List[str]] = {}
+    for key, vals in fields.items():
+        upper_key = key.upper()
+        index.setdefault(upper_key, []).extend(vals)
+        if upper_key[-1:].isalpha():
+            index.setdefault(upper_key[:-1], []).extend(vals)
+    return index
+
+
+@dataclass(frozen=True)
+class PrevalidationPlan:
+    """
+    The field definitions of one MT type compiled for repeated use: tag lookups
+    pre-resolved, rule names bound to callables and definitions without a
+    presence rule or known value rule dropped.
+    """
+
+    checks: Tuple[FieldCheck, ...]
+
+    def validate(self, fields: Mapping[str, List[str]]) -> List[ValidationError]:
+        """Presence errors (in definition order) followed by value errors, as one pass over the checks."""
+        options: Optional[Dict[str, List[str]]] = None
+        presence_errors: List[ValidationError] = []
+        value_errors: List[ValidationError] = []
+        for check in self.checks:
+            for key in check.keys:
+                if key in fields:
+                    values = fields[key]
+                    break
+            else:
+                if check.option_prefix is None:
+                    values = _NO_VALUES
+                else:
+                    # Built on the first optioned tag that has no exact key.
+                    if options is None:
+                        options = option_index(fields)
+                    values = options.get(check.option_prefix, _NO_VALUES)
+            if check.mandatory and (not values or all(v.strip() == "" for v in values)):
+                presence_errors.append(ValidationError(field=check.tag, message="Field is mandatory but missing", code="PRESENCE"))
+            if check.format is not None:
+                self._check_format(check.tag, check.format, values, value_errors)
+            for key, validator in check.option_formats:
+                if key in fields:
+                    self._check_format(check.tag, validator, fields[key], value_errors)
+            if not check.rules:
+                continue
+            for idx, value in enumerate(values, start=1):
+                for rule, error_code in check.rules:
+                    error_message = rule(value)
+                    if error_message:
+                        value_errors.append(ValidationError(field=check.tag, message=error_message, code=error_code, occurrence=idx))
+        return presence_errors + value_errors
+
+    def validate_many(self, fields_list: Sequence[Mapping[str, List[str]]]) -> List[List[ValidationError]]:
+        """
+        ``validate`` for a group of messages of this type, evaluated column by
+        column: each check collects its values from every message, then runs its
+        format and rules once per distinct value in that column (batches repeat
+        23B, 71A, currencies and BICs heavily). The result per message is the
+        same list ``validate`` returns.
+        """
+        count = len(fields_list)
+        options: List[Optional[Dict[str, List[str]]]] = [None] * count
+        presence_errors: List[List[ValidationError]] = [[] for _ in range(count)]
+        value_errors: List[List[ValidationError]] = [[] for _ in range(count)]
+        for check in self.checks:
+            column = []
+            for position, fields in enumerate(fields_list):
+                for key in check.keys:
+                    if key in fields:
+                        values = fields[key]
+                        break
+                else:
+                    if check.option_prefix is None:
+                        values = _NO_VALUES
+                    else:
+                        if options[position] is None:
+                            options[position] = option_index(fields)
+                        values = options[position].get(check.option_prefix, _NO_VALUES)  # type: ignore[union-attr]
+                column.append(values)
+            if check.mandatory:
+                for position, values in enumerate(column):
+                    if not values or all(v.strip() == "" for v in values):
+                        presence_errors[position].append(ValidationError(field=check.tag, message="Field is mandatory but missing", code="PRESENCE"))
+            if check.format is not None:
+                self._check_format_column(check.tag, check.format, column, value_errors)
+            for key, validator in check.option_formats:
+                self._check_format_column(check.tag, validator, [fields.get(key, _NO_VALUES) for fields in fields_list], value_errors)
+            if not check.rules:
+                continue
+            outcomes: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+            for position, values in enumerate(column):
+                for idx, value in enumerate(values, start=1):
+                    failures = outcomes.get(value)
+                    if failures is None:
+                        failures = outcomes[value] = []
+                        for rule, error_code in check.rules:
+                            error_message = rule(value)
+                            if error_message:
+                                failures.append((error_message, error_code))
+                    for error_message, error_code in failures:
+                        value_errors[position].append(ValidationError(field=check.tag, message=error_message, code=error_code, occurrence=idx))
+        return [presence + values for presence, values in zip(presence_errors, value_errors)]
+
+    @staticmethod
+    def _check_format_column(tag: str, validator: RuleFunc, column: List[List[str]], errors: List[List[ValidationError]]) -> None:
+        outcomes: Dict[str, Optional[str]] = {}
+        for position, values in enumerate(column):
+            for idx, value in enumerate(values, start=1):
+                if not value.strip():
+                    continue
+                if value not in outcomes:
+                    outcomes[value] = validator(value)
+                error_message = outcomes[value]
+                if error_message:
+                    errors[position].append(ValidationError(field=tag, message=error_message, code="FORMAT", occurrence=idx))
+
+    @staticmethod
+    def _check_format(tag: str, validator: RuleFunc, values: List[str], errors: List[ValidationError]) -> None:
+        for idx, value in enumerate(values, start=1):
+            if value.strip():
+                error_message = validator(value)
+                if error_message:
+                    errors.append(ValidationError(field=tag, message=error_message, code="FORMAT", occurrence=idx))
+
+
+def _option_formats(field_def: Dict[str, Any], option_prefix: str) -> Tuple[Tuple[str, RuleFunc], ...]:
+    """``option_A: {format: ...}`` entries keyed by parsed field (``option_`` is the unlettered tag)."""
+    formats = []
+    for key, option in field_def.items():
+        if not str(key).startswith("option_") or not isinstance(option, dict) or not option.get("format"):
+            continue
+        validator = compile_format(str(option["format"]))
+        if validator is not None:
+            formats.append((option_prefix + str(key)[len("option_"):].upper(), validator))
+    return tuple(formats)
+
+
+def compile_definitions(definitions: Sequence[Dict[str, Any]], check_formats: bool = False) -> PrevalidationPlan:
+    """
+    Compile the ``fieldvalidations.yaml`` entries of one MT type into a
+    PrevalidationPlan. With ``check_formats`` each ``format`` / ``option_X.format``
+    is compiled too and checked against every value (code ``FORMAT``).
+    """
+    checks = []
+    for field_def in definitions:
+        tag = field_def.get("tag")
+        if not tag:
+            continue
+        tag = str(tag)
+        rules = []
+        for validation in field_def.get("validations") or []:
+            if not isinstance(validation, dict) or not validation.get("rule"):
+                continue
+            rule = RULES.get(validation["rule"])
+            if rule is not None:
+                rules.append((rule, validation.get("error_code")))
+        mandatory = field_def.get("presence") == "mandatory"
+        keys, option_prefix = _field_keys(tag)
+        field_format = compile_format(str(field_def["format"])) if check_formats and field_def.get("format") else None
+        option_formats = _option_formats(field_def, option_prefix) if check_formats and option_prefix else ()
+        if not mandatory and not rules and field_format is None and not option_formats:
+            continue
+        checks.append(FieldCheck(tag, keys, option_prefix, mandatory, tuple(rules), field_format, option_formats))
+    return PrevalidationPlan(checks=tuple(checks))
@@ -2,13 +2,10 @@ from __future__ import annotations
 
 import datetime as _dt
 import re
-from typing import Callable, Dict, Optional, Set
+from typing import Callable, Dict, Optional
 
-from .loader import FieldDefinitionsLoader
-
-X_CHARSET = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789/ -?:().,'+\r\n")
-
-_LOOKUP_CACHE: Dict[str, Set[str]] = {}
+from .formats import charset_pattern
+from .lookups import get_lookup_index
 
 
 RuleFunc = Callable[[str], Optional[str]]
@@ -84,9 +81,9 @@ def payee_account_must_not_be_present(value: str) -> Optional[str]:
 
 
 def value_must_use_x_charset(value: str) -> Optional[str]:
-    for ch in value:
-        if ch not in X_CHARSET:
-            return f"Character '{ch}' not allowed in X charset"
+    bad = charset_pattern("X").search(value)
+    if bad:
+        return f"Character '{bad.group()}' not allowed in X charset"
     return None
 
 
@@ -111,28 +108,14 @@ def mt_number_and_date(value: str) -> Optional[str]:
     return None
 
 
-def _lookup_codes(name: str) -> Set[str]:
-    if name in _LOOKUP_CACHE:
-        return _LOOKUP_CACHE[name]
-    loader = FieldDefinitionsLoader()
-    lookups = loader.get_lookups()
-    values = lookups.get(name, {}) if isinstance(lookups, dict) else {}
-    codes = {code.upper() for code in values.keys()}
-    _LOOKUP_CACHE[name] = codes
-    return codes
-
-
 def mt196_rjcr_pdcr_reason_codes(value: str) -> Optional[str]:
     if not value:
         return None
     text = value.upper()
     if "RJCR" not in text and "PDCR" not in text:
         return None
-    codes = _lookup_codes("mt196_reason_codes")
-    if not codes:
-        return None
-    pattern = r"\b(" + "|".join(re.escape(code) for code in sorted(codes, key=len, reverse=True)) + r")\b"
-    if re.search(pattern, text):
+    index = get_lookup_index()
+    if not index.codes_for("mt196_reason_codes") or index.find_code("mt196_reason_codes", text):
         return None
     return "Reason code required when RJCR or PDCR is reported"
 
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 import io
-import re
 import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import BinaryIO, Dict, Iterable, Iterator, List
 
 
 class BatchParseError(ValueError):
@@ -26,9 +25,6 @@ class BatchFile:
     messages: List[BatchMessage]
 
 
-_MESSAGE_SPLIT = re.compile(r"\n\$\s*\n", re.MULTILINE)
-
-
 def _parse_kv_line(line: str, expected_prefix: str) -> Dict[str, str]:
     line = line.strip()
     if not line:
@@ -47,83 +43,128 @@ def _parse_kv_line(line: str, expected_prefix: str) -> Dict[str, str]:
     return data
 
 
-def parse_batch_dat(text: str, source_name: str) -> BatchFile:
-    normalized = text.replace("\r\n", "\n").strip()
-    if not normalized:
-        raise BatchParseError(f"{source_name}: batch content is empty")
-
-    lines = normalized.splitlines()
-    if len(lines) < 3:
-        raise BatchParseError(f"{source_name}: expected header, messages, and trailer lines")
-
-    header_line = lines[0]
-    trailer_line = lines[-1]
-    body = "\n".join(lines[1:-1]).strip()
-
-    header = _parse_kv_line(header_line, "HDR")
-    if "CreateDate" in header:
-        raw_date = header["CreateDate"]
-        if len(raw_date) == 10:
-            header["CreateDate"] = raw_date
-        else:
-            header["CreateDate"] = raw_date
-    trailer = _parse_kv_line(trailer_line, "TRL")
-
-    if not body:
-        raise BatchParseError(f"{source_name}: no MT messages found in batch body")
-
-    segments = _MESSAGE_SPLIT.split(body)
-    messages: List[BatchMessage] = []
-    for segment in segments:
-        segment = segment.strip()
-        if not segment:
-            continue
-        messages.append(BatchMessage(index=len(messages) + 1, mt_raw=segment))
+def _is_separator(line: str) -> bool:
+    return line.startswith("$") and not line[1:].strip()
 
-    if not messages:
-        raise BatchParseError(f"{source_name}: no MT messages found in batch body")
 
-    return BatchFile(
-        source_name=source_name,
-        header=header,
-        trailer=trailer,
-        messages=messages,
-    )
+def iter_text_lines(stream: BinaryIO) -> Iterator[str]:
+    """Decode ``stream`` line by line (UTF-8, falling back to latin-1 per line)."""
+    for raw_line in stream:
+        try:
+            text = raw_line.decode("utf-8")
+        except UnicodeDecodeError:
+            text = raw_line.decode("latin-1")
+        yield from text.splitlines()
+
+
+class BatchStream:
+    """
+    A batch file read incrementally.
+
+    The HDR line is parsed when the stream is opened, ``messages`` yields
+    ``BatchMessage``s lazily as each ``$`` separator is reached, and the TRL
+    line (the last non-blank line) is parsed once the messages are exhausted.
+    Only the message being assembled is held in memory.
+    """
+
+    def __init__(self, source_name: str, lines: Iterable[str]) -> None:
+        self.source_name = source_name
+        self.trailer: Dict[str, str] = {}
+        self.message_count = 0
+        self._lines = iter(lines)
+        self.header = self._read_header()
+        self.messages: Iterator[BatchMessage] = self._iter_messages()
+
+    def _read_header(self) -> Dict[str, str]:
+        for line in self._lines:
+            if line.strip():
+                return _parse_kv_line(line, "HDR")
+        raise BatchParseError(f"{self.source_name}: batch content is empty")
+
+    def _iter_messages(self) -> Iterator[BatchMessage]:
+        segment: List[str] = []
+        # Lines from the last non-blank line onwards: that line is the trailer
+        # unless more content follows.
+        tail: List[str] = []
+        body_lines = 0
+
+        def flush(line: str) -> Iterator[BatchMessage]:
+            if _is_separator(line):
+                text = "\n".join(segment).strip()
+                segment.clear()
+                if text:
+                    self.message_count += 1
+                    yield BatchMessage(index=self.message_count, mt_raw=text)
+            else:
+                segment.append(line)
+
+        for line in self._lines:
+            if line.strip():
+                for held in tail:
+                    body_lines += 1
+                    yield from flush(held)
+                tail = [line]
+            elif tail:
+                tail.append(line)
+            else:
+                body_lines += 1
+                yield from flush(line)
+
+        if not tail or not body_lines:
+            raise BatchParseError(f"{self.source_name}: expected header, messages, and trailer lines")
+        self.trailer = _parse_kv_line(tail[0], "TRL")
+        yield from flush("$")
+        if not self.message_count:
+            raise BatchParseError(f"{self.source_name}: no MT messages found in batch body")
+
+    def to_batch_file(self) -> BatchFile:
+        """Read the whole stream into a ``BatchFile``."""
+        messages = list(self.messages)
+        return BatchFile(source_name=self.source_name, header=self.header, trailer=self.trailer, messages=messages)
 
 
-def parse_batch_payload(filename: str, data: bytes) -> List[BatchFile]:
-    if not data:
+def parse_batch_dat(text: str, source_name: str) -> BatchFile:
+    return BatchStream(source_name, text.splitlines()).to_batch_file()
+
+
+def iter_batch_payload(filename: str, stream: BinaryIO) -> Iterator[BatchStream]:
+    """
+    Open each batch in an uploaded ``.dat``/``.txt`` file or ``.zip`` archive as a
+    ``BatchStream``. ``stream`` must be seekable; ZIP members are decompressed as
+    they are read. Each stream should be consumed before the next one is requested.
+    """
+    if not stream.read(1):
         raise BatchParseError("Uploaded file is empty")
+    stream.seek(0)
 
     suffix = Path(filename or "").suffix.lower()
 
     if suffix == ".zip":
         try:
-            zf = zipfile.ZipFile(io.BytesIO(data))
+            zf = zipfile.ZipFile(stream)
         except zipfile.BadZipFile as exc:
             raise BatchParseError("Provided ZIP archive is invalid") from exc
-        batches: List[BatchFile] = []
-        for info in zf.infolist():
-            if info.is_dir():
-                continue
-            inner_path = Path(info.filename)
-            if inner_path.suffix.lower() not in {".dat", ".txt"}:
-                continue
-            content = zf.read(info)
-            try:
-                text = content.decode("utf-8")
-            except UnicodeDecodeError:
-                text = content.decode("latin-1")
-            batches.append(parse_batch_dat(text, inner_path.name))
-        if not batches:
+        found = False
+        with zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                inner_path = Path(info.filename)
+                if inner_path.suffix.lower() not in {".dat", ".txt"}:
+                    continue
+                found = True
+                with zf.open(info) as member:
+                    yield BatchStream(inner_path.name, iter_text_lines(member))
+        if not found:
             raise BatchParseError("ZIP archive does not contain any .dat or .txt batch files")
-        return batches
+        return
 
     if suffix in {".dat", ".txt"}:
-        try:
-            text = data.decode("utf-8")
-        except UnicodeDecodeError:
-            text = data.decode("latin-1")
-        return [parse_batch_dat(text, Path(filename or 'batch.dat').name)]
+        yield BatchStream(Path(filename or "batch.dat").name, iter_text_lines(stream))
+        return
 
     raise BatchParseError("Unsupported file type. Provide .dat, .txt, or .zip containing batch files.")
+
+
+def parse_batch_payload(filename: str, data: bytes) -> List[BatchFile]:
+    return [batch.to_batch_file() for batch in iter_batch_payload(filename, io.BytesIO(data))]
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..prevalidator_core.lookups import get_lookup_store
+from ..translator_core.mapping_store import get_mapping_store
+from ..translator_core.transformer import warm_mapping_plans
+from ..translator_core.xsd_validator import warm_schema_cache
+from .batch import BatchStream, iter_batch_payload
+from .pipeline import process_batch_messages
+
+logger = logging.getLogger(__name__)
+
+# (batch position, message index, mt_raw, batch source name)
+BatchItem = Tuple[int, int, str, str]
+
+
+def warm_worker() -> None:
+    """
+    Process-pool initializer: load the mapping store, compile every mapping plan
+    and precompile the XSDs so the first chunk a worker receives runs hot.
+    """
+    store = get_mapping_store()
+    store.start_auto_reload(float(os.getenv("MAPPING_RELOAD_INTERVAL", "5")))
+    get_lookup_store().start_auto_reload(float(os.getenv("LOOKUPS_RELOAD_INTERVAL", "5")))
+    plans = warm_mapping_plans(profile.mapping for profile in store.iter_profiles() if profile.mapping)
+    schemas = warm_schema_cache(store.iter_targets())
+    logger.info("Batch worker %s warmed %s mapping plan(s) and %s schema(s)", os.getpid(), plans, schemas)
+
+
+def translate_chunk(chunk: Sequence[BatchItem], prevalidate: bool) -> List[Tuple[int, dict]]:
+    """
+    Translate a chunk of batch messages inside a worker; results keep the chunk
+    order. Documents in the chunk that share a schema are validated together.
+    """
+    entries = process_batch_messages([(index, mt_raw, source_name) for _, index, mt_raw, source_name in chunk], prevalidate)
+    return [(item[0], entry) for item, entry in zip(chunk, entries)]
+
+
+def _chunked(items: Iterable[BatchItem], size: int, workers: int) -> Iterator[List[BatchItem]]:
+    """
+    Split ``items`` into chunks that start at one message and double after every
+    ``workers`` chunks up to ``size``. A short upload is spread over every
+    worker while a long one settles on full chunks, without knowing its length.
+    """
+    iterator = iter(items)
+    current = 1
+    emitted = 0
+    while True:
+        chunk = list(islice(iterator, current))
+        if not chunk:
+            return
+        yield chunk
+        emitted += 1
+        if emitted % workers == 0:
+            current = min(size, current * 2)
+
+
+class BatchEngine:
+    """
+    Long-lived worker pool for ``/translate/batch``.
+
+    Translation is pure-Python parsing/mapping plus lxml/xmlschema validation and
+    is GIL-bound, so the default executor is a process pool whose workers are
+    warmed once (``warm_worker``) and then reused across requests. Messages are
+    shipped in chunks to amortise pickling/IPC, at most ``max_workers`` chunks
+    are in flight per call, and results are yielded in submission order. If a
+    worker dies the broken pool is replaced and the in-flight chunks are retried
+    once on the new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 16,
+        executor: str = "process",
+        start_method: str = "spawn",
+    ) -> None:
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.executor_kind = executor
+        self.start_method = start_method
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == "thread":
+                        warm_worker()
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        # spawn (not fork): the parent runs reload/emitter threads
+                        # whose locks must not be inherited mid-acquire.
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context(self.start_method),
+                            initializer=warm_worker,
+                        )
+        return self._executor
+
+    def _discard_executor(self, executor: Executor) -> None:
+        """Drop ``executor`` if it is still the current pool, so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def map(
+        self,
+        items: Iterable[BatchItem],
+        prevalidate: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[int, dict]]:
+        """Translate ``items`` and yield ``(batch position, result entry)`` in input order."""
+        workers = min(self.max_workers, max(1, max_workers or self.max_workers))
+        executor = self._get_executor()
+        chunks = _chunked(items, self.chunk_size, workers)
+        # [chunk, future] per in-flight chunk, in submission order.
+        pending: deque = deque()
+        retried = False
+        try:
+            while True:
+                try:
+                    # ``items`` is only advanced when a slot frees up, which gives
+                    # lazy sources (streamed uploads) natural backpressure.
+                    if len(pending) < workers:
+                        chunk = next(chunks, None)
+                        if chunk is not None:
+                            entry = [chunk, None]
+                            pending.append(entry)
+                            entry[1] = executor.submit(translate_chunk, chunk, prevalidate)
+                            continue
+                    if not pending:
+                        return
+                    results = pending[0][1].result()
+                except BrokenProcessPool:
+                    # A worker died (OOM, crash in a C extension) and the pool
+                    # refuses all further work; replace it for this and later calls.
+                    self._discard_executor(executor)
+                    if retried:
+                        raise
+                    retried = True
+                    logger.warning("Batch worker pool broke; retrying %s chunk(s) on a new pool", len(pending))
+                    executor = self._get_executor()
+                    for entry in pending:
+                        entry[1] = executor.submit(translate_chunk, entry[0], prevalidate)
+                    continue
+                pending.popleft()
+                yield from results
+        finally:
+            for _chunk, future in pending:
+                if future is not None:
+                    future.cancel()
+
+    def warm(self) -> None:
+        """Start the pool and run the worker initializers ahead of the first batch."""
+        executor = self._get_executor()
+        for future in [executor.submit(translate_chunk, [], True) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_BATCH_ENGINE: Optional[BatchEngine] = None
+_BATCH_ENGINE_LOCK = threading.Lock()
+
+
+def get_batch_engine() -> BatchEngine:
+    """
+    Return the process-wide batch engine, configured via ``BATCH_MAX_WORKERS``
+    (default: CPU count), ``BATCH_CHUNK_SIZE`` (default 16) and
+    ``BATCH_EXECUTOR`` (``process`` or ``thread``).
+    """
+    global _BATCH_ENGINE
+    if _BATCH_ENGINE is None:
+        with _BATCH_ENGINE_LOCK:
+            if _BATCH_ENGINE is None:
+                max_workers = os.getenv("BATCH_MAX_WORKERS")
+                _BATCH_ENGINE = BatchEngine(
+                    max_workers=int(max_workers) if max_workers else None,
+                    chunk_size=int(os.getenv("BATCH_CHUNK_SIZE", "16")),
+                    executor=os.getenv("BATCH_EXECUTOR", "process").lower(),
+                )
+    return _BATCH_ENGINE
+
+
+def iter_upload_results(
+    filename: str,
+    stream: BinaryIO,
+    prevalidate: bool = True,
+    max_workers: Optional[int] = None,
+    skip: int = 0,
+    opened: Optional[List[BatchStream]] = None,
+) -> Iterator[Tuple[BatchStream, dict]]:
+    """
+    Translate every message of an uploaded batch payload through the shared
+    engine and yield ``(batch, result entry)`` in upload order.
+
+    One pool serves every batch in the upload, so ``max_workers`` bounds the
+    whole upload rather than each batch file. Messages are pulled from the
+    upload only as worker slots free up. The first ``skip`` messages are read
+    but not translated (used to resume a job), and each batch is appended to
+    ``opened`` as it is reached.
+    """
+    batches: List[BatchStream] = opened if opened is not None else []
+
+    def _items():
+        seq = 0
+        for batch in iter_batch_payload(filename, stream):
+            position = len(batches)
+            batches.append(batch)
+            for message in batch.messages:
+                seq += 1
+                if seq > skip:
+                    yield position, message.index, message.mt_raw, batch.source_name
+
+    for position, entry in get_batch_engine().map(_items(), prevalidate=prevalidate, max_workers=max_workers):
+        yield batches[position], entry
@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from .batch import BatchParseError, BatchStream, iter_batch_payload
+from .batch_engine import iter_upload_results
+from .batch_response import BatchSummaryBuilder
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    upload_path TEXT NOT NULL,
+    prevalidate INTEGER NOT NULL,
+    max_workers INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    summary TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _gave_up(attempts: int, error: Optional[str]) -> str:
+    message = f"Gave up after {attempts} attempt(s)"
+    return f"{message}: {error}" if error else message
+
+
+@dataclass
+class BatchJob:
+    id: str
+    filename: str
+    upload_path: str
+    prevalidate: bool
+    max_workers: int
+    status: str
+    processed: int
+    succeeded: int
+    failed: int
+    attempts: int
+    error: Optional[str]
+    summary: Optional[dict]
+    created_at: str
+    updated_at: str
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "BatchJob":
+        data = dict(row)
+        data["prevalidate"] = bool(data["prevalidate"])
+        data["summary"] = json.loads(data["summary"]) if data["summary"] else None
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": {
+                "processed": self.processed,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+            },
+            "attempts": self.attempts,
+            "error": self.error,
+            "summary": self.summary,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class BatchJobStore:
+    """
+    SQLite-backed job state plus one row per translated message.
+
+    Results are appended in upload order and committed together with the job's
+    progress counters, so ``processed`` is always the length of the stored
+    prefix and a restarted job resumes right after it.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.uploads_dir = self.root / "uploads"
+        self.uploads_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "jobs.sqlite3"
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                # Databases created before attempts were counted.
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, filename: str, upload: BinaryIO, prevalidate: bool, max_workers: int) -> BatchJob:
+        """Copy the upload into the store and register a queued job for it."""
+        job_id = uuid.uuid4().hex
+        upload_path = self.uploads_dir / f"{job_id}{Path(filename).suffix.lower()}"
+        with open(upload_path, "wb") as out:
+            shutil.copyfileobj(upload, out)
+        now = _now()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, filename, upload_path, prevalidate, max_workers, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, str(upload_path), int(prevalidate), max_workers, JOB_QUEUED, now, now),
+            )
+        return self.get(job_id)  # type: ignore[return-value]
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return BatchJob.from_row(row) if row else None
+
+    def unfinished(self) -> List[BatchJob]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [BatchJob.from_row(row) for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None, summary: Optional[dict] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, summary = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(summary) if summary is not None else None, _now(), job_id),
+            )
+
+    def start_attempt(self, job_id: str, max_attempts: int) -> Optional[int]:
+        """
+        Claim a queued job for one run: mark it running and return its attempt
+        number, counting this one. Returns None when the job is not queued (another
+        runner holds it) or has already used ``max_attempts``.
+        """
+        with self._connect() as conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE id = ? AND status = ? AND attempts < ?",
+                (JOB_RUNNING, _now(), job_id, JOB_QUEUED, max_attempts),
+            ).rowcount
+            if not claimed:
+                return None
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["attempts"]
+
+    def requeue_running(self) -> int:
+        """Put jobs left ``running`` by a previous process back to ``queued``; returns how many."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (JOB_QUEUED, _now(), JOB_RUNNING)
+            ).rowcount
+
+    def append_results(self, job_id: str, start_seq: int, rows: List[tuple]) -> None:
+        """Store ``(position, source, entry)`` rows as seq ``start_seq + 1 ...`` and bump the counters."""
+        ok = sum(1 for _position, _source, entry in rows if entry["status"] == "ok")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (job_id, seq, position, source, status, body) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, start_seq + offset, position, source, entry["status"], json.dumps(entry))
+                    for offset, (position, source, entry) in enumerate(rows, start=1)
+                ],
+            )
+            conn.execute(
+                "UPDATE jobs SET processed = ?, succeeded = succeeded + ?, failed = failed + ?, updated_at = ? WHERE id = ?",
+                (start_seq + len(rows), ok, len(rows) - ok, _now(), job_id),
+            )
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT source, body FROM results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [{"source": row["source"], **json.loads(row["body"])} for row in rows]
+
+    def position_counts(self, job_id: str) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT position, SUM(status = 'ok') AS succeeded, SUM(status != 'ok') AS failed"
+                " FROM results WHERE job_id = ? GROUP BY position",
+                (job_id,),
+            ).fetchall()
+        return {row["position"]: (row["succeeded"], row["failed"]) for row in rows}
+
+
+class BatchJobsDisabled(RuntimeError):
+    """Raised by ``submit`` when this process does not run batch jobs."""
+
+
+class BatchJobManager:
+    """
+    Runs queued batch jobs on background threads through the shared batch engine.
+
+    ``start`` re-queues every job left ``queued`` or ``running`` by a previous
+    process; those resume after their last committed result. A job whose run
+    fails for any reason other than a bad upload is re-queued after
+    ``retry_backoff * 2 ** (attempt - 1)`` seconds, and marked failed once it
+    has been started ``max_attempts`` times (restarts included). With
+    ``enabled=False`` no runners are started and ``submit`` raises
+    ``BatchJobsDisabled``.
+    """
+
+    def __init__(
+        self,
+        store: BatchJobStore,
+        runners: int = 1,
+        commit_every: int = 64,
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        enabled: bool = True,
+    ) -> None:
+        self.store = store
+        self.enabled = enabled
+        self.runners = max(1, runners)
+        self.commit_every = max(1, commit_every)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = max(0.0, retry_backoff)
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._retries: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._threads or not self.enabled:
+            return
+        # Nothing runs yet in this process, so a job marked running was
+        # interrupted; it must be queued again to be claimable.
+        self.store.requeue_running()
+        for job in self.store.unfinished():
+            self._queue.put(job.id)
+        for n in range(self.runners):
+            thread = threading.Thread(target=self._run_forever, name=f"batch-job-runner-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+            retries, self._retries = self._retries, {}
+            for timer in retries.values():
+                timer.cancel()
+            for _ in threads:
+                self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def submit(self, filename: str, upload: BinaryIO, prevalidate: bool = True, max_workers: int = 4) -> BatchJob:
+        """
+        Persist ``upload`` as a new job and queue it; raises ``BatchParseError``
+        for unusable uploads and ``BatchJobsDisabled`` when jobs are disabled.
+        """
+        if not self.enabled:
+            raise BatchJobsDisabled("Batch jobs are disabled on this instance (BATCH_JOBS_ENABLED=false)")
+        # Reject empty/unsupported files and a bad first HDR line up front.
+        payload = iter_batch_payload(filename, upload)
+        try:
+            next(payload)
+        finally:
+            payload.close()
+        upload.seek(0)
+        job = self.store.create(filename, upload, prevalidate, max_workers)
+        with self._lock:
+            if self._threads:
+                self._queue.put(job.id)
+            else:
+                # Starting the runners queues every unfinished job, this one included.
+                self._start_locked()
+        return job
+
+    def _run_forever(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self.run(job_id)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Batch job %s crashed", job_id)
+
+    def run(self, job_id: str) -> None:
+        """Process (or resume) one job synchronously."""
+        job = self.store.get(job_id)
+        if job is None or job.status != JOB_QUEUED:
+            return
+        attempt = self.store.start_attempt(job_id, self.max_attempts)
+        if attempt is None:
+            if job.attempts >= self.max_attempts:
+                # The last attempt never finished, e.g. it took the process down.
+                self.store.set_status(job_id, JOB_FAILED, error=_gave_up(job.attempts, job.error))
+            return
+        opened: List[BatchStream] = []
+        seq = job.processed
+        pending: List[tuple] = []
+        try:
+            with open(job.upload_path, "rb") as upload:
+                events = iter_upload_results(
+                    job.filename, upload, job.prevalidate, job.max_workers, skip=job.processed, opened=opened
+                )
+                current, position = None, -1
+                for batch, entry in events:
+                    if batch is not current:
+                        current, position = batch, opened.index(batch)
+                    pending.append((position, batch.source_name, entry))
+                    if len(pending) >= self.commit_every:
+                        self.store.append_results(job_id, seq, pending)
+                        seq += len(pending)
+                        pending = []
+        except BatchParseError as exc:
+            self._flush(job_id, seq, pending)
+            self.store.set_status(job_id, JOB_FAILED, error=str(exc))
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep the committed prefix: a retry resumes right after it.
+            self._flush(job_id, seq, pending)
+            if attempt >= self.max_attempts:
+                self.store.set_status(job_id, JOB_FAILED, error=_gave_up(attempt, str(exc)))
+            else:
+                self.store.set_status(job_id, JOB_QUEUED, error=str(exc))
+                self._schedule_retry(job_id, self.retry_backoff * 2 ** (attempt - 1))
+            raise
+        self._flush(job_id, seq, pending)
+        self.store.set_status(job_id, JOB_COMPLETED, summary=self._summary(job_id, opened))
+
+    def _schedule_retry(self, job_id: str, delay: float) -> None:
+        def _requeue() -> None:
+            with self._lock:
+                if self._retries.pop(job_id, None) is None:
+                    return
+            self._queue.put(job_id)
+
+        timer = threading.Timer(delay, _requeue)
+        timer.daemon = True
+        with self._lock:
+            previous = self._retries.pop(job_id, None)
+            if previous is not None:
+                previous.cancel()
+            self._retries[job_id] = timer
+        timer.start()
+
+    def _flush(self, job_id: str, seq: int, pending: List[tuple]) -> None:
+        if pending:
+            self.store.append_results(job_id, seq, pending)
+
+    def _summary(self, job_id: str, opened: List[BatchStream]) -> dict:
+        counts = self.store.position_counts(job_id)
+        summary = BatchSummaryBuilder()
+        for position, batch in enumerate(opened):
+            succeeded, failed = counts.get(position, (0, 0))
+            summary.record(batch, succeeded=succeeded, failed=failed)
+        return summary.summary()
+
+
+_JOB_MANAGER: Optional[BatchJobManager] = None
+_JOB_MANAGER_LOCK = threading.Lock()
+
+
+def get_batch_job_manager() -> BatchJobManager:
+    """
+    Return the process-wide job manager. Job state lives under ``BATCH_JOB_DIR``
+    (default: ``<tmp>/aegis-batch-jobs``; point it at a volume for durability),
+    with ``BATCH_JOB_RUNNERS`` concurrent jobs (default 1). Failed runs are
+    retried up to ``BATCH_JOB_MAX_ATTEMPTS`` times in total (default 3), the
+    first retry after ``BATCH_JOB_RETRY_BACKOFF`` seconds (default 5), doubling.
+    ``BATCH_JOBS_ENABLED=false`` disables runners and submissions.
+    """
+    global _JOB_MANAGER
+    if _JOB_MANAGER is None:
+        with _JOB_MANAGER_LOCK:
+            if _JOB_MANAGER is None:
+                root = os.getenv("BATCH_JOB_DIR") or str(Path(tempfile.gettempdir()) / "aegis-batch-jobs")
+                _JOB_MANAGER = BatchJobManager(
+                    BatchJobStore(Path(root)),
+                    runners=int(os.getenv("BATCH_JOB_RUNNERS", "1")),
+                    max_attempts=int(os.getenv("BATCH_JOB_MAX_ATTEMPTS", "3")),
+                    retry_backoff=float(os.getenv("BATCH_JOB_RETRY_BACKOFF", "5")),
+                    enabled=os.getenv("BATCH_JOBS_ENABLED", "true").lower() == "true",
+                )
+    return _JOB_MANAGER
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import BatchParseError, BatchStream
+
+# (batch the message came from, per-message result entry)
+BatchEvent = Tuple[BatchStream, dict]
+
+
+class BatchSummaryBuilder:
+    """Accumulates per-batch and overall counts while results stream past."""
+
+    def __init__(self) -> None:
+        self._batches: List[BatchStream] = []
+        self._counts: Dict[int, List[int]] = {}
+
+    def add(self, batch: BatchStream, entry: dict) -> None:
+        ok = entry["status"] == "ok"
+        self.record(batch, succeeded=int(ok), failed=int(not ok))
+
+    def record(self, batch: BatchStream, succeeded: int = 0, failed: int = 0) -> None:
+        key = id(batch)
+        if key not in self._counts:
+            self._batches.append(batch)
+            self._counts[key] = [0, 0]
+        self._counts[key][0] += succeeded
+        self._counts[key][1] += failed
+
+    def batch_summary(self, batch: BatchStream) -> dict:
+        succeeded, failed = self._counts.get(id(batch), (0, 0))
+        return {
+            "source": batch.source_name,
+            "header": batch.header,
+            "trailer": batch.trailer,
+            "summary": {
+                "total": batch.message_count,
+                "succeeded": succeeded,
+                "failed": failed,
+            },
+        }
+
+    def summary(self, processed_at: Optional[datetime] = None) -> dict:
+        batches = [self.batch_summary(batch) for batch in self._batches]
+        processed_at = processed_at or datetime.now(timezone.utc)
+        return {
+            "batches": batches,
+            "summary": {
+                "total_batches": len(batches),
+                "total_messages": sum(b["summary"]["total"] for b in batches),
+                "succeeded": sum(b["summary"]["succeeded"] for b in batches),
+                "failed": sum(b["summary"]["failed"] for b in batches),
+                "processed_at": processed_at.isoformat(),
+            },
+        }
+
+
+def zip_entry(batch_id: str, result: dict) -> Tuple[str, str]:
+    """Return the archive path and content for one per-message result."""
+    prefix = f"{batch_id}/record-{result['index']:03d}"
+    if result["status"] == "ok" and result.get("xml"):
+        mx_type = result.get("mx_type") or "mx"
+        return f"{prefix}_{mx_type}.xml", result["xml"]
+    return f"{prefix}_error.json", json.dumps(result, indent=2)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink that ZipFile writes into; drained after every entry."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parse_error(exc: BatchParseError) -> dict:
+    return {"status_code": 400, "detail": str(exc)}
+
+
+def iter_zip_stream(events: Iterable[BatchEvent]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive incrementally: one entry per message as it completes and
+    ``summary.json`` (counts only, no per-message results) as the last entry.
+    A batch that turns out to be malformed part-way adds ``error.json`` instead.
+    """
+    sink = _ChunkSink()
+    summary = BatchSummaryBuilder()
+    with zipfile.ZipFile(sink, mode="w") as zf:
+        try:
+            for batch, result in events:
+                summary.add(batch, result)
+                zf.writestr(*zip_entry(batch.source_name, result))
+                yield sink.drain()
+        except BatchParseError as exc:
+            zf.writestr("error.json", json.dumps(_parse_error(exc), indent=2))
+        zip_meta = summary.summary()
+        zip_meta["generated_at"] = zip_meta["summary"]["processed_at"]
+        zf.writestr("summary.json", json.dumps(zip_meta, indent=2))
+    yield sink.drain()
+
+
+def iter_ndjson_stream(events: Iterable[BatchEvent]) -> Iterator[bytes]:
+    """
+    Yield one JSON line per message (``type: "result"``) as it completes, then a
+    final ``type: "summary"`` line; a mid-stream parse error adds ``type: "error"``.
+    """
+    summary = BatchSummaryBuilder()
+    try:
+        for batch, result in events:
+            summary.add(batch, result)
+            line = {"type": "result", "source": batch.source_name, **result}
+            yield (json.dumps(line) + "\n").encode("utf-8")
+    except BatchParseError as exc:
+        yield (json.dumps({"type": "error", **_parse_error(exc)}) + "\n").encode("utf-8")
+    yield (json.dumps({"type": "summary", **summary.summary()}) + "\n").encode("utf-8")
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from ..prevalidator_core import PrevalidationEngine
+from ..translator_core.audit import AuditRecord, new_correlation_id
+from ..translator_core.mapping_store import MappingStore, get_mapping_store
+from ..translator_core.metrics import timer
+from ..translator_core.mx_builder import MXBuilder, MXDocument
+from ..translator_core.parsed_message import ParsedMessage
+from ..translator_core.transformer import Transformer
+from ..translator_core.xsd_validator import XSDValidator
+
+logger = logging.getLogger(__name__)
+
+prevalidation_engine = PrevalidationEngine()
+
+
+def _classify_mt195_variant(message: ParsedMessage) -> str | None:
+    text_normalized = message.field_text("72").replace("-", " ")
+    if not text_normalized:
+        return None
+    if "/QUERY/UNABLE TO APPLY" in text_normalized:
+        return "unable_to_apply"
+    if "/QUERY/CLAIM NON RECEIPT" in text_normalized:
+        return "claim_non_receipt"
+    if "/QUERY/REQUEST FOR DUPLICATE" in text_normalized:
+        return "request_duplicate"
+    return None
+
+
+def _classify_mt196_variant(message: ParsedMessage) -> str | None:
+    text = message.field_text("76")
+    if not text:
+        return None
+    keywords = ("CANCEL", "RJCR", "PDCR", "CNCL", "ACCR")
+    return "cancellation" if any(key in text for key in keywords) else "information"
+
+
+def _classify_mt102_variant(message: ParsedMessage) -> str | None:
+    if "119:STP" in message.block_text("3"):
+        return "stp"
+    return None
+
+
+_VARIANT_CLASSIFIERS = {
+    "MT195": _classify_mt195_variant,
+    "MT196": _classify_mt196_variant,
+    "MT102": _classify_mt102_variant,
+}
+
+
+@dataclass
+class PendingTranslation:
+    """A mapped and built message whose MX document still has to be schema-validated."""
+
+    corr: str
+    mt_type: str
+    mx_type: str
+    variant: str | None
+    audit_details: dict
+    document: MXDocument
+    validator: XSDValidator
+    store: MappingStore
+    elapsed: Callable[[], float]
+
+    def complete(self, ok: bool, errors: List[str]) -> dict:
+        """Assemble the translate response from the validation outcome."""
+        validator_engine = self.validator.engine_name()
+
+        mp_info = self.store.resolve(self.mt_type, self.variant)
+        if not mp_info[0]:
+            mp_info = self.store.resolve(self.mt_type)
+        mapping_profile = mp_info[0] or "unknown"
+
+        record = AuditRecord(
+            correlation_id=self.corr,
+            source_mt=self.mt_type,
+            target_mx=self.mx_type,
+            mapping_profile=str(mapping_profile),
+            xsd_version=self.mx_type,
+            mapped_count=len(self.audit_details["mapped"]),
+            error_count=len(self.audit_details["errors"]) + (0 if ok else len(errors)),
+            validation_ok=ok,
+            latency_ms=self.elapsed(),
+            details={
+                "transform": self.audit_details,
+                "xsd_errors": errors,
+            },
+            xml_validator=validator_engine,
+        )
+
+        return {
+            "mx_type": self.mx_type,
+            "xml": self.document.xml,
+            "validation": {"ok": ok, "errors": errors},
+            "metrics": {"latency_ms": record.latency_ms},
+            "audit": record.__dict__,
+        }
+
+
+def prepare_translation(
+    mt_raw: str, force_type: str | None = None, prevalidate: bool = True
+) -> dict | PendingTranslation:
+    """
+    Run one MT message through detection, prevalidation, mapping and MX build.
+    Returns the final response for pass-through messages, otherwise the pending
+    schema validation. Raises ``HTTPException`` for client errors, like the route.
+    """
+    corr = new_correlation_id(mt_raw[:5000])
+    with timer() as elapsed:
+        message = ParsedMessage.from_raw(mt_raw, force_type=force_type)
+        mt_type = message.mt_type
+        if not mt_type:
+            raise HTTPException(400, "Could not detect MT type")
+
+        store = get_mapping_store()
+
+        classify = _VARIANT_CLASSIFIERS.get(mt_type)
+        variant = classify(message) if classify else None
+
+        if prevalidate:
+            pre_result = prevalidation_engine.validate(mt_raw, parsed=message)
+            if not pre_result.valid:
+                raise HTTPException(
+                    status_code=422,
+                    detail={
+                        "message": "Prevalidation failed",
+                        "result": pre_result.to_dict(),
+                    },
+                )
+
+        def _pass_through():
+            elapsed_ms = elapsed()
+            return {
+                "status": "ok",
+                "code": "NO_CONVERSION_APPLICABLE",
+                "mt_type": mt_type.replace("MT", "", 1),
+                "mx_type": None,
+                "mode": "pass_through",
+                "payload_preserved": True,
+                "notes": f"{mt_type} carried unchanged. No ISO 20022 conversion performed.",
+                "mt_raw": mt_raw,
+                "validation": {"ok": True, "errors": []},
+                "metrics": {"latency_ms": elapsed_ms},
+            }
+
+        try:
+            mapping, mx_type, xsd_dir = store.load_profile(mt_type, variant=variant)
+        except FileNotFoundError:
+            return _pass_through()
+
+        if not mapping or not mx_type:
+            return _pass_through()
+
+        # optional guard: lightweight XSD index (reuse your iso-bootstrap xsd_index.py if desired)
+        transformer = Transformer(xsd_index=None)
+        flat, audit_details = transformer.apply(mapping, message)
+
+        document = MXBuilder().build_document(mx_type, flat)
+        validator = XSDValidator(xsd_dir, mx_type)
+        return PendingTranslation(
+            corr=corr,
+            mt_type=mt_type,
+            mx_type=mx_type,
+            variant=variant,
+            audit_details=audit_details,
+            document=document,
+            validator=validator,
+            store=store,
+            elapsed=elapsed,
+        )
+
+
+def translate_message(mt_raw: str, force_type: str | None = None, prevalidate: bool = True) -> dict:
+    """
+    Run one MT message through detection, prevalidation, mapping, MX build and
+    XSD validation. Raises ``HTTPException`` for client errors, like the route.
+    """
+    result = prepare_translation(mt_raw, force_type=force_type, prevalidate=prevalidate)
+    if isinstance(result, PendingTranslation):
+        return result.complete(*result.validator.validate_document(result.document))
+    return result
+
+
+def _batch_error_entry(index: int, source_name: str, exc: Exception) -> dict:
+    if isinstance(exc, HTTPException):
+        return {
+            "index": index,
+            "status": "error",
+            "error": {
+                "status_code": exc.status_code,
+                "detail": exc.detail,
+            },
+        }
+    logger.error(
+        "Exception occurred while processing message index %s in batch %s", index, source_name, exc_info=exc
+    )
+    return {
+        "index": index,
+        "status": "error",
+        "error": {
+            "status_code": 500,
+            "detail": "Internal server error",
+        },
+    }
+
+
+def _batch_ok_entry(index: int, result: dict) -> dict:
+    audit = result.get("audit", {}) or {}
+    return {
+        "index": index,
+        "status": "ok",
+        "mt_type": audit.get("source_mt") or result.get("mt_type"),
+        "mx_type": result.get("mx_type"),
+        "validation": result.get("validation"),
+        "xml": result.get("xml"),
+        "metrics": result.get("metrics"),
+        "audit": result.get("audit"),
+        "xml_validator": audit.get("xml_validator"),
+    }
+
+
+def process_batch_messages(messages: Sequence[Tuple[int, str, str]], prevalidate: bool) -> List[dict]:
+    """
+    Translate ``(index, mt_raw, source_name)`` batch messages and return their
+    result entries in order; never raises. Documents that share a schema are
+    validated together, which the remote backend turns into one round trip.
+    """
+    entries: List[dict | None] = [None] * len(messages)
+    pending: Dict[Tuple[str, str, str], List[Tuple[int, PendingTranslation]]] = {}
+    for slot, (index, mt_raw, source_name) in enumerate(messages):
+        try:
+            result = prepare_translation(mt_raw, prevalidate=prevalidate)
+        except Exception as exc:  # pylint: disable=broad-except
+            entries[slot] = _batch_error_entry(index, source_name, exc)
+            continue
+        if isinstance(result, PendingTranslation):
+            pending.setdefault(result.validator.batch_key(), []).append((slot, result))
+        else:
+            entries[slot] = _batch_ok_entry(index, result)
+
+    for group in pending.values():
+        validator = group[0][1].validator
+        try:
+            outcomes = validator.validate_documents([translation.document for _, translation in group])
+        except Exception as exc:  # pylint: disable=broad-except
+            for slot, _ in group:
+                entries[slot] = _batch_error_entry(messages[slot][0], messages[slot][2], exc)
+            continue
+        for (slot, translation), (ok, errors) in zip(group, outcomes):
+            try:
+                entries[slot] = _batch_ok_entry(messages[slot][0], translation.complete(ok, errors))
+            except Exception as exc:  # pylint: disable=broad-except
+                entries[slot] = _batch_error_entry(messages[slot][0], messages[slot][2], exc)
+    return entries  # type: ignore[return-value]
+
+
+def process_batch_message(index: int, mt_raw: str, prevalidate: bool, source_name: str = "") -> dict:
+    """Translate one batch message and return its per-message result entry; never raises."""
+    return process_batch_messages([(index, mt_raw, source_name)], prevalidate)[0]
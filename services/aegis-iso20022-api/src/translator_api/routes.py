@@ -1,39 +1,55 @@
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from enum import Enum
 from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from pathlib import Path
+from itertools import chain
+from typing import BinaryIO
 import io
 import json
 import zipfile
 import logging
 import os
-import time
-from ..translator_core.detector import Detector
-from ..translator_core.mt_parser import MTParser
-from ..translator_core.mapping_store import MappingStore
-from ..translator_core.transformer import Transformer
-from ..translator_core.mx_builder import MXBuilder
-from ..translator_core.xsd_validator import XSDValidator
-from ..translator_core.audit import AuditRecord, new_correlation_id
+from ..prevalidator_core.lookups import get_lookup_store
+from ..translator_core.mapping_store import get_mapping_store
+from ..translator_core.xsd_validator import close_remote_client, warm_schema_cache
+from ..translator_core.schema_cache import get_schema_cache
 from ..translator_core.metrics import timer
 from ..prevalidator_api.routes import router as prevalidator_router
-from ..prevalidator_core import PrevalidationEngine
-from .batch import BatchFile, BatchParseError, parse_batch_payload
+from .batch import BatchParseError, BatchStream
+from .batch_engine import get_batch_engine, iter_upload_results
+from .batch_jobs import JOB_COMPLETED, JOB_FAILED, BatchJobsDisabled, get_batch_job_manager
+from .batch_response import iter_ndjson_stream, iter_zip_stream, zip_entry
+from .pipeline import translate_message
 from audit_middleware import AuditMiddleware
-from audit_emitter import KafkaAuditEmitter, LoggingEmitter
+from audit_emitter import (
+    KafkaAuditEmitter,
+    LazyConnectEmitter,
+    LoggingEmitter,
+    QueuedAuditEmitter,
+    queued_emitter_from_env,
+    spill_log_from_env,
+)
 
 app = FastAPI(title="Aegis ISO20022 Translator")
 app.include_router(prevalidator_router)
 logger = logging.getLogger(__name__)
 
-prevalidation_engine = PrevalidationEngine()
 _audit_emitter = None
 
 
 def _init_audit_emitter():
+    """
+    Build the process audit emitter without blocking startup. With
+    ``KAFKA_BOOTSTRAP_SERVERS`` set, Kafka is connected in the background
+    (``LazyConnectEmitter``) with exponential backoff from
+    ``KAFKA_EMITTER_RETRY_DELAY`` up to ``KAFKA_EMITTER_MAX_RETRY_DELAY``
+    seconds; after ``KAFKA_EMITTER_MAX_ATTEMPTS`` failures events are logged
+    until Kafka appears, unless ``REQUIRE_KAFKA_EMITTER=true``, in which case
+    they stay buffered.
+    """
     global _audit_emitter
     if _audit_emitter is not None:
         return _audit_emitter
@@ -42,37 +58,102 @@ def _init_audit_emitter():
     require_emitter = os.getenv("REQUIRE_KAFKA_EMITTER", "false").lower() == "true"
     max_attempts = max(1, int(os.getenv("KAFKA_EMITTER_MAX_ATTEMPTS", "5")))
     retry_delay = float(os.getenv("KAFKA_EMITTER_RETRY_DELAY", "5"))
-    emitter = None
-    last_exc: Exception | None = None
     if bootstrap and KafkaAuditEmitter:
-        for attempt in range(1, max_attempts + 1):
-            try:
-                emitter = KafkaAuditEmitter(bootstrap_servers=bootstrap, topic=topic)
-                logger.info("Audit emitter configured for Kafka topic %s", topic)
-                break
-            except Exception as exc:  # pragma: no cover - fallback path
-                last_exc = exc
-                logger.warning(
-                    "Kafka audit emitter attempt %s/%s failed: %s",
-                    attempt,
-                    max_attempts,
-                    exc,
-                )
-                if attempt < max_attempts:
-                    time.sleep(retry_delay)
-        else:
-            emitter = None
-    if emitter is None:
-        if require_emitter:
-            raise RuntimeError("Kafka audit emitter required but unavailable") from last_exc
+        spill_log = spill_log_from_env()
+        max_block_ms = int(os.getenv("KAFKA_EMITTER_MAX_BLOCK_MS", "1000" if spill_log else "60000"))
+
+        def connect():
+            emitter = KafkaAuditEmitter(
+                bootstrap_servers=bootstrap,
+                topic=topic,
+                spill_log=spill_log,
+                max_block_ms=max_block_ms,
+            )
+            logger.info("Audit emitter configured for Kafka topic %s", topic)
+            return emitter
+
+        emitter = LazyConnectEmitter(
+            connect,
+            fallback=None if require_emitter else LoggingEmitter(),
+            fallback_after=max_attempts,
+            initial_delay=retry_delay,
+            max_delay=float(os.getenv("KAFKA_EMITTER_MAX_RETRY_DELAY", "60")),
+            buffer_size=int(os.getenv("AUDIT_CONNECT_BUFFER_SIZE", "10000")),
+            spill_log=spill_log,
+        )
+    elif require_emitter:
+        raise RuntimeError("Kafka audit emitter required but unavailable")
+    else:
         emitter = LoggingEmitter()
+    if os.getenv("AUDIT_QUEUE_ENABLED", "true").lower() == "true":
+        emitter = queued_emitter_from_env(emitter)
     _audit_emitter = emitter
     return emitter
 
 
+def _audit_connection_status():
+    emitter = _init_audit_emitter()
+    target = emitter.delegate if isinstance(emitter, QueuedAuditEmitter) else emitter
+    return target.status() if isinstance(target, LazyConnectEmitter) else None
+
+
 app.add_middleware(AuditMiddleware, emitter=_init_audit_emitter())
 
 
+@app.on_event("startup")
+def start_mapping_store_reload():
+    interval = float(os.getenv("MAPPING_RELOAD_INTERVAL", "5"))
+    get_mapping_store().start_auto_reload(interval)
+
+
+@app.on_event("startup")
+def start_lookup_store_reload():
+    get_lookup_store().start_auto_reload(float(os.getenv("LOOKUPS_RELOAD_INTERVAL", "5")))
+
+
+@app.on_event("startup")
+def warm_xsd_schema_cache():
+    if os.getenv("XSD_CACHE_WARMUP", "false").lower() != "true":
+        return
+    with timer() as elapsed:
+        warmed = warm_schema_cache(get_mapping_store().iter_targets())
+    logger.info("Warmed %s XSD schema(s) in %.1f ms", warmed, elapsed())
+
+
+@app.on_event("startup")
+def warm_batch_engine():
+    if os.getenv("BATCH_POOL_WARMUP", "false").lower() != "true":
+        return
+    with timer() as elapsed:
+        get_batch_engine().warm()
+    logger.info("Started batch worker pool in %.1f ms", elapsed())
+
+
+@app.on_event("startup")
+def start_batch_job_runners():
+    get_batch_job_manager().start()
+
+
+@app.on_event("shutdown")
+def stop_batch_job_runners():
+    get_batch_job_manager().stop()
+
+
+@app.on_event("shutdown")
+def shutdown_batch_engine():
+    get_batch_engine().shutdown()
+
+
+@app.on_event("shutdown")
+def close_remote_validator_client():
+    close_remote_client()
+
+
+@app.on_event("shutdown")
+def stop_mapping_store_reload():
+    get_mapping_store().stop_auto_reload()
+
+
 @app.on_event("shutdown")
 async def shutdown_audit_emitter():
     emitter = _init_audit_emitter()
@@ -83,7 +164,28 @@ async def shutdown_audit_emitter():
 
 @app.get("/")
 def healthcheck():
-    return {"status": "ok"}
+    connection = _audit_connection_status()
+    if connection is None:
+        return {"status": "ok"}
+    # Still "ok" while Kafka connects: audit events are buffered, not lost.
+    return {"status": "ok", "audit_emitter": connection}
+
+
+@app.get("/metrics/schema-cache")
+def schema_cache_metrics():
+    return get_schema_cache().stats().to_dict()
+
+
+@app.get("/metrics/audit-emitter")
+def audit_emitter_metrics():
+    emitter = _init_audit_emitter()
+    if isinstance(emitter, QueuedAuditEmitter):
+        stats, target = emitter.stats(), emitter.delegate
+    else:
+        stats, target = {"delegate": type(emitter).__name__, "queued": False}, emitter
+    if callable(getattr(target, "stats", None)):
+        stats.update(target.stats())
+    return stats
 
 
 class TranslateRequest(BaseModel):
@@ -95,152 +197,15 @@ class TranslateRequest(BaseModel):
 class BatchResponseFormat(str, Enum):
     zip = "zip"
     json = "json"
+    ndjson = "ndjson"
 
 
-def _classify_mt195_variant(parsed_fields: dict[str, list[str]] | dict) -> str | None:
-    field72 = parsed_fields.get("72") if isinstance(parsed_fields, dict) else None
-    if not field72:
-        return None
-    if isinstance(field72, list):
-        text = "\n".join(field72).upper()
-    else:
-        text = str(field72).upper()
-    text_normalized = text.replace("-", " ")
-    if "/QUERY/UNABLE TO APPLY" in text_normalized:
-        return "unable_to_apply"
-    if "/QUERY/CLAIM NON RECEIPT" in text_normalized:
-        return "claim_non_receipt"
-    if "/QUERY/REQUEST FOR DUPLICATE" in text_normalized:
-        return "request_duplicate"
-    return None
-
-
-def _classify_mt196_variant(parsed_fields: dict[str, list[str]] | dict) -> str | None:
-    field76 = parsed_fields.get("76") if isinstance(parsed_fields, dict) else None
-    if not field76:
-        return None
-    if isinstance(field76, list):
-        text = "\n".join(field76).upper()
-    else:
-        text = str(field76).upper()
-    keywords = ("CANCEL", "RJCR", "PDCR", "CNCL", "ACCR")
-    return "cancellation" if any(key in text for key in keywords) else "information"
-
-
-def _classify_mt102_variant(parsed: dict) -> str | None:
-    block3 = None
-    if isinstance(parsed, dict):
-        block3 = parsed.get("blocks", {}).get("3")
-    if not block3:
-        return None
-    if "119:STP" in str(block3).upper():
-        return "stp"
-    return None
-
 @app.post("/translate")
 def translate(req: TranslateRequest):
-    corr = new_correlation_id(req.mt_raw[:5000])
-    with timer() as elapsed:
-        det = Detector()
-        mt_type = req.force_type or det.detect(req.mt_raw)
-        if not mt_type:
-            raise HTTPException(400, "Could not detect MT type")
-
-        parser = MTParser()
-        parsed = parser.parse(mt_type, req.mt_raw)
-
-        store = MappingStore()
-
-        variant = None
-        if mt_type == "MT195":
-            fields = parsed.get("fields", {}) if isinstance(parsed, dict) else {}
-            variant = _classify_mt195_variant(fields)
-        elif mt_type == "MT196":
-            fields = parsed.get("fields", {}) if isinstance(parsed, dict) else {}
-            variant = _classify_mt196_variant(fields)
-        elif mt_type == "MT102":
-            variant = _classify_mt102_variant(parsed)
-
-        if req.prevalidate:
-            pre_result = prevalidation_engine.validate(req.mt_raw, force_type=req.force_type or mt_type)
-            if not pre_result.valid:
-                raise HTTPException(
-                    status_code=422,
-                    detail={
-                        "message": "Prevalidation failed",
-                        "result": pre_result.to_dict(),
-                    },
-                )
-
-        def _pass_through():
-            elapsed_ms = elapsed()
-            return {
-                "status": "ok",
-                "code": "NO_CONVERSION_APPLICABLE",
-                "mt_type": mt_type.replace("MT", "", 1),
-                "mx_type": None,
-                "mode": "pass_through",
-                "payload_preserved": True,
-                "notes": f"{mt_type} carried unchanged. No ISO 20022 conversion performed.",
-                "mt_raw": req.mt_raw,
-                "validation": {"ok": True, "errors": []},
-                "metrics": {"latency_ms": elapsed_ms},
-            }
-
-        try:
-            mapping, mx_type, xsd_dir = store.load_profile(mt_type, variant=variant)
-        except FileNotFoundError:
-            return _pass_through()
-
-        if not mapping or not mx_type:
-            return _pass_through()
-
-        # optional guard: lightweight XSD index (reuse your iso-bootstrap xsd_index.py if desired)
-        transformer = Transformer(xsd_index=None)
-        flat, audit_details = transformer.apply(mapping, parsed)
-
-        xml = MXBuilder().build(mx_type, flat)
-        validator = XSDValidator(xsd_dir, mx_type)
-        ok, errors = validator.validate(xml)
-        validator_engine = validator.engine_name()
-
-        mp_info = store.resolve(mt_type, variant)
-        if not mp_info[0]:
-            mp_info = store.resolve(mt_type)
-        mapping_profile = mp_info[0] or "unknown"
-
-        record = AuditRecord(
-            correlation_id=corr,
-            source_mt=mt_type,
-            target_mx=mx_type,
-            mapping_profile=str(mapping_profile),
-            xsd_version=mx_type,
-            mapped_count=len(audit_details["mapped"]),
-            error_count=len(audit_details["errors"]) + (0 if ok else len(errors)),
-            validation_ok=ok,
-            latency_ms=elapsed(),
-            details={
-                "transform": audit_details,
-                "xsd_errors": errors,
-            },
-            xml_validator=validator_engine,
-        )
-
-        return {
-            "mx_type": mx_type,
-            "xml": xml,
-            "validation": {"ok": ok, "errors": errors},
-            "metrics": {"latency_ms": record.latency_ms},
-            "audit": record.__dict__,
-        }
-
+    return translate_message(req.mt_raw, force_type=req.force_type, prevalidate=req.prevalidate)
 
-def _process_message(mt_raw: str, prevalidate: bool) -> dict:
-    request = TranslateRequest(mt_raw=mt_raw, prevalidate=prevalidate)
-    return translate(request)
 
-
-def _summarize_batch(batch: BatchFile, results: list[dict]) -> dict:
+def _summarize_batch(batch: BatchStream, results: list[dict]) -> dict:
     succeeded = sum(1 for r in results if r["status"] == "ok")
     failed = len(results) - succeeded
     return {
@@ -248,7 +213,7 @@ def _summarize_batch(batch: BatchFile, results: list[dict]) -> dict:
         "header": batch.header,
         "trailer": batch.trailer,
         "summary": {
-            "total": len(batch.messages),
+            "total": batch.message_count,
             "succeeded": succeeded,
             "failed": failed,
         },
@@ -256,87 +221,63 @@ def _summarize_batch(batch: BatchFile, results: list[dict]) -> dict:
     }
 
 
+def _collect_batch_results(filename: str, stream: BinaryIO, prevalidate: bool, max_workers: int) -> list[dict]:
+    grouped: dict[int, tuple[BatchStream, list[dict]]] = {}
+    for batch, entry in iter_upload_results(filename, stream, prevalidate, max_workers):
+        grouped.setdefault(id(batch), (batch, []))[1].append(entry)
+    return [_summarize_batch(batch, results) for batch, results in grouped.values()]
+
+
+async def _stream_batch_results(
+    filename: str,
+    stream: BinaryIO,
+    prevalidate: bool,
+    max_workers: int,
+    fmt: BatchResponseFormat,
+) -> StreamingResponse:
+    events = iter_upload_results(filename, stream, prevalidate, max_workers)
+    # Pull the first result before committing to a 200 so upload/header errors
+    # still map to a 400; later parse errors are reported inside the stream.
+    try:
+        first = await run_in_threadpool(next, events, None)
+    except BatchParseError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if first is not None:
+        events = chain([first], events)
+
+    if fmt is BatchResponseFormat.ndjson:
+        return StreamingResponse(iter_ndjson_stream(events), media_type="application/x-ndjson")
+
+    filename = f"translate-batch-{first[0].source_name if first else 'results'}.zip"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    return StreamingResponse(iter_zip_stream(events), media_type="application/zip", headers=headers)
+
+
 @app.post("/translate/batch")
 async def translate_batch(
     file: UploadFile = File(...),
     prevalidate: bool = True,
     max_workers: int = 4,
     responseFileFormat: BatchResponseFormat = BatchResponseFormat.zip,
+    stream: bool = False,
 ):
     if max_workers < 1:
         raise HTTPException(status_code=400, detail="max_workers must be at least 1")
 
-    payload = await file.read()
+    filename = file.filename or "batch.dat"
+    if responseFileFormat is BatchResponseFormat.ndjson or (stream and responseFileFormat is BatchResponseFormat.zip):
+        return await _stream_batch_results(filename, file.file, prevalidate, max_workers, responseFileFormat)
+
     try:
-        batches = parse_batch_payload(file.filename or "batch.dat", payload)
+        aggregate_results = await run_in_threadpool(_collect_batch_results, filename, file.file, prevalidate, max_workers)
     except BatchParseError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    aggregate_results: list[dict] = []
-    total_messages = 0
-    total_success = 0
-    total_failed = 0
-
-    for batch in batches:
-        workers = min(max_workers, len(batch.messages))
-        if workers < 1:
-            workers = 1
-        jobs = []
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            for message in batch.messages:
-                future = executor.submit(_process_message, message.mt_raw, prevalidate)
-                jobs.append((message, future))
-
-        batch_results: list[dict] = []
-        for message, future in jobs:
-            try:
-                result = future.result()
-                audit = result.get("audit", {}) or {}
-                validator_engine = audit.get("xml_validator")
-                batch_results.append(
-                    {
-                        "index": message.index,
-                        "status": "ok",
-                        "mt_type": result.get("audit", {}).get("source_mt") or result.get("mt_type"),
-                        "mx_type": result.get("mx_type"),
-                        "validation": result.get("validation"),
-                        "xml": result.get("xml"),
-                        "metrics": result.get("metrics"),
-                        "audit": result.get("audit"),
-                        "xml_validator": validator_engine,
-                    }
-                )
-            except HTTPException as exc:
-                batch_results.append(
-                    {
-                        "index": message.index,
-                        "status": "error",
-                        "error": {
-                            "status_code": exc.status_code,
-                            "detail": exc.detail,
-                        },
-                    }
-                )
-            except Exception as exc:  # pylint: disable=broad-except
-                logger.exception("Exception occurred while processing message index %s in batch %s", message.index, batch.source_name)
-                batch_results.append(
-                    {
-                        "index": message.index,
-                        "status": "error",
-                        "error": {
-                            "status_code": 500,
-                            "detail": "Internal server error",
-                        },
-                    }
-                )
-
-        batch_results.sort(key=lambda item: item["index"])
-        summary = _summarize_batch(batch, batch_results)
-        aggregate_results.append(summary)
-
-        total_messages += summary["summary"]["total"]
-        total_success += summary["summary"]["succeeded"]
-        total_failed += summary["summary"]["failed"]
+    total_messages = sum(batch["summary"]["total"] for batch in aggregate_results)
+    total_success = sum(batch["summary"]["succeeded"] for batch in aggregate_results)
+    total_failed = sum(batch["summary"]["failed"] for batch in aggregate_results)
 
     processed_at = datetime.now(timezone.utc)
     processed_at_iso = processed_at.isoformat()
@@ -364,15 +305,8 @@ async def translate_batch(
         for batch in aggregate_results:
             batch_id = batch["source"]
             for result in batch["results"]:
-                idx = result["index"]
-                prefix = f"{batch_id}/record-{idx:03d}"
-                if result["status"] == "ok" and result.get("xml"):
-                    mx_type = result.get("mx_type") or "mx"
-                    zf.writestr(f"{prefix}_{mx_type}.xml", result["xml"])
-                else:
-                    zf.writestr(f"{prefix}_error.json", json.dumps(result, indent=2))
-
-    archive.seek(0)
+                zf.writestr(*zip_entry(batch_id, result))
+
     filename = f"translate-batch-{aggregate_results[0]['source'] if aggregate_results else 'results'}.zip"
     headers = {
         "Content-Disposition": f'attachment; filename="{filename}"',
@@ -382,3 +316,86 @@ async def translate_batch(
         media_type="application/zip",
         headers=headers,
     )
+
+
+class BatchJobResultsFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+
+
+def _job_links(job_id: str) -> dict:
+    return {
+        "self": f"/translate/batch/jobs/{job_id}",
+        "results": f"/translate/batch/jobs/{job_id}/results",
+    }
+
+
+def _get_job_or_404(job_id: str):
+    job = get_batch_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job {job_id}")
+    return job
+
+
+@app.post("/translate/batch/jobs", status_code=202)
+async def submit_batch_job(
+    file: UploadFile = File(...),
+    prevalidate: bool = True,
+    max_workers: int = 4,
+):
+    if max_workers < 1:
+        raise HTTPException(status_code=400, detail="max_workers must be at least 1")
+    try:
+        job = await run_in_threadpool(
+            get_batch_job_manager().submit, file.filename or "batch.dat", file.file, prevalidate, max_workers
+        )
+    except BatchParseError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except BatchJobsDisabled as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return {**job.to_dict(), "links": _job_links(job.id)}
+
+
+@app.get("/translate/batch/jobs/{job_id}")
+def get_batch_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    return {**job.to_dict(), "links": _job_links(job.id)}
+
+
+@app.get("/translate/batch/jobs/{job_id}/results")
+def get_batch_job_results(
+    job_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    responseFileFormat: BatchJobResultsFormat = BatchJobResultsFormat.json,
+):
+    if offset < 0 or not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 1000")
+    job = _get_job_or_404(job_id)
+    store = get_batch_job_manager().store
+
+    if responseFileFormat is BatchJobResultsFormat.ndjson:
+        # Stream everything committed so far from ``offset``, page by page.
+        def _lines():
+            position = offset
+            while True:
+                page = store.results(job_id, offset=position, limit=limit)
+                if not page:
+                    return
+                for item in page:
+                    yield (json.dumps(item) + "\n").encode("utf-8")
+                position += len(page)
+
+        return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+    items = store.results(job_id, offset=offset, limit=limit)
+    next_offset = offset + len(items)
+    finished = job.status in (JOB_COMPLETED, JOB_FAILED)
+    return {
+        "job_id": job_id,
+        "status": job.status,
+        "offset": offset,
+        "limit": limit,
+        "items": items,
+        "next_offset": None if finished and next_offset >= job.processed else next_offset,
+    }
@@ -3,11 +3,21 @@ import re
 class Detector:
     MT_HEADER_RE = re.compile(r"\{2:[IO](\d{3})")
     TAG_RE = re.compile(r":(\d{2}[A-Z]?):")
+    BLOCK2_RE = re.compile(r"[IO](\d{3})")
 
-    def detect(self, raw: str) -> str | None:
-        tags = set(self.TAG_RE.findall(raw))
-
-        m = self.MT_HEADER_RE.search(raw)
+    def detect(self, raw: str, parsed: dict | None = None) -> str | None:
+        """
+        Detect the MT type from the block 2 header, falling back to tag heuristics.
+        When an MTParser result is supplied its blocks and tags are reused instead
+        of rescanning the raw text.
+        """
+        if parsed is not None:
+            tags = set(parsed.get("fields", {}))
+            block2 = parsed.get("blocks", {}).get("2")
+            m = self.BLOCK2_RE.match(block2) if block2 else None
+        else:
+            tags = set(self.TAG_RE.findall(raw))
+            m = self.MT_HEADER_RE.search(raw)
         if m:
             mt = f"MT{m.group(1)}"
             if mt == "MT202":
@@ -1,8 +1,15 @@
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 import json
+import logging
 import re
+import threading
 import yaml
 
+logger = logging.getLogger(__name__)
+
 _COMMENT_LINE = re.compile(r"^\s*//.*$", re.MULTILINE)
 _COMMENT_BLOCK = re.compile(r"/\*.*?\*/", re.DOTALL)
 # Remove trailing commas before } or ]
@@ -39,19 +46,69 @@ def _load_json_with_diagnostics(path: Path):
                 f"Tip: Remove comments and trailing commas, or keep the file strictly valid JSON."
             ) from e1
 
+@dataclass(frozen=True)
+class MappingProfile:
+    """One pairs.yaml entry with its mapping JSON already parsed."""
+
+    mt_code: str
+    variant: Optional[str]
+    out_json: Optional[str]
+    mx_type: Optional[str]
+    xsd_dir_rel: Optional[str]
+    xsd_dir: Optional[str]
+    mapping_path: Optional[Path]
+    mapping: Optional[dict]
+    error: Optional[Exception] = None
+
+
+@dataclass(frozen=True)
+class _StoreSnapshot:
+    pairs: dict
+    profiles: Mapping[Tuple[str, Optional[str]], MappingProfile]
+    mtimes: Mapping[Path, Optional[int]]
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 class MappingStore:
+    """
+    Index of every pairs.yaml profile with its mapping JSON preloaded.
+
+    All parsing happens when the store is built (or reloaded); lookups only read
+    the current immutable snapshot, which ``reload`` swaps in a single reference
+    assignment. Returned mapping dicts are shared and must be treated as read-only.
+    """
+
     def __init__(
         self,
         mappings_dir: str = "mappings",
         pairs_yaml: str = "iso-bootstrap/pairs.yaml",
         service_root: Path | None = None,
     ):
-        # ... (keep your existing __init__ exactly as we set earlier)
         if service_root is None:
             service_root = Path(__file__).resolve().parents[2]
         self.service_root = service_root
         self.mappings_dir = self.service_root / mappings_dir
         self.pairs_yaml_path = self.service_root / pairs_yaml
+        self._reload_lock = threading.Lock()
+        self._stop_event: Optional[threading.Event] = None
+        self._reload_thread: Optional[threading.Thread] = None
+        self._failed_mtimes: Optional[Dict[Path, Optional[int]]] = None
+        self._snapshot = self._build_snapshot()
+
+    @property
+    def pairs(self) -> dict:
+        return self._snapshot.pairs
+
+    def _resolve_rel(self, rel: str) -> Path:
+        return Path(rel) if Path(rel).is_absolute() else (self.service_root / rel)
+
+    def _read_pairs(self) -> dict:
         if not self.pairs_yaml_path.exists():
             raise FileNotFoundError(
                 f"pairs.yaml not found: {self.pairs_yaml_path}\n"
@@ -60,50 +117,173 @@ class MappingStore:
         with open(self.pairs_yaml_path, "r", encoding="utf-8") as f:
             data = yaml.safe_load(f) or {}
         if isinstance(data, list):
-            self.pairs = {"pairs": data}
-        elif isinstance(data, dict):
-            self.pairs = data if "pairs" in data else {"pairs": data.get("pairs", [])}
-        else:
-            self.pairs = {"pairs": []}
+            return {"pairs": data}
+        if isinstance(data, dict):
+            return data if "pairs" in data else {"pairs": data.get("pairs", [])}
+        return {"pairs": []}
 
-    def resolve(self, mt_type: str, variant: str | None = None):
-        candidates = [p for p in self.pairs.get("pairs", []) if p.get("mt_code") == mt_type]
-        if variant is not None:
-            for p in candidates:
-                if p.get("variant") == variant:
-                    return p.get("out_json"), p.get("target_version"), p.get("xsd_dir")
-        for p in candidates:
-            if not p.get("variant"):
-                return p.get("out_json"), p.get("target_version"), p.get("xsd_dir")
-        return None, None, None
+    def _build_snapshot(self) -> _StoreSnapshot:
+        mtimes: Dict[Path, Optional[int]] = {self.pairs_yaml_path: _mtime_ns(self.pairs_yaml_path)}
+        pairs = self._read_pairs()
+        loaded: Dict[Path, Tuple[Optional[dict], Optional[Exception]]] = {}
+        profiles: Dict[Tuple[str, Optional[str]], MappingProfile] = {}
 
-    def load_profile(self, mt_type: str, variant: str | None = None):
-        out_json_rel, mx_type, xsd_dir_rel = self.resolve(mt_type, variant)
-        if out_json_rel is None and variant is not None:
-            out_json_rel, mx_type, xsd_dir_rel = self.resolve(mt_type)
-        if not out_json_rel:
-            return None, None, None
+        for p in pairs.get("pairs", []):
+            mt_code = p.get("mt_code")
+            out_json_rel = p.get("out_json")
+            if not mt_code or not out_json_rel:
+                continue
+            variant = p.get("variant") or None
+            key = (mt_code, variant)
+            if key in profiles:
+                continue
 
-        mapping_path = (
-            Path(out_json_rel)
-            if Path(out_json_rel).is_absolute()
-            else (self.service_root / out_json_rel)
-        )
-        xsd_dir_path = (
-            Path(xsd_dir_rel)
-            if xsd_dir_rel and Path(xsd_dir_rel).is_absolute()
-            else (self.service_root / (xsd_dir_rel or ""))
+            mapping_path = self._resolve_rel(out_json_rel)
+            xsd_dir_rel = p.get("xsd_dir")
+            xsd_dir_path: Optional[Path] = self._resolve_rel(xsd_dir_rel or "")
+            if xsd_dir_rel:
+                mtimes[xsd_dir_path] = _mtime_ns(xsd_dir_path)
+                if not xsd_dir_path.exists():
+                    xsd_dir_path = None
+
+            if mapping_path not in loaded:
+                mtimes[mapping_path] = _mtime_ns(mapping_path)
+                loaded[mapping_path] = self._load_mapping(mapping_path, out_json_rel)
+            mapping, error = loaded[mapping_path]
+            profiles[key] = MappingProfile(
+                mt_code=mt_code,
+                variant=variant,
+                out_json=out_json_rel,
+                mx_type=p.get("target_version"),
+                xsd_dir_rel=xsd_dir_rel,
+                xsd_dir=str(xsd_dir_path) if xsd_dir_path else None,
+                mapping_path=mapping_path,
+                mapping=mapping,
+                error=error,
+            )
+
+        return _StoreSnapshot(
+            pairs=pairs,
+            profiles=MappingProxyType(profiles),
+            mtimes=MappingProxyType(mtimes),
         )
 
+    def _load_mapping(self, mapping_path: Path, out_json_rel: str) -> Tuple[Optional[dict], Optional[Exception]]:
+        # Errors are recorded per profile and raised on lookup so that one broken
+        # or missing mapping does not prevent the remaining profiles from loading.
         if not mapping_path.exists():
-            raise FileNotFoundError(
+            return None, FileNotFoundError(
                 f"Mapping JSON not found: {mapping_path}\n"
                 f"(from pairs.yaml out_json='{out_json_rel}', service_root='{self.service_root}')"
             )
-        if xsd_dir_rel and not xsd_dir_path.exists():
-            xsd_dir_path = None
-
-        mapping = _load_json_with_diagnostics(mapping_path)
+        try:
+            mapping = _load_json_with_diagnostics(mapping_path)
+        except ValueError as exc:
+            return None, exc
         if not isinstance(mapping, dict):
-            raise ValueError(f"Mapping must be a JSON object at top-level: {mapping_path}")
-        return mapping, mx_type, str(xsd_dir_path) if xsd_dir_path else None
+            return None, ValueError(f"Mapping must be a JSON object at top-level: {mapping_path}")
+        return mapping, None
+
+    # ---------- Lookups (no file I/O) ----------
+
+    def get_profile(self, mt_type: str, variant: str | None = None) -> Optional[MappingProfile]:
+        profiles = self._snapshot.profiles
+        if variant is not None:
+            profile = profiles.get((mt_type, variant))
+            if profile is not None:
+                return profile
+        return profiles.get((mt_type, None))
+
+    def resolve(self, mt_type: str, variant: str | None = None):
+        profile = self.get_profile(mt_type, variant)
+        if profile is None:
+            return None, None, None
+        return profile.out_json, profile.mx_type, profile.xsd_dir_rel
+
+    def iter_targets(self):
+        """Yield ``(xsd_dir, mx_type)`` for every ``target_version`` listed in pairs.yaml."""
+        seen = set()
+        for p in self.pairs.get("pairs", []):
+            mx_type = p.get("target_version")
+            xsd_dir_rel = p.get("xsd_dir")
+            if not mx_type or (xsd_dir_rel, mx_type) in seen:
+                continue
+            seen.add((xsd_dir_rel, mx_type))
+            xsd_dir_path = self._resolve_rel(xsd_dir_rel or "")
+            yield (str(xsd_dir_path) if xsd_dir_rel and xsd_dir_path.exists() else None), mx_type
+
+    def iter_profiles(self):
+        """Yield every preloaded ``MappingProfile`` in the current snapshot."""
+        yield from self._snapshot.profiles.values()
+
+    def load_profile(self, mt_type: str, variant: str | None = None):
+        profile = self.get_profile(mt_type, variant)
+        if profile is None:
+            return None, None, None
+        if profile.error is not None:
+            raise profile.error
+        return profile.mapping, profile.mx_type, profile.xsd_dir
+
+    # ---------- Hot reload ----------
+
+    def _current_mtimes(self) -> Dict[Path, Optional[int]]:
+        return {path: _mtime_ns(path) for path in self._snapshot.mtimes}
+
+    def has_changed(self) -> bool:
+        return self._current_mtimes() != dict(self._snapshot.mtimes)
+
+    def reload(self) -> None:
+        """Rebuild the index from disk and swap it in atomically."""
+        with self._reload_lock:
+            self._snapshot = self._build_snapshot()
+
+    def reload_if_changed(self) -> bool:
+        current = self._current_mtimes()
+        if current == dict(self._snapshot.mtimes) or current == self._failed_mtimes:
+            return False
+        try:
+            self.reload()
+        except Exception:  # pylint: disable=broad-except
+            # Keep serving the previous snapshot until the files are fixed.
+            self._failed_mtimes = current
+            logger.exception("Mapping store reload failed; keeping previous profiles")
+            return False
+        self._failed_mtimes = None
+        logger.info("Mapping store reloaded from %s", self.pairs_yaml_path)
+        return True
+
+    def start_auto_reload(self, interval: float) -> None:
+        """Poll tracked files every ``interval`` seconds from a daemon thread."""
+        if interval <= 0 or self._reload_thread is not None:
+            return
+        stop_event = threading.Event()
+
+        def _poll() -> None:
+            while not stop_event.wait(interval):
+                self.reload_if_changed()
+
+        self._stop_event = stop_event
+        self._reload_thread = threading.Thread(target=_poll, name="mapping-store-reload", daemon=True)
+        self._reload_thread.start()
+
+    def stop_auto_reload(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout=5)
+        self._stop_event = None
+        self._reload_thread = None
+
+
+_MAPPING_STORE: Optional[MappingStore] = None
+_MAPPING_STORE_LOCK = threading.Lock()
+
+
+def get_mapping_store() -> MappingStore:
+    """Return the process-wide mapping store, building it on first use."""
+    global _MAPPING_STORE
+    if _MAPPING_STORE is None:
+        with _MAPPING_STORE_LOCK:
+            if _MAPPING_STORE is None:
+                _MAPPING_STORE = MappingStore()
+    return _MAPPING_STORE
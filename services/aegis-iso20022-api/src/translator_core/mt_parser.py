@@ -1,27 +1,126 @@
 import re
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
 
 BLOCK_RE = re.compile(r"\{(\d):([^}]*)\}", re.S)
 TAG_RE = re.compile(r"(?m)^:(\d{2}[A-Z]?):")
+# TAG_RE split for the tokenizer: a tag at the very start of block 4, and tags
+# after a newline (the literal prefix lets the regex engine skip ahead instead
+# of trying ``^`` at every offset).
+_TAG_AT_RE = re.compile(r":(\d{2}[A-Z]?):")
+_LINE_TAG_RE = re.compile(r"\n:(\d{2}[A-Z]?):")
+
+# (start, end) offsets into the raw text, before value clean-up.
+Span = Tuple[int, int]
+Token = Tuple[str, int, int]
+
+
+def _clean_value(val: str) -> str:
+    val = val.strip()
+    if val.endswith("-}"):
+        val = val[:-2].rstrip()
+    # if the last line is a lone hyphen, drop it too
+    if val.endswith("-") and "\n" in val:
+        lines = val.splitlines()
+        if lines[-1].strip() == "-":
+            val = "\n".join(lines[:-1]).rstrip()
+    if val.endswith("-}"):
+        val = val[:-2].rstrip()
+    return val
+
+
+class _SpanMapping(Mapping):
+    """Read-only key -> value view whose values are sliced from the raw text on first access."""
+
+    __slots__ = ("_text", "_spans", "_values")
+
+    def __init__(self, text: str, spans: dict) -> None:
+        self._text = text
+        self._spans = spans
+        self._values: dict = {}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, key) -> bool:
+        return key in self._spans
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class MTBlocks(_SpanMapping):
+    """Block number -> block content, e.g. ``blocks["3"]``."""
+
+    def __getitem__(self, key: str) -> str:
+        value = self._values.get(key)
+        if value is None:
+            start, end = self._spans[key]
+            value = self._values[key] = self._text[start:end]
+        return value
+
+
+class MTFields(_SpanMapping):
+    """Tag -> list of values (one per occurrence), materialised per tag when accessed."""
+
+    def __getitem__(self, tag: str) -> List[str]:
+        values = self._values.get(tag)
+        if values is None:
+            text = self._text
+            values = self._values[tag] = [_clean_value(text[start:end]) for start, end in self._spans[tag]]
+        return values
+
+    def spans(self, tag: str) -> List[Span]:
+        """Return the untrimmed raw-text spans recorded for ``tag`` without materialising values."""
+        return list(self._spans.get(tag, ()))
+
 
 class MTParser:
+    def tokenize(self, raw: str) -> Tuple[Dict[str, Tuple[int, int]], List[Token]]:
+        """
+        Walk the message once and return block spans plus ``(tag, start, end)``
+        tokens for block 4, all as offsets into ``raw``.
+        """
+        block_spans: Dict[str, Tuple[int, int]] = {}
+        for m in BLOCK_RE.finditer(raw):
+            block_spans[m.group(1)] = (m.start(2), m.end(2))
+        b4_start, b4_end = block_spans.get("4") or (0, 0)
+        if b4_start == b4_end:
+            # No (or an empty) block 4: treat the whole text as the field body.
+            b4_start, b4_end = 0, len(raw)
+
+        starts: List[int] = []
+        tags: List[str] = []
+        ends: List[int] = []
+        head = _TAG_AT_RE.match(raw, b4_start, b4_end)
+        if head is not None:
+            tags.append(head.group(1))
+            ends.append(head.end())
+        for m in _LINE_TAG_RE.finditer(raw, b4_start, b4_end):
+            starts.append(m.start() + 1)
+            tags.append(m.group(1))
+            ends.append(m.end())
+        starts.append(b4_end)
+        # Each value runs from the end of its tag to the start of the next one.
+        if len(starts) > len(tags):
+            del starts[0]
+        return block_spans, list(zip(tags, ends, starts))
+
     def parse(self, mt_type: str, raw: str) -> dict:
-        blocks = dict(BLOCK_RE.findall(raw))
-        b4 = blocks.get("4") or raw
-        fields, order = {}, []
-        for m in TAG_RE.finditer(b4):
-            tag = m.group(1)
-            start = m.end()
-            nxt = TAG_RE.search(b4, start)
-            val = b4[start:(nxt.start() if nxt else len(b4))].strip()
-            if val.endswith("-}"):
-                val = val[:-2].rstrip()
-            # if the last line is a lone hyphen, drop it too
-            if "\n" in val:
-                last_line = val.splitlines()[-1].strip()
-                if last_line == "-":
-                    val = "\n".join(val.splitlines()[:-1]).rstrip()
-            if val.endswith("-}"):
-                val = val[:-2].rstrip()
-            fields.setdefault(tag, []).append(val)
-            order.append(tag)
-        return {"mt_type": mt_type, "blocks": blocks, "fields": fields, "order": order}
\ No newline at end of file
+        block_spans, tokens = self.tokenize(raw)
+        spans: Dict[str, List[Span]] = {}
+        for tag, start, end in tokens:
+            if tag in spans:
+                spans[tag].append((start, end))
+            else:
+                spans[tag] = [(start, end)]
+        return {
+            "mt_type": mt_type,
+            "blocks": MTBlocks(raw, block_spans),
+            "fields": MTFields(raw, spans),
+            "order": [tag for tag, _start, _end in tokens],
+            "tokens": tokens,
+        }
@@ -1,5 +1,7 @@
+from functools import cached_property, lru_cache
+from typing import Dict, Tuple
+
 from lxml import etree
-from pathlib import Path
 
 NS_BY_MSG = {
     "pacs.008.001.13": "urn:iso:std:iso:20022:tech:xsd:pacs.008.001.13",
@@ -25,32 +27,107 @@ NS_BY_MSG = {
     "camt.111.001.02": "urn:iso:std:iso:20022:tech:xsd:camt.111.001.02",
 }
 
+# One serialisation configuration for every document.
+_TOSTRING_OPTIONS = {"pretty_print": True, "encoding": "UTF-8", "xml_declaration": True}
+
+# (index key, tag, 1-based occurrence) per element step
+_Step = Tuple[str, str, int]
+
+
+@lru_cache(maxsize=4096)
+def _compile_xpath(xpath: str) -> Tuple[Tuple[_Step, ...], str | None]:
+    """
+    Split ``/Document/A/B[2]/C/@attr`` into element steps plus an optional
+    attribute name. Keys are normalised prefixes (``B`` and ``B[1]`` share one),
+    so the builder can index elements it already created.
+    """
+    steps = []
+    key = ""
+    for part in xpath.split("/"):
+        if not part or part == "Document":
+            continue
+        if part.startswith("@"):  # attribute
+            return tuple(steps), part[1:]
+        tag, _, rest = part.partition("[")
+        occurrence = int(rest.rstrip("]") or 1) if rest else 1
+        key = f"{key}/{tag}" if occurrence <= 1 else f"{key}/{tag}[{occurrence}]"
+        steps.append((key, tag, occurrence))
+    return tuple(steps), None
+
+
+class MXDocument:
+    """
+    A built MX tree plus its serialised form. ``xml`` is produced on first
+    access, so a tree can be schema-validated in memory and serialised once,
+    only if someone needs the text.
+    """
+
+    def __init__(self, root: etree._Element) -> None:
+        self.root = root
+
+    @cached_property
+    def xml(self) -> str:
+        return etree.tostring(self.root, **_TOSTRING_OPTIONS).decode()
+
+
 class MXBuilder:
+    """
+    Emits an lxml tree from the transformer's flat ``XPath -> [values]`` map.
+
+    Every element is created once and remembered under its normalised path, so
+    later paths sharing a prefix attach to it without searching the tree. A
+    path with several values becomes that many sibling elements, addressable
+    afterwards as ``tag[2]``, ``tag[3]`` and so on.
+    """
+
     def build(self, mx_type: str, flat: dict) -> str:
+        return self.build_document(mx_type, flat).xml
+
+    def build_document(self, mx_type: str, flat: dict) -> MXDocument:
+        """Build the element tree without serialising it."""
         ns = NS_BY_MSG.get(mx_type)
         if not ns:
             raise ValueError(f"Unknown namespace for {mx_type}")
-        root = etree.Element("Document", nsmap={None: ns})
-        # create nodes for each xpath, supporting attributes
+        # Qualified tags serialise as plain <Tag> under the default namespace and
+        # let the compiled schema validate the tree as-is.
+        root = etree.Element(f"{{{ns}}}Document", nsmap={None: ns})
+        index: Dict[str, etree._Element] = {"": root}
         for xp, values in flat.items():
-            self._ensure_path(root, xp, values)
-        return etree.tostring(root, pretty_print=True, encoding="UTF-8", xml_declaration=True).decode()
+            self._ensure_path(index, f"{{{ns}}}", xp, values)
+        return MXDocument(root)
 
-    def _ensure_path(self, root, xpath: str, values):
+    def _ensure_path(self, index: Dict[str, "etree._Element"], qualifier: str, xpath: str, values):
         # xpath like /Document/FIToFICstmrCdtTrf/CdtTrfTxInf[1]/PmtId/TxId
-        parts = [p for p in xpath.split("/") if p and p != "Document"]
-        node = root
-        for i, part in enumerate(parts):
-            if part.startswith("@"):  # attribute
-                for v in values:
-                    node.set(part[1:], v)
-                return
-            # strip [1] index for path creation
-            tag = part.split("[",1)[0]
-            child = node.find(f"{{*}}{tag}")
+        steps, attribute = _compile_xpath(xpath)
+        node = index[""]
+        parent_key = ""
+        for key, tag, occurrence in steps:
+            child = index.get(key)
             if child is None:
-                child = etree.SubElement(node, tag)
+                parent = node
+                # Fill any missing lower occurrences so B[3] lands third.
+                for n in range(1, occurrence):
+                    lower = f"{parent_key}/{tag}" if n == 1 else f"{parent_key}/{tag}[{n}]"
+                    if lower not in index:
+                        index[lower] = etree.SubElement(parent, qualifier + tag)
+                child = index[key] = etree.SubElement(parent, qualifier + tag)
             node = child
-        # assign values (repeat creates multiple entries)
-        for v in values:
-            node.text = v  # last value wins; for multi-occ, map to separate paths/rules
+            parent_key = key
+        if attribute is not None:
+            for v in values:
+                node.set(attribute, v)
+            return
+        if not values:
+            return
+        values = iter(values)
+        node.text = next(values)
+        if not steps:
+            return
+        # Repeated values become siblings, indexed as tag[2], tag[3], ...
+        key, tag, occurrence = steps[-1]
+        base = key.rsplit("[", 1)[0] if occurrence > 1 else key
+        for n, v in enumerate(values, start=max(occurrence, 1) + 1):
+            sibling = node.makeelement(node.tag)
+            sibling.text = v
+            node.addnext(sibling)
+            node = index.setdefault(f"{base}[{n}]", sibling)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional
+
+from .detector import Detector
+from .mt_parser import MTParser, Token
+
+
+@dataclass
+class ParsedMessage:
+    """
+    One MT message tokenised once and shared by detection, prevalidation,
+    variant classification and translation.
+
+    ``fields`` and ``blocks`` are the lazy views produced by ``MTParser``;
+    ``field_text`` / ``block_text`` cache the joined, upper-cased text that
+    keyword matching works on.
+    """
+
+    raw: str
+    mt_type: Optional[str]
+    blocks: Mapping[str, str]
+    fields: Mapping[str, List[str]]
+    order: List[str]
+    tokens: List[Token]
+    meta: dict = field(default_factory=dict)
+    _text_cache: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_raw(
+        cls,
+        raw: str,
+        force_type: Optional[str] = None,
+        parser: Optional[MTParser] = None,
+        detector: Optional[Detector] = None,
+    ) -> "ParsedMessage":
+        """Tokenise ``raw`` and detect its type (``force_type`` wins when given)."""
+        parsed = (parser or MTParser()).parse(force_type, raw)
+        mt_type = force_type or (detector or Detector()).detect(raw, parsed=parsed)
+        return cls(
+            raw=raw,
+            mt_type=mt_type,
+            blocks=parsed["blocks"],
+            fields=parsed["fields"],
+            order=parsed["order"],
+            tokens=parsed["tokens"],
+        )
+
+    def field_text(self, tag: str) -> str:
+        """All occurrences of ``tag`` joined by newlines and upper-cased ("" if absent)."""
+        key = f"field:{tag}"
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self._text_cache[key] = "\n".join(self.fields.get(tag) or ()).upper()
+        return text
+
+    def block_text(self, block: str) -> str:
+        """Upper-cased content of header block ``block`` ("" if absent)."""
+        key = f"block:{block}"
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self._text_cache[key] = (self.blocks.get(block) or "").upper()
+        return text
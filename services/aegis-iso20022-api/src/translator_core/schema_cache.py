@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str, int]
+
+
+@dataclass
+class SchemaCacheStats:
+    """Snapshot of the compiled-schema cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    compile_count: int = 0
+    compile_ms_total: float = 0.0
+    size: int = 0
+    max_size: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "compile_count": self.compile_count,
+            "compile_ms_total": round(self.compile_ms_total, 3),
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+
+class SchemaCache:
+    """
+    Thread-safe, bounded LRU of compiled schema objects.
+
+    Entries are keyed by ``(backend name, resolved schema path, mtime_ns)`` so an
+    XSD replaced on disk is recompiled on the next lookup while the stale entry
+    ages out of the LRU.
+    """
+
+    def __init__(self, max_size: int = 32) -> None:
+        self.max_size = max(1, int(max_size))
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[CacheKey, threading.Lock] = {}
+        self._stats = SchemaCacheStats(max_size=self.max_size)
+
+    @staticmethod
+    def make_key(backend: str, schema_path: Path) -> CacheKey:
+        resolved = schema_path.resolve()
+        return backend, str(resolved), resolved.stat().st_mtime_ns
+
+    def get_or_compile(self, backend: str, schema_path: Path, compile_fn: Callable[[Path], Any]) -> Any:
+        """Return the cached compiled schema, compiling it at most once per key."""
+        key = self.make_key(backend, schema_path)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Compile outside the global lock so unrelated schemas do not serialise;
+        # the per-key lock stops concurrent requests compiling the same XSD twice.
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return self._entries[key]
+                self._stats.misses += 1
+            started = time.perf_counter()
+            compiled = compile_fn(schema_path)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._lock:
+                self._stats.compile_count += 1
+                self._stats.compile_ms_total += elapsed_ms
+                self._entries[key] = compiled
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+                self._key_locks.pop(key, None)
+            return compiled
+
+    def stats(self) -> SchemaCacheStats:
+        with self._lock:
+            snapshot = SchemaCacheStats(**self._stats.__dict__)
+            snapshot.size = len(self._entries)
+            return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self._stats = SchemaCacheStats(max_size=self.max_size)
+
+
+_SCHEMA_CACHE: Optional[SchemaCache] = None
+_SCHEMA_CACHE_LOCK = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """Return the process-wide schema cache (sized via ``XSD_SCHEMA_CACHE_SIZE``)."""
+    global _SCHEMA_CACHE
+    if _SCHEMA_CACHE is None:
+        with _SCHEMA_CACHE_LOCK:
+            if _SCHEMA_CACHE is None:
+                _SCHEMA_CACHE = SchemaCache(max_size=int(os.getenv("XSD_SCHEMA_CACHE_SIZE", "32")))
+    return _SCHEMA_CACHE
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+
+def read_target_namespace(path: Path) -> Optional[str]:
+    """Return the schema's ``targetNamespace`` by streaming only up to its root element."""
+    try:
+        for _event, root in etree.iterparse(str(path), events=("start",)):
+            return root.get("targetNamespace")
+    except (etree.XMLSyntaxError, OSError):
+        return None
+    return None
+
+
+def index_path_for(directory: Path) -> Path:
+    """The on-disk index sits next to (not inside) the directory, so writing it leaves the directory mtime alone."""
+    return directory.parent / f".{directory.name}.xsd-index.json"
+
+
+class SchemaIndex:
+    """
+    ``targetNamespace`` -> schema file lookup for XSD directories.
+
+    Each directory is indexed once by reading the root element of every
+    ``*.xsd``. The result is kept in memory and in a JSON file next to the
+    directory, both keyed by the directory's mtime. Adding, removing or renaming
+    a schema changes that mtime and triggers a rebuild on the next lookup;
+    otherwise a lookup is one ``stat`` and a dict access.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def lookup(self, directory: Path, namespace: str) -> Optional[Path]:
+        name = self.namespaces(directory).get(namespace)
+        return directory / name if name else None
+
+    def namespaces(self, directory: Path) -> Dict[str, str]:
+        key = str(directory.resolve())
+        mtime_ns = os.stat(key).st_mtime_ns
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != mtime_ns:
+                entry = (mtime_ns, self._load_or_build(Path(key), mtime_ns))
+                self._entries[key] = entry
+        return entry[1]
+
+    def _load_or_build(self, directory: Path, mtime_ns: int) -> Dict[str, str]:
+        index_file = index_path_for(directory)
+        try:
+            stored = json.loads(index_file.read_text(encoding="utf-8"))
+            if stored.get("version") == _INDEX_VERSION and stored.get("mtime_ns") == mtime_ns:
+                return dict(stored["namespaces"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+        namespaces: Dict[str, str] = {}
+        for candidate in sorted(directory.glob("*.xsd")):
+            namespace = read_target_namespace(candidate)
+            if namespace:
+                # Lowest file name wins when several files share a namespace; the old
+                # unsorted glob depended on directory order, so this is deterministic instead.
+                namespaces.setdefault(namespace, candidate.name)
+        self.builds += 1
+        self._store(index_file, {"version": _INDEX_VERSION, "mtime_ns": mtime_ns, "namespaces": namespaces})
+        return namespaces
+
+    @staticmethod
+    def _store(index_file: Path, payload: dict) -> None:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=index_file.parent, prefix=index_file.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                json.dump(payload, out, sort_keys=True)
+            os.replace(tmp, index_file)
+        except OSError as exc:
+            # Read-only deployments keep the in-memory index only.
+            logger.debug("Could not persist XSD index %s: %s", index_file, exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_SCHEMA_INDEX: Optional[SchemaIndex] = None
+_SCHEMA_INDEX_LOCK = threading.Lock()
+
+
+def get_schema_index() -> SchemaIndex:
+    """Return the process-wide XSD namespace index."""
+    global _SCHEMA_INDEX
+    if _SCHEMA_INDEX is None:
+        with _SCHEMA_INDEX_LOCK:
+            if _SCHEMA_INDEX is None:
+                _SCHEMA_INDEX = SchemaIndex()
+    return _SCHEMA_INDEX
@@ -1,6 +1,12 @@
 from datetime import datetime
 import re
-from typing import Any, Dict, List
+from contextvars import ContextVar
+from dataclasses import dataclass
+import functools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .parsed_message import ParsedMessage
 
 
 # ---------- Basic nested-mode helpers (kept for compatibility) ----------
@@ -87,64 +93,161 @@ def _transform_charge_code(v):
     code = str(v).strip().upper()
     return {"BEN": "DEBT", "OUR": "CRED", "SHA": "SHAR"}.get(code, code)
 
-def run_transform(spec, value):
+# ---------- Transform registry ----------
+
+TransformFn = Callable[[Any], Any]
+# A factory receives the step's ``args`` once, at compile time, and returns the
+# callable that runs per value.
+TransformFactory = Callable[[Dict[str, Any]], TransformFn]
+
+TRANSFORMS: Dict[str, TransformFactory] = {}
+
+# Per-message memo of regex matches keyed by (compiled pattern, input string);
+# MappingPlan.execute scopes one dict to each message.
+_MATCH_MEMO: ContextVar[Optional[Dict[Tuple[re.Pattern, str], Optional[re.Match]]]] = ContextVar(
+    "transform_match_memo", default=None
+)
+
+
+def register_transform(name: str):
+    """Decorator registering a transform factory under ``name``."""
+    def _register(factory: TransformFactory) -> TransformFactory:
+        TRANSFORMS[name] = factory
+        return factory
+    return _register
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Compile (once per process) a mapping regex with the transformer's flags."""
+    return re.compile(pattern, flags=re.M | re.S)
+
+
+def _memo_search(regex: re.Pattern, text: str) -> Optional[re.Match]:
+    memo = _MATCH_MEMO.get()
+    if memo is None:
+        return regex.search(text)
+    key = (regex, text)
+    if key not in memo:
+        memo[key] = regex.search(text)
+    return memo[key]
+
+
+@register_transform("to_decimal")
+def _to_decimal_factory(_args):
+    return _transform_to_decimal
+
+
+@register_transform("date_parse")
+def _date_parse_factory(args):
+    fmt = args.get("format", "%y%m%d")
+    return lambda val: _transform_date_parse(val, fmt)
+
+
+@register_transform("iban_normalize")
+def _iban_normalize_factory(_args):
+    return _transform_iban_normalize
+
+
+@register_transform("lines")
+def _lines_factory(_args):
+    return _transform_lines
+
+
+@register_transform("truncate")
+def _truncate_factory(args):
+    max_len = int(args.get("max", 140))
+    return lambda val: _transform_truncate(val, max_len)
+
+
+@register_transform("upper")
+def _upper_factory(_args):
+    return lambda val: str(val).upper() if val is not None else None
+
+
+@register_transform("now")
+def _now_factory(_args):
+    return _transform_now
+
+
+@register_transform("charge_code")
+def _charge_code_factory(_args):
+    return _transform_charge_code
+
+
+@register_transform("regex_extract")
+def _regex_extract_factory(args):
+    # args: pattern (str), group (int or str)
+    pattern = args.get("pattern")
+    group = args.get("group", 0)
+    if not pattern:
+        def _regex_missing(val):
+            if val is None:
+                return None
+            raise ValueError("regex_extract requires 'pattern'")
+        return _regex_missing
+    regex = compile_pattern(pattern)
+
+    def _regex_extract(val):
+        if val is None:
+            return None
+        m = _memo_search(regex, str(val))
+        if not m:
+            return None
+        return m.group(group)
+    return _regex_extract
+
+
+def _raise_on_call(exc: Exception) -> TransformFn:
+    def _fail(_val):
+        raise exc
+    return _fail
+
+
+def _compile_step(fn, args) -> TransformFn:
+    """Bind one transform step to a callable, resolving its args up front."""
+    factory = TRANSFORMS.get(fn)
+    if factory is None:
+        return _raise_on_call(ValueError(f"Unknown transform: {fn}"))
+    try:
+        return factory(args)
+    except Exception as ex:  # pylint: disable=broad-except
+        # Bad specs fail when the step runs, exactly as an interpreted step would.
+        return _raise_on_call(ex)
+
+
+def compile_transform(spec) -> Optional[TransformFn]:
     """
-    spec can be:
+    Compile a transform spec into one callable. spec can be:
       - string, e.g. 'to_decimal'
       - object, e.g. {'fn':'date_parse', 'args': {'format':'%y%m%d'}}
       - list of the above, to apply sequentially (pipeline)
+    Returns None when the spec is empty, i.e. the raw value is used unchanged.
     """
-    def _apply_one(fn, args, val):
-        try:
-            if fn == "to_decimal":
-                return _transform_to_decimal(val)
-            if fn == "date_parse":
-                return _transform_date_parse(val, args.get("format", "%y%m%d"))
-            if fn == "iban_normalize":
-                return _transform_iban_normalize(val)
-            if fn == "lines":
-                return _transform_lines(val)
-            if fn == "truncate":
-                return _transform_truncate(val, int(args.get("max", 140)))
-            if fn == "upper":
-                return str(val).upper() if val is not None else None
-            if fn == "now":
-                return _transform_now(None)
-            if fn == "charge_code":
-                return _transform_charge_code(val)
-            if fn == "regex_extract":
-                # args: pattern (str), group (int or str)
-                if val is None:
-                    return None
-                pattern = args.get("pattern")
-                group = args.get("group", 0)
-                if not pattern:
-                    raise ValueError("regex_extract requires 'pattern'")
-                m = re.search(pattern, str(val), flags=re.M | re.S)
-                if not m:
-                    return None
-                return m.group(group)
-            raise ValueError(f"Unknown transform: {fn}")
-        except Exception as ex:
-            raise ex
-
-    if spec is None:
-        return value
-
+    if not spec:
+        return None
     if isinstance(spec, list):
-        out = value
+        steps = []
         for step in spec:
             if isinstance(step, str):
-                fn, args = step, {}
+                steps.append(_compile_step(step, {}))
             else:
-                fn, args = step.get("fn"), step.get("args", {})
-            out = _apply_one(fn, args, out)
-        return out
+                steps.append(_compile_step(step.get("fn"), step.get("args", {})))
 
+        def _pipeline(val):
+            for step_fn in steps:
+                val = step_fn(val)
+            return val
+        return _pipeline
     if isinstance(spec, str):
-        return _apply_one(spec, {}, value)
-    else:
-        return _apply_one(spec.get("fn"), spec.get("args", {}), value)
+        return _compile_step(spec, {})
+    return _compile_step(spec.get("fn"), spec.get("args", {}))
+
+
+def run_transform(spec, value):
+    """Apply a transform spec (see compile_transform) to a single value."""
+    fn = compile_transform(spec)
+    return fn(value) if fn else value
 
 
 # ---------- Nested-mode apply (kept for compatibility) ----------
@@ -239,138 +342,253 @@ def apply_mapping(mt: Dict, mapping: Dict, context: Dict | None = None) -> Dict:
 
 class _FlatEmitter:
     """Collects values into a flat XPath -> [values] dict that mx_builder expects."""
-    def __init__(self, root="FIToFICstmrCdtTrf"):
-        self.root = root
+    def __init__(self):
         self.flat: Dict[str, list[str]] = {}
 
-    def put(self, rel_path: str, value: Any):
-        """Write one or many values to /Document/<root>/<rel_path>."""
+    def put(self, full: str, value: Any):
+        """
+        Write one or many values to an absolute /Document/<root>/... path.
+        A later put to the same path replaces the earlier one (mappings override
+        defaults); a list value becomes one sibling element per item.
+        """
         if value is None:
             return
-        full = f"/Document/{self.root}/{rel_path}" if rel_path else f"/Document/{self.root}"
-        # If it's a list, emit one node per item
         if isinstance(value, list):
-            for item in value:
-                self.flat.setdefault(full, []).append(str(item))
+            self.flat[full] = [str(item) for item in value]
         else:
-            self.flat.setdefault(full, []).append(str(value))
+            self.flat[full] = [str(value)]
 
-    def put_attr(self, rel_parent: str, attr: str, value: Any):
-        if value is None:
-            return
-        self.put(f"{rel_parent}/@{attr}", value)
 
+def _source_key(dotted: Optional[str]) -> Optional[str]:
+    # Mirrors get_value: only the tag before the first '.' is looked up.
+    return dotted.split(".", 1)[0] if dotted else None
 
-def apply_mapping_flat(mt: Dict, mapping: Dict, context: Dict | None = None, mx_root: str = "FIToFICstmrCdtTrf") -> Dict[str, list[str]]:
+
+def _first_value(mt: Dict, key: Optional[str]):
+    v = mt.get(key)
+    if isinstance(v, list):
+        return v[0] if v else None
+    return v
+
+
+@dataclass(frozen=True)
+class _PlannedMapping:
+    source_key: Optional[str]
+    literal: Any
+    transform: Optional[Callable[[Any], Any]]
+    target: str
+    on_fail: Optional[str]
+    # (absolute attribute path, literal value, MT tag for "$mt." references)
+    attributes: Tuple[Tuple[str, Any, Optional[str]], ...]
+
+
+@dataclass(frozen=True)
+class _PlannedSwitch:
+    branches: Tuple[Tuple[Optional[str], Tuple[_PlannedMapping, ...]], ...]
+    default: Tuple[_PlannedMapping, ...]
+
+
+@dataclass(frozen=True)
+class MappingPlan:
     """
-    Convert MT dict to a flat XPath map using the mapping template.
-    Now respects per-block 'target_root' so tx-level nodes land under CdtTrfTxInf.
+    A mapping template compiled for one MX root: absolute XPaths resolved,
+    attribute targets pre-split and transforms bound to callables.
     """
-    context = context or {}
-    em = _FlatEmitter(root=mx_root)
 
-    # defaults at the document/root level
-    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    for path, cfg in (mapping.get("defaults") or {}).items():
-        v = cfg.get("value")
-        if v == "$now": v = now
-        if v == "$context.request_id":
-            v = context.get("request_id")
-            # sensible fallback so MsgId is never empty
-            if v is None and path == "GrpHdr/MsgId":
-                v = now
-        if "/@" in path:
-            parent, attr = path.split("/@")
-            em.put_attr(parent, attr, v)
-        else:
-            em.put(path, v)
+    mx_root: str
+    # (absolute path, kind, literal) where kind is "now", "request_id" or "value"
+    defaults: Tuple[Tuple[str, str, Any], ...]
+    steps: Tuple[Any, ...]
+    error_policy: str
+    required: Tuple[Tuple[str, str], ...]
 
-    error_policy = (mapping.get("error_policies") or {}).get("on_transform_error", "warn_and_copy_raw")
+    def execute(self, mt: Dict, context: Dict | None = None) -> Dict[str, list[str]]:
+        memo_token = _MATCH_MEMO.set({})
+        try:
+            return self._execute(mt, context or {})
+        finally:
+            _MATCH_MEMO.reset(memo_token)
+
+    def _execute(self, mt: Dict, context: Dict) -> Dict[str, list[str]]:
+        em = _FlatEmitter()
+        now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    def _emit_simple(m: Dict, base: str):
-        source = m.get("source")
-        target = m.get("target")
-        transform_spec = m.get("transform")
-        on_fail = m.get("on_fail")
-        attrs = m.get("attributes") or {}
-        value_lit = m.get("value")  # <-- add
+        for full, kind, literal in self.defaults:
+            if kind == "now":
+                v = now
+            elif kind == "request_id":
+                v = context.get("request_id")
+                # sensible fallback so MsgId is never empty
+                if v is None and literal:
+                    v = now
+            else:
+                v = literal
+            em.put(full, v)
+
+        for step in self.steps:
+            if isinstance(step, _PlannedSwitch):
+                for exists_key, mappings in step.branches:
+                    if _first_value(mt, exists_key) is not None:
+                        for pm in mappings:
+                            self._emit(mt, em, pm)
+                        break
+                else:
+                    for pm in step.default:
+                        self._emit(mt, em, pm)
+            else:
+                self._emit(mt, em, step)
+
+        for rel, full in self.required:
+            ok = full in em.flat and any(v not in ("", None) for v in em.flat[full])
+            if not ok:
+                parent = "/".join(full.split("/")[:-1])
+                nearby = sorted([k for k in em.flat.keys() if k.startswith(parent)])
+                raise ValueError(
+                    "Validation failed: required path missing\n"
+                    f"  required : {rel}\n"
+                    f"  looked at: {full}\n"
+                    f"  nearby   : {nearby[:10]}{' ...' if len(nearby) > 10 else ''}"
+                )
+        return em.flat
 
-        raw_val = get_value(mt, source) if source else value_lit #None
+    def _emit(self, mt: Dict, em: _FlatEmitter, pm: _PlannedMapping):
+        raw_val = _first_value(mt, pm.source_key) if pm.source_key else pm.literal
         try:
-            out_val = run_transform(transform_spec, raw_val) if transform_spec else raw_val
+            out_val = pm.transform(raw_val) if pm.transform else raw_val
         except Exception:
-            if on_fail:
-                if "/@" in on_fail:
-                    parent, attr = on_fail.split("/@")
-                    parent_full = f"{base}/{parent}" if base else parent
-                    em.put_attr(parent_full, attr, raw_val)
-                else:
-                    target_full = f"{base}/{on_fail}" if base else on_fail
-                    em.put(target_full, raw_val)
+            if pm.on_fail:
+                em.put(pm.on_fail, raw_val)
                 return
-            if error_policy == "fail":
+            if self.error_policy == "fail":
                 raise
             return
 
         # attributes first
-        for k, v in attrs.items():
-            if isinstance(v, str) and v.startswith("$mt."):
-                v = get_value(mt, v[4:])
-            target_full = f"{base}/{target}" if base else target
-            em.put_attr(target_full, k, v)
+        for full, literal, mt_key in pm.attributes:
+            em.put(full, _first_value(mt, mt_key) if mt_key else literal)
 
         # main value
-        if "/@" in target:
-            parent, attr = target.split("/@")
-            parent_full = f"{base}/{parent}" if base else parent
-            em.put_attr(parent_full, attr, out_val)
+        em.put(pm.target, out_val)
+
+
+def _abs_path(mx_root: str, rel: str) -> str:
+    return f"/Document/{mx_root}/{rel}" if rel else f"/Document/{mx_root}"
+
+
+def _target_path(mx_root: str, base: str, target: str) -> str:
+    if "/@" in target:
+        parent, attr = target.split("/@")
+        parent_full = f"{base}/{parent}" if base else parent
+        return _abs_path(mx_root, f"{parent_full}/@{attr}")
+    return _abs_path(mx_root, f"{base}/{target}" if base else target)
+
+
+def _plan_simple(m: Dict, base: str, mx_root: str) -> _PlannedMapping:
+    target = m.get("target")
+    on_fail = m.get("on_fail")
+    target_full = f"{base}/{target}" if base else target
+    attributes = []
+    for k, v in (m.get("attributes") or {}).items():
+        mt_key = _source_key(v[4:]) if isinstance(v, str) and v.startswith("$mt.") else None
+        attributes.append((_abs_path(mx_root, f"{target_full}/@{k}"), v, mt_key))
+    source = m.get("source")
+    return _PlannedMapping(
+        source_key=_source_key(source) if source else None,
+        literal=m.get("value"),
+        transform=compile_transform(m.get("transform")),
+        target=_target_path(mx_root, base, target),
+        on_fail=_target_path(mx_root, base, on_fail) if on_fail else None,
+        attributes=tuple(attributes),
+    )
+
+
+def compile_mapping(mapping: Dict, mx_root: str = "FIToFICstmrCdtTrf") -> MappingPlan:
+    """Compile a mapping template into a MappingPlan for the given MX root."""
+    defaults = []
+    for path, cfg in (mapping.get("defaults") or {}).items():
+        v = cfg.get("value")
+        full = _target_path(mx_root, "", path)
+        if v == "$now":
+            defaults.append((full, "now", None))
+        elif v == "$context.request_id":
+            defaults.append((full, "request_id", path == "GrpHdr/MsgId"))
         else:
-            target_full = f"{base}/{target}" if base else target
-            em.put(target_full, out_val)
+            defaults.append((full, "value", v))
 
-    # process blocks; each block can have its own sub-root (e.g., CdtTrfTxInf)
+    steps: List[Any] = []
+    # each block can have its own sub-root (e.g., CdtTrfTxInf)
     for block in mapping.get("blocks", []):
         base = block.get("target_root", "") or ""
         for m in block.get("mappings", []):
             if "switch" in m:
-                when_any = m.get("when_any") or []
-                present = any(get_value(mt, w.get("exists","")) is not None for w in when_any) if when_any else True
-                #if when_any and not any(get_value(mt, w.get("exists","")) is not None for w in when_any):
-                #    continue
-                fired = False
+                branches = []
                 for br in m.get("switch", []):
-                    cond = br.get("if", {})
-                    if get_value(mt, cond.get("exists","")) is not None:
-                        for mm in br.get("mappings", []):
-                            _emit_simple(mm, base)
-                        fired = True
-                        break
-                if not fired:
-                    for mm in (m.get("default") or []):
-                        _emit_simple(mm, base)
-                    continue
-                 #   pass
+                    exists = _source_key((br.get("if", {})).get("exists", ""))
+                    branches.append((exists, tuple(_plan_simple(mm, base, mx_root) for mm in br.get("mappings", []))))
+                default = tuple(_plan_simple(mm, base, mx_root) for mm in (m.get("default") or []))
+                steps.append(_PlannedSwitch(branches=tuple(branches), default=default))
             else:
-                _emit_simple(m, base)
+                steps.append(_plan_simple(m, base, mx_root))
+
+    required = tuple(
+        (val["path"], _abs_path(mx_root, val["path"]))
+        for val in mapping.get("validations", [])
+        if val.get("required")
+    )
+
+    return MappingPlan(
+        mx_root=mx_root,
+        defaults=tuple(defaults),
+        steps=tuple(steps),
+        error_policy=(mapping.get("error_policies") or {}).get("on_transform_error", "warn_and_copy_raw"),
+        required=required,
+    )
 
-    # validations (respect full path; so include base in mapping where needed)
-    for val in mapping.get("validations", []):
-        if val.get("required"):
-            rel = val["path"]
-            full = f"/Document/{mx_root}/{rel}" if rel else f"/Document/{mx_root}"
-            ok = full in em.flat and any(v not in ("", None) for v in em.flat[full])
-            if not ok:
-                parent = "/".join(full.split("/")[:-1])
-                nearby = sorted([k for k in em.flat.keys() if k.startswith(parent)])
-                raise ValueError(
-                    "Validation failed: required path missing\n"
-                    f"  required : {rel}\n"
-                    f"  looked at: {full}\n"
-                    f"  nearby   : {nearby[:10]}{' ...' if len(nearby) > 10 else ''}"
-                )
-                raise ValueError(f"Validation failed: required '{rel}' missing")
 
-    return em.flat
+_PLAN_CACHE: Dict[Tuple[int, str], Tuple[Dict, MappingPlan]] = {}
+_PLAN_CACHE_LOCK = threading.Lock()
+_PLAN_CACHE_MAX = 256
+
+
+def get_mapping_plan(mapping: Dict, mx_root: str) -> MappingPlan:
+    """
+    Return the cached plan for a mapping dict, compiling it on first use.
+
+    Plans are keyed by the identity of the (read-only) mapping object handed out
+    by MappingStore, so a hot-reloaded profile naturally gets a fresh plan.
+    """
+    key = (id(mapping), mx_root)
+    entry = _PLAN_CACHE.get(key)
+    if entry is not None and entry[0] is mapping:
+        return entry[1]
+    plan = compile_mapping(mapping, mx_root)
+    with _PLAN_CACHE_LOCK:
+        if len(_PLAN_CACHE) >= _PLAN_CACHE_MAX:
+            _PLAN_CACHE.pop(next(iter(_PLAN_CACHE)))
+        # Holding the mapping reference keeps its id() from being reused.
+        _PLAN_CACHE[key] = (mapping, plan)
+    return plan
+
+
+def warm_mapping_plans(mappings: Iterable[dict], default_root: str = "FIToFICstmrCdtTrf") -> int:
+    """Compile and cache the plan for every mapping; returns how many were compiled."""
+    warmed = 0
+    for mapping in mappings:
+        get_mapping_plan(mapping, _mx_root_for(mapping, default_root))
+        warmed += 1
+    return warmed
+
+
+def _mx_root_for(mapping: dict, default_root: str) -> str:
+    return mapping.get("meta", {}).get("mx_root") or mapping.get("mx_root") or default_root
+
+
+def apply_mapping_flat(mt: Dict, mapping: Dict, context: Dict | None = None, mx_root: str = "FIToFICstmrCdtTrf") -> Dict[str, list[str]]:
+    """
+    Convert MT dict to a flat XPath map using the mapping template.
+    Now respects per-block 'target_root' so tx-level nodes land under CdtTrfTxInf.
+    """
+    return get_mapping_plan(mapping, mx_root).execute(mt, context)
 
 # ---------- Tiny compatibility wrapper for routes.py ----------
 
@@ -384,18 +602,21 @@ class Transformer:
         self.xsd_index = xsd_index
         self.mx_root = mx_root
 
-    def apply(self, mapping: dict, parsed: dict):
-        mt_fields = parsed.get("fields", parsed)
+    def apply(self, mapping: dict, parsed: ParsedMessage | dict):
+        if isinstance(parsed, ParsedMessage):
+            mt_fields, meta = parsed.fields, parsed.meta
+        else:
+            mt_fields = parsed.get("fields", parsed)
+            meta = parsed.get("meta") if isinstance(parsed, dict) else None
         context = {}
-        meta = parsed.get("meta") if isinstance(parsed, dict) else None
         if isinstance(meta, dict) and "request_id" in meta:
             context["request_id"] = meta["request_id"]
 
         errors = []
         flat = {}
-        mx_root = mapping.get("meta", {}).get("mx_root") or mapping.get("mx_root") or self.mx_root
+        mx_root = _mx_root_for(mapping, self.mx_root)
         try:
-            flat = apply_mapping_flat(mt_fields, mapping, context=context, mx_root=mx_root)
+            flat = get_mapping_plan(mapping, mx_root).execute(mt_fields, context)
         except Exception as e:
             errors.append(str(e))
             raise
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from lxml import etree
 
+from .mx_builder import MXDocument
+from .schema_cache import get_schema_cache
+from .schema_index import get_schema_index
+
 try:
     import xmlschema  # type: ignore
 except ImportError:  # pragma: no cover
@@ -18,6 +25,8 @@ try:
 except ImportError:  # pragma: no cover
     httpx = None  # type: ignore
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ValidationResult:
@@ -44,6 +53,14 @@ class SchemaBackend(ABC):
     def validate(self, xml_str: str) -> ValidationResult:
         """Validate an XML payload and return the outcome."""
 
+    def validate_document(self, document: MXDocument) -> ValidationResult:
+        """Validate a built MX document; backends that can check the tree in memory override this."""
+        return self.validate(document.xml)
+
+    def validate_documents(self, documents: Sequence[MXDocument]) -> List[ValidationResult]:
+        """Validate several documents against the loaded schema; remote backends do it in one call."""
+        return [self.validate_document(document) for document in documents]
+
 
 def _resolve_schema_path(xsd_dir: Optional[str], mx_type: str) -> Optional[Path]:
     """Locate the schema file for the given MX type or return None if absent."""
@@ -60,17 +77,8 @@ def _resolve_schema_path(xsd_dir: Optional[str], mx_type: str) -> Optional[Path]
     if target.exists():
         return target
 
-    # Fallback: search by targetNamespace.
-    ns_wanted = f"urn:iso:std:iso:20022:tech:xsd:{mx_type}"
-    for candidate in p.glob("*.xsd"):
-        try:
-            doc = etree.parse(str(candidate))
-        except etree.XMLSyntaxError:
-            continue
-        root = doc.getroot()
-        if root.get("targetNamespace") == ns_wanted:
-            return candidate
-    return None
+    # Fallback: look the targetNamespace up in the directory's schema index.
+    return get_schema_index().lookup(p, f"urn:iso:std:iso:20022:tech:xsd:{mx_type}")
 
 
 class LxmlBackend(SchemaBackend):
@@ -84,6 +92,14 @@ class LxmlBackend(SchemaBackend):
     def __init__(self) -> None:
         self.schema = None
         self.schema_error: Optional[str] = None
+        self._validate_lock: Optional[threading.Lock] = None
+
+    @staticmethod
+    def _compile(schema_path: Path) -> Tuple[etree.XMLSchema, threading.Lock]:
+        doc = etree.parse(str(schema_path))
+        # lxml keeps the error log on the schema object, so validations against a
+        # shared compiled schema are serialised through its companion lock.
+        return etree.XMLSchema(doc), threading.Lock()
 
     def load(self, schema_path: Optional[Path], mx_type: str) -> None:
         if not schema_path:
@@ -92,8 +108,7 @@ class LxmlBackend(SchemaBackend):
             return
 
         try:
-            doc = etree.parse(str(schema_path))
-            self.schema = etree.XMLSchema(doc)
+            self.schema, self._validate_lock = get_schema_cache().get_or_compile(self.name, schema_path, self._compile)
             self.schema_error = None
         except (etree.XMLSchemaParseError, etree.XMLSyntaxError) as exc:
             self.schema = None
@@ -103,8 +118,23 @@ class LxmlBackend(SchemaBackend):
         doc = etree.fromstring(xml_str.encode("utf-8"))
         if self.schema is None:
             return ValidationResult(ok=True, errors=[self.schema_error or "XSD validation skipped (schema unavailable)"])
-        ok = self.schema.validate(doc)
-        return ValidationResult(ok=ok, errors=[str(e) for e in self.schema.error_log])
+        return self._validate_tree(doc)
+
+    def validate_document(self, document: MXDocument) -> ValidationResult:
+        if self.schema is None:
+            return ValidationResult(ok=True, errors=[self.schema_error or "XSD validation skipped (schema unavailable)"])
+        result = self._validate_tree(document.root)
+        if result.ok:
+            return result
+        # Error positions must point into the serialised response, which the
+        # in-memory tree has no line numbers for; re-check the text on failure.
+        return self.validate(document.xml)
+
+    def _validate_tree(self, doc) -> ValidationResult:
+        with self._validate_lock:
+            ok = self.schema.validate(doc)
+            errors = [str(e) for e in self.schema.error_log]
+        return ValidationResult(ok=ok, errors=errors)
 
 
 class XmlSchema11Backend(SchemaBackend):
@@ -127,7 +157,9 @@ class XmlSchema11Backend(SchemaBackend):
             self.schema_error = f"XSD validation skipped: file for {mx_type} not found"
             return
         try:
-            self.schema = xmlschema.XMLSchema11(str(schema_path))
+            self.schema = get_schema_cache().get_or_compile(
+                self.name, schema_path, lambda path: xmlschema.XMLSchema11(str(path))
+            )
             self.schema_error = None
         except xmlschema.XMLSchemaException as exc:  # type: ignore[attr-defined]
             self.schema = None
@@ -142,21 +174,83 @@ class XmlSchema11Backend(SchemaBackend):
         except xmlschema.XMLSchemaValidationError as exc:  # type: ignore[attr-defined]
             return ValidationResult(ok=False, errors=[str(exc)])
 
+    def validate_document(self, document: MXDocument) -> ValidationResult:
+        if self.schema is None:
+            return ValidationResult(ok=True, errors=[self.schema_error or "XSD validation skipped (schema unavailable)"])
+        if self.schema.is_valid(document.root):
+            return ValidationResult(ok=True, errors=[])
+        # Report the failure against the serialised text, as ``validate`` does.
+        return self.validate(document.xml)
+
+
+_REMOTE_CLIENT: Optional["httpx.Client"] = None
+_REMOTE_CLIENT_LOCK = threading.Lock()
+# (schemas URL, schema id) -> True once registered, False if the service has no registry
+_REGISTERED_SCHEMAS: Dict[Tuple[str, str], bool] = {}
+_REGISTERED_SCHEMAS_LOCK = threading.Lock()
+
+
+def get_remote_client() -> "httpx.Client":
+    """
+    Return the process-wide keep-alive client for the remote validator, sized by
+    ``XSD_VALIDATOR_MAX_CONNECTIONS`` (default 20), ``XSD_VALIDATOR_MAX_KEEPALIVE``
+    (default 10) and ``XSD_VALIDATOR_TIMEOUT`` seconds (default 30).
+    """
+    global _REMOTE_CLIENT
+    if _REMOTE_CLIENT is None:
+        with _REMOTE_CLIENT_LOCK:
+            if _REMOTE_CLIENT is None:
+                _REMOTE_CLIENT = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=int(os.getenv("XSD_VALIDATOR_MAX_CONNECTIONS", "20")),
+                        max_keepalive_connections=int(os.getenv("XSD_VALIDATOR_MAX_KEEPALIVE", "10")),
+                    ),
+                    timeout=float(os.getenv("XSD_VALIDATOR_TIMEOUT", "30")),
+                )
+    return _REMOTE_CLIENT
+
+
+def close_remote_client() -> None:
+    global _REMOTE_CLIENT
+    with _REMOTE_CLIENT_LOCK:
+        client, _REMOTE_CLIENT = _REMOTE_CLIENT, None
+    if client is not None:
+        client.close()
+    with _REGISTERED_SCHEMAS_LOCK:
+        _REGISTERED_SCHEMAS.clear()
+
+
+def _read_remote_schema(schema_path: Path) -> Tuple[Tuple[str, bytes], str]:
+    payload = schema_path.read_bytes()
+    return (schema_path.name, payload), hashlib.sha256(payload).hexdigest()
+
 
 class RemoteBackend(SchemaBackend):
     """
-    Delegates validation to an external HTTP service.
+    Delegates validation to an external HTTP service over a shared keep-alive client.
 
     Expected API contract:
 
+        PUT <base>/schemas
+          form-data: xsd=<multipart file>, mx_type=<mx type>
+        Response 200 JSON: {"schema_id": "<sha256 of the XSD bytes>"}
+
         POST <endpoint>
           form-data:
             engine=<engine>
             mx_type=<mx type>
-            xsd=<optional multipart file>
+            schema_id=<registered schema id>   (or xsd=<multipart file>)
             xml=<multipart file with payload>
-
         Response 200 JSON: {"ok": bool, "errors": [str, ...]}
+
+        POST <endpoint>/batch
+          form-data: as above, with one ``xml`` file per document
+        Response 200 JSON: {"results": [{"ok": bool, "errors": [...]}, ...]}
+
+    Each schema is uploaded once per process and afterwards referenced by its
+    SHA-256. A 404 naming the schema id (the service restarted and forgot it)
+    re-registers and retries once. Services without ``/schemas`` or
+    ``/batch`` get the XSD inline and one request per document, as before.
     """
 
     name = "remote"
@@ -170,30 +264,84 @@ class RemoteBackend(SchemaBackend):
         endpoint = os.getenv("XSD_VALIDATOR_ENDPOINT")
         if not endpoint:
             raise RuntimeError("XSD_VALIDATOR_ENDPOINT must be set for remote XSD validation backend")
-        self.endpoint = endpoint
+        self.endpoint = endpoint.rstrip("/")
+        base = self.endpoint[: -len("/validate")] if self.endpoint.endswith("/validate") else self.endpoint
+        self.schemas_endpoint = os.getenv("XSD_VALIDATOR_SCHEMAS_ENDPOINT") or f"{base}/schemas"
+        self.batch_endpoint = os.getenv("XSD_VALIDATOR_BATCH_ENDPOINT") or f"{self.endpoint}/batch"
+        self.batch_size = max(1, int(os.getenv("XSD_VALIDATOR_BATCH_SIZE", "200")))
         self.engine = os.getenv("XSD_VALIDATOR_ENGINE", "xmlschema")
         self.mx_type = mx_type
         self.schema_payload: Optional[Tuple[str, bytes]] = None
+        self.schema_id: Optional[str] = None
 
     def load(self, schema_path: Optional[Path], mx_type: str) -> None:
         self.mx_type = mx_type
         if schema_path and schema_path.exists():
-            self.schema_payload = (schema_path.name, schema_path.read_bytes())
+            self.schema_payload, self.schema_id = get_schema_cache().get_or_compile(
+                self.name, schema_path, _read_remote_schema
+            )
         else:
             self.schema_payload = None
+            self.schema_id = None
+
+    def _register_schema(self, force: bool = False) -> bool:
+        """Make sure the service knows ``schema_id``; False means send the XSD inline."""
+        key = (self.schemas_endpoint, self.schema_id or "")
+        with _REGISTERED_SCHEMAS_LOCK:
+            known = _REGISTERED_SCHEMAS.get(key)
+        if known is not None and not force:
+            return known
+        try:
+            response = get_remote_client().put(
+                self.schemas_endpoint,
+                data={"mx_type": self.mx_type},
+                files={"xsd": (self.schema_payload[0], self.schema_payload[1], "application/xml")},  # type: ignore[index]
+            )
+        except Exception as exc:  # pragma: no cover - runtime failure paths
+            logger.warning("Remote schema registration failed: %s", exc)
+            return False
+        if response.status_code in (404, 405):
+            known = False
+        elif response.status_code >= 400:
+            logger.warning("Remote schema registration HTTP %s: %s", response.status_code, response.text)
+            return False
+        else:
+            known = True
+        with _REGISTERED_SCHEMAS_LOCK:
+            _REGISTERED_SCHEMAS[key] = known
+        return known
+
+    def _form(self, xml_docs: Sequence[str]) -> dict:
+        data = {"engine": self.engine, "mx_type": self.mx_type}
+        files: List[tuple] = [
+            ("xml", (f"payload-{n}.xml", xml.encode("utf-8"), "application/xml")) for n, xml in enumerate(xml_docs)
+        ]
+        if self.schema_payload:
+            if self._register_schema():
+                data["schema_id"] = self.schema_id  # type: ignore[assignment]
+            else:
+                files.append(("xsd", (self.schema_payload[0], self.schema_payload[1], "application/xml")))
+        return {"data": data, "files": files}
+
+    def _post(self, url: str, xml_docs: Sequence[str]) -> "httpx.Response":
+        form = self._form(xml_docs)
+        response = get_remote_client().post(url, **form)
+        if response.status_code == 404 and "schema_id" in form["data"] and "schema_id" in response.text:
+            self._register_schema(force=True)
+            response = get_remote_client().post(url, **self._form(xml_docs))
+        return response
+
+    @staticmethod
+    def _result(payload: dict) -> ValidationResult:
+        ok = bool(payload.get("ok", False))
+        errors = payload.get("errors", [])
+        if not isinstance(errors, list):
+            errors = [str(errors)]
+        return ValidationResult(ok=ok, errors=[str(e) for e in errors])
 
     def validate(self, xml_str: str) -> ValidationResult:
-        files = {
-            "xml": ("payload.xml", xml_str.encode("utf-8"), "application/xml"),
-        }
-        if self.schema_payload:
-            files["xsd"] = (self.schema_payload[0], self.schema_payload[1], "application/xml")
-        data = {
-            "engine": self.engine,
-            "mx_type": self.mx_type,
-        }
         try:
-            response = httpx.post(self.endpoint, data=data, files=files, timeout=30.0)  # type: ignore[arg-type]
+            response = self._post(self.endpoint, [xml_str])
         except Exception as exc:  # pragma: no cover - runtime failure paths
             return ValidationResult(ok=True, errors=[f"Remote XSD validation failed: {exc}"])
 
@@ -203,12 +351,36 @@ class RemoteBackend(SchemaBackend):
             payload = response.json()
         except ValueError:
             return ValidationResult(ok=True, errors=[f"Remote XSD validation returned non-JSON payload: {response.text}"])
+        return self._result(payload)
 
-        ok = bool(payload.get("ok", False))
-        errors = payload.get("errors", [])
-        if not isinstance(errors, list):
-            errors = [str(errors)]
-        return ValidationResult(ok=ok, errors=[str(e) for e in errors])
+    def validate_documents(self, documents: Sequence[MXDocument]) -> List[ValidationResult]:
+        results: List[ValidationResult] = []
+        for start in range(0, len(documents), self.batch_size):
+            results.extend(self._validate_batch([document.xml for document in documents[start : start + self.batch_size]]))
+        return results
+
+    def _validate_batch(self, xml_docs: List[str]) -> List[ValidationResult]:
+        if len(xml_docs) == 1:
+            return [self.validate(xml_docs[0])]
+        try:
+            response = self._post(self.batch_endpoint, xml_docs)
+        except Exception as exc:  # pragma: no cover - runtime failure paths
+            return [ValidationResult(ok=True, errors=[f"Remote XSD validation failed: {exc}"]) for _ in xml_docs]
+        if response.status_code in (404, 405):
+            # Service without a batch endpoint: one request per document.
+            return [self.validate(xml) for xml in xml_docs]
+        if response.status_code >= 400:
+            error = f"Remote XSD validation HTTP {response.status_code}: {response.text}"
+            return [ValidationResult(ok=True, errors=[error]) for _ in xml_docs]
+        try:
+            items = response.json()["results"]
+        except (ValueError, KeyError, TypeError):
+            error = f"Remote XSD validation returned unexpected batch payload: {response.text}"
+            return [ValidationResult(ok=True, errors=[error]) for _ in xml_docs]
+        if not isinstance(items, list) or len(items) != len(xml_docs):
+            error = "Remote XSD validation returned a different number of results than documents sent"
+            return [ValidationResult(ok=True, errors=[error]) for _ in xml_docs]
+        return [self._result(item) for item in items]
 
 
 def _select_backend(name: str, mx_type: str) -> SchemaBackend:
@@ -237,12 +409,51 @@ class XSDValidator:
         backend_name = os.getenv("XSD_VALIDATOR_BACKEND", "auto")
         backend = _select_backend(backend_name, mx_type)
         self.backend = backend
-        schema_path = _resolve_schema_path(xsd_dir, mx_type)
-        self.backend.load(schema_path, mx_type)
+        self.mx_type = mx_type
+        self.schema_path = _resolve_schema_path(xsd_dir, mx_type)
+        self.backend.load(self.schema_path, mx_type)
 
     def validate(self, xml_str: str) -> Tuple[bool, List[str]]:
         result = self.backend.validate(xml_str)
         return result.ok, result.errors
 
+    def validate_document(self, document: MXDocument) -> Tuple[bool, List[str]]:
+        """Validate an ``MXBuilder.build_document`` result without a serialise/reparse round trip."""
+        result = self.backend.validate_document(document)
+        return result.ok, result.errors
+
+    def validate_documents(self, documents: Sequence[MXDocument]) -> List[Tuple[bool, List[str]]]:
+        """Validate several documents for this schema, in one round trip for the remote backend."""
+        return [(result.ok, result.errors) for result in self.backend.validate_documents(documents)]
+
+    def batch_key(self) -> Tuple[str, str, str]:
+        """Validators with equal keys check documents against the same schema and engine."""
+        return self.engine_name(), str(self.schema_path), self.mx_type
+
     def engine_name(self) -> str:
         return self.backend.identifier()
+
+
+def warm_schema_cache(targets: Iterable[Tuple[Optional[str], str]]) -> int:
+    """
+    Precompile the schemas for ``(xsd_dir, mx_type)`` targets into the shared cache.
+
+    Returns the number of schemas compiled; targets without a schema file or
+    served by the remote validator are skipped. Schemas that fail to compile
+    are logged at warning level and not counted.
+    """
+    backend_name = os.getenv("XSD_VALIDATOR_BACKEND", "auto")
+    warmed = 0
+    for xsd_dir, mx_type in targets:
+        schema_path = _resolve_schema_path(xsd_dir, mx_type)
+        if schema_path is None:
+            continue
+        backend = _select_backend(backend_name, mx_type)
+        if isinstance(backend, RemoteBackend):
+            continue
+        backend.load(schema_path, mx_type)
+        if getattr(backend, "schema_error", None) is None:
+            warmed += 1
+        else:
+            logger.warning("XSD warm-up failed for %s: %s", mx_type, backend.schema_error)  # type: ignore[attr-defined]
+    return warmed
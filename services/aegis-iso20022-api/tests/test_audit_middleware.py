@@ -8,7 +8,8 @@ import pytest
 pytest.importorskip("fastapi")
 pytest.importorskip("starlette")
 
-from fastapi import FastAPI  # type: ignore
+from fastapi import FastAPI, Request  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
 from fastapi.testclient import TestClient  # type: ignore
 
 CURRENT = Path(__file__).resolve().parent
@@ -70,3 +71,25 @@ def test_audit_middleware_emits_event():
     assert payload["event_id"]
     assert len(payload["event_id"]) >= 16
     assert payload["attempt"] == 1
+
+
+def test_audit_middleware_streams_and_counts_bytes():
+    emitter = CaptureEmitter()
+    app = build_app(emitter)
+
+    @app.post("/stream")
+    async def stream(request: Request):  # pragma: no cover - executed via test client
+        await request.body()
+
+        async def chunks():
+            for chunk in (b"one\n", b"two\n", b"three\n"):
+                yield chunk
+
+        return StreamingResponse(chunks(), status_code=202, media_type="text/plain")
+
+    client = TestClient(app)
+    with client.stream("POST", "/stream", content=b"x" * 10, headers={"x-tenant-id": "TEN123"}) as response:
+        assert list(response.iter_bytes()) and response.status_code == 202
+
+    metadata = emitter.events[0].metadata
+    assert metadata == {"method": "POST", "status_code": 202, "request_bytes": 10, "response_bytes": 14}
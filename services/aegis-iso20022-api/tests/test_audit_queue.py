@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from audit_event import AuditEvent
+from audit_emitter.base import AuditEmitter
+from audit_emitter.queued import QueuedAuditEmitter
+from audit_emitter.spill_log import SpillLog
+
+
+class GatedEmitter(AuditEmitter):
+    """Records events; blocks delivery until ``gate`` is set."""
+
+    def __init__(self) -> None:
+        self.events: list[AuditEvent] = []
+        self.gate = threading.Event()
+        self.closed = False
+
+    def emit(self, event: AuditEvent) -> None:
+        self.gate.wait(5)
+        self.events.append(event)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _events(count: int) -> list[AuditEvent]:
+    return [AuditEvent(tenant_id="TEN123", route=f"/r/{n}") for n in range(count)]
+
+
+def test_queue_delivers_in_order_and_closes_delegate():
+    delegate = GatedEmitter()
+    delegate.gate.set()
+    emitter = QueuedAuditEmitter(delegate, max_size=100, batch_size=8)
+    events = _events(20)
+    for event in events:
+        emitter.emit(event)
+    emitter.close()
+    assert [e.event_id for e in delegate.events] == [e.event_id for e in events]
+    assert delegate.closed
+    stats = emitter.stats()
+    assert stats["emitted"] == 20 and stats["dropped"] == 0 and stats["depth"] == 0
+
+
+def test_drop_oldest_when_full():
+    delegate = GatedEmitter()
+    emitter = QueuedAuditEmitter(delegate, max_size=2, batch_size=1)
+    first, *rest = _events(6)
+    emitter.emit(first)
+    # Wait until the drain thread holds ``first`` so the buffer starts empty.
+    assert emitter.flush(timeout=0.2) is False
+    for event in rest:
+        emitter.emit(event)
+    assert emitter.stats()["dropped"] == 3
+    delegate.gate.set()
+    emitter.close()
+    assert [e.route for e in delegate.events] == [first.route, rest[-2].route, rest[-1].route]
+
+
+def test_spill_to_disk_and_replay_in_emit_order(tmp_path):
+    delegate = GatedEmitter()
+    spill_dir = tmp_path / "spill"
+    emitter = QueuedAuditEmitter(delegate, max_size=1, batch_size=1, overflow="spill", spill_log=SpillLog(str(spill_dir)))
+    events = _events(6)
+    emitter.emit(events[0])
+    emitter.flush(timeout=0.2)
+    for event in events[1:]:
+        emitter.emit(event)
+    # events[1] filled the buffer; everything after it went to the log, including
+    # events emitted while the backlog exists.
+    assert emitter.stats()["spilled"] == 4
+    assert emitter.stats()["spill_log"]["pending"] is True
+    delegate.gate.set()
+    assert emitter.flush(timeout=5) is True
+    stats = emitter.stats()
+    assert stats["emitted"] == 6 and stats["spill_log"]["pending"] is False
+    emitter.close()
+    assert [e.event_id for e in delegate.events] == [e.event_id for e in events]
+
+
+def test_spill_backlog_from_previous_process_is_delivered_first(tmp_path):
+    spill_dir = tmp_path / "spill"
+    backlog = _events(3)
+    log = SpillLog(str(spill_dir))
+    for event in backlog:
+        log.append(event.to_dict())
+    log.close()
+
+    delegate = GatedEmitter()
+    delegate.gate.set()
+    emitter = QueuedAuditEmitter(delegate, max_size=10, overflow="spill", spill_log=SpillLog(str(spill_dir)))
+    fresh = _events(2)
+    for event in fresh:
+        emitter.emit(event)
+    emitter.close()
+    assert [e.event_id for e in delegate.events] == [e.event_id for e in backlog + fresh]
+
+
+def test_unknown_overflow_policy_rejected():
+    with pytest.raises(ValueError):
+        QueuedAuditEmitter(GatedEmitter(), overflow="ignore")
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    import time
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_lazy_emitter_buffers_until_connected():
+    from audit_emitter.lazy import LazyConnectEmitter
+
+    target = GatedEmitter()
+    target.gate.set()
+    broker_up = threading.Event()
+
+    def connect():
+        if not broker_up.is_set():
+            raise ConnectionError("no brokers")
+        return target
+
+    emitter = LazyConnectEmitter(connect, initial_delay=0.01, max_delay=0.02)
+    events = _events(3)
+    emitter.emit(events[0])
+    assert _wait_for(lambda: emitter.attempts >= 2)
+    assert emitter.status()["state"] == "connecting" and emitter.status()["buffered"] == 1
+    emitter.emit(events[1])
+    broker_up.set()
+    assert _wait_for(lambda: emitter.connected)
+    emitter.emit(events[2])
+    assert [e.event_id for e in target.events] == [e.event_id for e in events]
+    emitter.close()
+    assert target.closed
+
+
+def test_lazy_emitter_falls_back_and_keeps_retrying():
+    from audit_emitter.lazy import LazyConnectEmitter
+
+    fallback, target = GatedEmitter(), GatedEmitter()
+    fallback.gate.set()
+    target.gate.set()
+    broker_up = threading.Event()
+
+    def connect():
+        if not broker_up.is_set():
+            raise ConnectionError("no brokers")
+        return target
+
+    emitter = LazyConnectEmitter(connect, fallback=fallback, fallback_after=2, initial_delay=0.01, max_delay=0.02)
+    assert _wait_for(lambda: emitter.state == "fallback")
+    emitter.emit(_events(1)[0])
+    broker_up.set()
+    assert _wait_for(lambda: emitter.connected)
+    emitter.emit(_events(1)[0])
+    assert len(fallback.events) == 1 and len(target.events) == 1
+    emitter.close()
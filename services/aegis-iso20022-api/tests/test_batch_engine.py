@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from pathlib import Path
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+for path in (ROOT, CURRENT):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.translator_api import batch_engine  # noqa: E402
+from src.translator_api.batch_engine import BatchEngine  # noqa: E402
+from src.translator_api.pipeline import process_batch_message  # noqa: E402
+
+RAW_MESSAGES = [sample["mt_raw"] for sample in CATEGORY1_SAMPLES.values()]
+
+
+def _items():
+    return [(i % 3, i + 1, raw, f"batch-{i % 3}") for i, raw in enumerate(RAW_MESSAGES)]
+
+
+def test_results_come_back_in_submission_order():
+    engine = BatchEngine(max_workers=3, chunk_size=2, executor="thread")
+    try:
+        results = list(engine.map(_items(), prevalidate=False, max_workers=2))
+    finally:
+        engine.shutdown()
+    assert [entry["index"] for _position, entry in results] == list(range(1, len(RAW_MESSAGES) + 1))
+    assert [position for position, _entry in results] == [position for position, *_rest in _items()]
+    expected = process_batch_message(1, RAW_MESSAGES[0], False)
+    assert results[0][1]["xml"] == expected["xml"]
+
+
+def test_in_flight_chunks_are_bounded_by_max_workers(monkeypatch):
+    in_flight = []
+    peak = []
+    real_translate_chunk = batch_engine.translate_chunk
+
+    def tracking_chunk(chunk, prevalidate):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        try:
+            return real_translate_chunk(chunk, prevalidate)
+        finally:
+            in_flight.pop()
+
+    monkeypatch.setattr(batch_engine, "translate_chunk", tracking_chunk)
+    engine = BatchEngine(max_workers=4, chunk_size=1, executor="thread")
+    try:
+        assert len(list(engine.map(_items(), prevalidate=False, max_workers=2))) == len(RAW_MESSAGES)
+    finally:
+        engine.shutdown()
+    assert max(peak) <= 2
+
+
+def test_process_pool_translates_chunk():
+    engine = BatchEngine(max_workers=1, chunk_size=4, executor="process")
+    try:
+        results = list(engine.map(_items()[:2], prevalidate=True))
+    finally:
+        engine.shutdown()
+    assert [entry["index"] for _position, entry in results] == [1, 2]
+    assert all(entry["status"] == "ok" for _position, entry in results)
+
+
+def test_streamed_items_start_with_single_message_chunks(monkeypatch):
+    sizes = []
+    real_translate_chunk = batch_engine.translate_chunk
+
+    def recording_chunk(chunk, prevalidate):
+        sizes.append(len(chunk))
+        return real_translate_chunk(chunk, prevalidate)
+
+    monkeypatch.setattr(batch_engine, "translate_chunk", recording_chunk)
+    engine = BatchEngine(max_workers=4, chunk_size=16, executor="thread")
+    items = ((0, i + 1, RAW_MESSAGES[i % len(RAW_MESSAGES)], "b") for i in range(10))
+    try:
+        results = list(engine.map(items, prevalidate=False))
+    finally:
+        engine.shutdown()
+    assert [entry["index"] for _position, entry in results] == list(range(1, 11))
+    assert sizes == [1, 1, 1, 1, 2, 2, 2]
+
+
+def test_process_pool_recovers_after_worker_dies():
+    engine = BatchEngine(max_workers=1, chunk_size=4, executor="process")
+    try:
+        assert len(list(engine.map(_items()[:2], prevalidate=False))) == 2
+        broken = engine._executor
+        for pid in list(broken._processes):  # type: ignore[union-attr]
+            os.kill(pid, signal.SIGKILL)
+        results = list(engine.map(_items()[:2], prevalidate=False))
+        assert engine._executor is not broken
+        assert len(list(engine.map(_items()[:2], prevalidate=False))) == 2
+    finally:
+        engine.shutdown()
+    assert [entry["index"] for _position, entry in results] == [1, 2]
+    assert all(entry["status"] == "ok" for _position, entry in results)
+
+
+def test_chunk_validates_documents_once_per_schema(monkeypatch):
+    from src.translator_core.xsd_validator import XSDValidator
+
+    calls = []
+    real_validate_documents = XSDValidator.validate_documents
+
+    def counting(self, documents):
+        calls.append((self.mx_type, len(documents)))
+        return real_validate_documents(self, documents)
+
+    monkeypatch.setattr(XSDValidator, "validate_documents", counting)
+    mt103 = CATEGORY1_SAMPLES["MT103"]["mt_raw"]
+    mt101 = CATEGORY1_SAMPLES["MT101"]["mt_raw"]
+    chunk = [(0, 1, mt103, "b"), (0, 2, mt101, "b"), (0, 3, mt103, "b"), (0, 4, "garbage", "b")]
+    results = batch_engine.translate_chunk(chunk, prevalidate=False)
+    assert [entry["index"] for _position, entry in results] == [1, 2, 3, 4]
+    assert [entry["status"] for _position, entry in results] == ["ok", "ok", "ok", "error"]
+    assert sorted(calls) == [("pacs.008.001.13", 2), ("pain.001.001.12", 1)]
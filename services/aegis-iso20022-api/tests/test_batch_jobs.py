@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+for path in (ROOT, CURRENT):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from src.translator_api import batch_jobs  # noqa: E402
+from src.translator_api.batch_jobs import BatchJobManager, BatchJobStore  # noqa: E402
+from src.translator_api.routes import app  # noqa: E402
+
+SAMPLE_BATCH = ROOT / "batch-mode-samples" / "MTBatch_20251030.dat"
+
+pytestmark = pytest.mark.skipif(not SAMPLE_BATCH.exists(), reason="sample batch file missing")
+
+
+def _use_thread_engine(monkeypatch):
+    """Run jobs on a thread-pool batch engine, so the test does not spawn processes."""
+    from src.translator_api import batch_engine
+
+    monkeypatch.setattr(batch_engine, "_BATCH_ENGINE", batch_engine.BatchEngine(max_workers=2, executor="thread"))
+
+
+def _new_job(store: BatchJobStore):
+    return store.create("MTBatch_20251030.dat", io.BytesIO(SAMPLE_BATCH.read_bytes()), True, 2)
+
+
+def test_job_runs_to_completion(tmp_path: Path):
+    manager = BatchJobManager(BatchJobStore(tmp_path), commit_every=2)
+    job = _new_job(manager.store)
+    manager.run(job.id)
+
+    job = manager.store.get(job.id)
+    assert job.status == "completed"
+    assert (job.processed, job.succeeded, job.failed) == (3, 3, 0)
+    assert job.summary["batches"][0]["trailer"]["TotalMessages"] == "3"
+    assert [item["index"] for item in manager.store.results(job.id)] == [1, 2, 3]
+    assert [item["index"] for item in manager.store.results(job.id, offset=1, limit=1)] == [2]
+
+
+def test_restarted_job_resumes_after_committed_results(tmp_path: Path):
+    store = BatchJobStore(tmp_path)
+    job = _new_job(store)
+    store.set_status(job.id, "running")
+    store.append_results(job.id, 0, [(0, "MTBatch_20251030.dat", {"index": 1, "status": "ok", "marker": "kept"})])
+
+    manager = BatchJobManager(BatchJobStore(tmp_path))
+    assert [pending.id for pending in manager.store.unfinished()] == [job.id]
+    # A running job is only picked up again after a restart re-queues it.
+    manager.run(job.id)
+    assert manager.store.get(job.id).status == "running"
+    assert manager.store.requeue_running() == 1
+    manager.run(job.id)
+
+    results = manager.store.results(job.id)
+    assert results[0]["marker"] == "kept"
+    assert [item["index"] for item in results] == [1, 2, 3]
+    assert manager.store.get(job.id).status == "completed"
+
+
+def test_failed_run_is_retried_then_marked_failed(tmp_path: Path, monkeypatch):
+    def crash(*_args, **_kwargs):
+        raise RuntimeError("worker pool broke")
+
+    monkeypatch.setattr(batch_jobs, "iter_upload_results", crash)
+    manager = BatchJobManager(BatchJobStore(tmp_path), max_attempts=2, retry_backoff=0.01)
+    job = _new_job(manager.store)
+    manager.start()
+    try:
+        manager._queue.put(job.id)
+        deadline = time.monotonic() + 10
+        while manager.store.get(job.id).status != "failed" and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        manager.stop()
+    job = manager.store.get(job.id)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.error == "Gave up after 2 attempt(s): worker pool broke"
+
+
+def test_job_left_running_past_max_attempts_fails_on_restart(tmp_path: Path):
+    store = BatchJobStore(tmp_path)
+    job = _new_job(store)
+    assert store.start_attempt(job.id, max_attempts=1) == 1
+    manager = BatchJobManager(BatchJobStore(tmp_path), max_attempts=1)
+    manager.store.requeue_running()
+    manager.run(job.id)
+    job = manager.store.get(job.id)
+    assert (job.status, job.error) == ("failed", "Gave up after 1 attempt(s)")
+
+
+def test_job_runs_once_with_several_runners(tmp_path: Path, monkeypatch):
+    _use_thread_engine(monkeypatch)
+    manager = BatchJobManager(BatchJobStore(tmp_path), runners=2)
+    try:
+        job = manager.submit("MTBatch_20251030.dat", io.BytesIO(SAMPLE_BATCH.read_bytes()), True, 2)
+        deadline = time.monotonic() + 30
+        while manager.store.get(job.id).status != "completed" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        # Give a second runner holding a duplicate queue entry time to act.
+        time.sleep(0.2)
+    finally:
+        manager.stop()
+    job = manager.store.get(job.id)
+    assert job.status == "completed"
+    assert (job.processed, job.succeeded, job.attempts) == (3, 3, 1)
+    assert [item["index"] for item in manager.store.results(job.id)] == [1, 2, 3]
+
+
+def test_submit_rejected_when_jobs_disabled(tmp_path: Path, monkeypatch):
+    manager = BatchJobManager(BatchJobStore(tmp_path), enabled=False)
+    monkeypatch.setattr(batch_jobs, "_JOB_MANAGER", manager)
+    client = TestClient(app)
+    response = client.post(
+        "/translate/batch/jobs",
+        files={"file": ("MTBatch_20251030.dat", SAMPLE_BATCH.read_bytes(), "application/octet-stream")},
+    )
+    assert response.status_code == 503
+    manager.start()
+    assert manager._threads == []
+    assert manager.store.unfinished() == []
+
+
+def test_job_api_round_trip(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(batch_jobs, "_JOB_MANAGER", BatchJobManager(BatchJobStore(tmp_path)))
+    client = TestClient(app)
+    response = client.post(
+        "/translate/batch/jobs",
+        files={"file": ("MTBatch_20251030.dat", SAMPLE_BATCH.read_bytes(), "application/octet-stream")},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.monotonic() + 30
+    while True:
+        status = client.get(f"/translate/batch/jobs/{job_id}").json()
+        if status["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert status["status"] == "completed"
+    assert status["progress"]["processed"] == 3
+
+    page = client.get(f"/translate/batch/jobs/{job_id}/results", params={"limit": 2}).json()
+    assert [item["index"] for item in page["items"]] == [1, 2]
+    assert page["next_offset"] == 2
+    last = client.get(f"/translate/batch/jobs/{job_id}/results", params={"offset": 2}).json()
+    assert last["next_offset"] is None
+
+    streamed = client.get(f"/translate/batch/jobs/{job_id}/results", params={"responseFileFormat": "ndjson"})
+    assert len(streamed.text.splitlines()) == 3
+    assert client.get("/translate/batch/jobs/unknown").status_code == 404
+
+    rejected = client.post("/translate/batch/jobs", files={"file": ("notes.pdf", b"x", "application/pdf")})
+    assert rejected.status_code == 400
+    batch_jobs._JOB_MANAGER.stop()
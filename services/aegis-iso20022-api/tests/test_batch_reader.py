@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+import pytest
+
+from src.translator_api.batch import BatchParseError, BatchStream, iter_batch_payload
+
+BATCH = "HDR|BatchID=B1|MsgCount=2\n\n{1:A}{4:\n:20:ONE\n-}\n$\n\n{1:B}{4:\n:20:TWO\n-}\n\nTRL|TotalMessages=2\n"
+
+
+def test_messages_are_yielded_lazily():
+    consumed = []
+
+    def lines():
+        for line in BATCH.splitlines():
+            consumed.append(line)
+            yield line
+
+    batch = BatchStream("b.dat", lines())
+    assert batch.header == {"BatchID": "B1", "MsgCount": "2"}
+    assert consumed == ["HDR|BatchID=B1|MsgCount=2"]
+
+    first = next(batch.messages)
+    assert (first.index, first.mt_raw) == (1, "{1:A}{4:\n:20:ONE\n-}")
+    assert "TRL|TotalMessages=2" not in consumed
+    assert batch.trailer == {}
+
+    rest = list(batch.messages)
+    assert [m.mt_raw for m in rest] == ["{1:B}{4:\n:20:TWO\n-}"]
+    assert batch.trailer == {"TotalMessages": "2"}
+    assert batch.message_count == 2
+
+
+def test_trailer_is_validated_at_the_end():
+    batch = BatchStream("b.dat", "HDR|A=1\nMSG\n$\nNOT-A-TRAILER".splitlines())
+    with pytest.raises(BatchParseError, match="TRL"):
+        list(batch.messages)
+
+
+def test_zip_members_are_streamed():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("in/one.dat", BATCH)
+        zf.writestr("in/readme.md", "ignored")
+        zf.writestr("in/two.txt", BATCH.replace("\n", "\r\n"))
+    buffer.seek(0)
+
+    seen = []
+    for batch in iter_batch_payload("upload.zip", buffer):
+        seen.append((batch.source_name, [m.mt_raw for m in batch.messages], batch.trailer))
+    assert [name for name, _messages, _trailer in seen] == ["one.dat", "two.txt"]
+    assert seen[0][1:] == seen[1][1:]
+
+
+def test_empty_upload_is_rejected():
+    with pytest.raises(BatchParseError, match="empty"):
+        next(iter_batch_payload("batch.dat", io.BytesIO(b"")))
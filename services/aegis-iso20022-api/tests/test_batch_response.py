@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+
+from src.translator_api.batch import BatchParseError, BatchStream
+from src.translator_api.batch_response import iter_ndjson_stream, iter_zip_stream
+
+
+def _events(fail: bool = False):
+    batch = BatchStream("b.dat", ["HDR|BatchID=1", "MSG1", "$", "MSG2", "TRL|TotalMessages=2"])
+    for message in batch.messages:
+        yield batch, {"index": message.index, "status": "ok", "mx_type": "pacs.008.001.13", "xml": f"<x>{message.index}</x>"}
+        if fail:
+            raise BatchParseError("b.dat: expected header, messages, and trailer lines")
+
+
+def test_zip_stream_yields_an_entry_per_result():
+    chunks = list(iter_zip_stream(_events()))
+    assert len(chunks) == 3
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+        assert zf.namelist() == ["b.dat/record-001_pacs.008.001.13.xml", "b.dat/record-002_pacs.008.001.13.xml", "summary.json"]
+        summary = json.loads(zf.read("summary.json"))
+    assert summary["batches"][0]["trailer"] == {"TotalMessages": "2"}
+    assert summary["summary"]["succeeded"] == 2
+
+
+def test_mid_stream_parse_error_is_reported_in_band():
+    with zipfile.ZipFile(io.BytesIO(b"".join(iter_zip_stream(_events(fail=True))))) as zf:
+        assert zf.namelist()[-2:] == ["error.json", "summary.json"]
+        assert json.loads(zf.read("error.json"))["status_code"] == 400
+
+    lines = [json.loads(line) for line in b"".join(iter_ndjson_stream(_events(fail=True))).splitlines()]
+    assert [line["type"] for line in lines] == ["result", "error", "summary"]
@@ -87,3 +87,38 @@ def test_translate_batch_rejects_unsupported_type():
     assert response.status_code == 400
     detail = response.json()["detail"]
     assert "Unsupported file type" in detail
+
+
+@pytest.mark.skipif(not SAMPLE_BATCH.exists(), reason="sample batch file missing")
+def test_translate_batch_streamed_zip_writes_summary_last():
+    client = TestClient(app)
+    response = client.post(
+        "/translate/batch",
+        files={"file": ("MTBatch_20251030.dat", SAMPLE_BATCH.read_bytes(), "application/octet-stream")},
+        params={"stream": "true"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        names = zf.namelist()
+        assert names[-1] == "summary.json"
+        assert len([name for name in names if name.endswith(".xml")]) == 3
+        summary = json.loads(zf.read("summary.json"))
+        assert summary["summary"]["succeeded"] == 3
+        assert summary["batches"][0]["trailer"]["TotalMessages"] == "3"
+
+
+@pytest.mark.skipif(not SAMPLE_BATCH.exists(), reason="sample batch file missing")
+def test_translate_batch_ndjson_stream():
+    client = TestClient(app)
+    response = client.post(
+        "/translate/batch",
+        files={"file": ("MTBatch_20251030.dat", SAMPLE_BATCH.read_bytes(), "application/octet-stream")},
+        params={"responseFileFormat": "ndjson"},
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["result", "result", "result", "summary"]
+    assert [line["index"] for line in lines[:3]] == [1, 2, 3]
+    assert lines[-1]["summary"]["total_messages"] == 3
@@ -47,3 +47,60 @@ def test_kafka_audit_emitter(monkeypatch):
     header_keys = [k for (k, _v) in headers]
     assert "event_id" in header_keys
     assert "schema_version" in header_keys
+
+
+class FlakyProducer(DummyProducer):
+    """Raises like a producer whose buffer stays full until ``up`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.up = False
+
+    def send(self, topic, value=None, key=None, headers=None):
+        from kafka.errors import KafkaTimeoutError
+
+        if not self.up:
+            raise KafkaTimeoutError("buffer full")
+        super().send(topic, value=value, key=key, headers=headers)
+        return _DoneFuture()
+
+    def flush(self, timeout=None):
+        pass
+
+
+class _DoneFuture:
+    def add_errback(self, *_args):
+        return self
+
+    def get(self, timeout=None):
+        return None
+
+
+def test_kafka_emitter_spills_and_replays_in_order(monkeypatch, tmp_path):
+    from audit_emitter.spill_log import SpillLog
+
+    producer = FlakyProducer()
+    monkeypatch.setattr("audit_emitter.kafka.KafkaProducer", lambda **_: producer)
+    spill = SpillLog(str(tmp_path / "spill"), segment_bytes=600, fsync_every=2)
+    emitter = KafkaAuditEmitter(bootstrap_servers="localhost:9092", spill_log=spill, replay_interval=3600)
+
+    events = [AuditEvent(tenant_id="TEN123", route=f"/r/{n}").ensure_event_id() for n in range(6)]
+    for event in events[:4]:
+        emitter.emit(event)
+    assert producer.sent == [] and spill.pending()
+    with pytest.raises(Exception):
+        emitter.replay_spilled()
+
+    producer.up = True
+    emitter.emit(events[4])  # still queued behind the backlog
+    while emitter.replay_spilled():
+        pass
+    assert not spill.pending()
+    emitter.emit(events[5])
+    assert [value["event_id"] for _topic, value, _key, _headers in producer.sent] == [e.event_id for e in events]
+    assert len(list((tmp_path / "spill").glob("segment-*"))) == 1
+
+    # A restarted emitter resumes from the committed cursor: nothing is replayed twice.
+    emitter.close()
+    reopened = SpillLog(str(tmp_path / "spill"))
+    assert not reopened.pending()
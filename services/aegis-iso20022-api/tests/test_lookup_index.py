@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.prevalidator_core.lookups import LookupStore, get_lookup_index
+from src.prevalidator_core.rules import mt196_rjcr_pdcr_reason_codes
+
+LOOKUPS = """
+charsets:
+  X:
+    allowed_chars_literal: >
+      ABC 0123 / ‘ [SPACE]
+lookups:
+  reason_codes:
+    AC04: "Closed account"
+    AGNT: "Agent decision"
+  countries:
+    "NO": "Norway"
+"""
+
+
+def _touch(path: Path, text: str, bump: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def test_index_exposes_frozen_codes_matchers_and_charsets(tmp_path):
+    path = tmp_path / "lookups.yaml"
+    path.write_text(LOOKUPS, encoding="utf-8")
+    index = LookupStore(path).index
+    assert index.codes_for("reason_codes") == frozenset({"AC04", "AGNT"})
+    assert index.codes_for("countries") == frozenset({"NO"})
+    assert index.codes_for("missing") == frozenset()
+    assert index.find_code("reason_codes", "/RJCR/AGNT") == "AGNT"
+    assert index.find_code("reason_codes", "/RJCR/AGNTX") is None
+    assert dict(index.charsets)["X"] == "ABC0123/' "
+
+
+def test_reload_swaps_index_and_keeps_previous_on_error(tmp_path):
+    path = tmp_path / "lookups.yaml"
+    path.write_text(LOOKUPS, encoding="utf-8")
+    store = LookupStore(path)
+    first = store.index
+    assert not store.reload_if_changed()
+
+    _touch(path, LOOKUPS.replace("AGNT", "CUST"), 1_000_000)
+    assert store.reload_if_changed()
+    assert store.index is not first
+    assert store.index.codes_for("reason_codes") == frozenset({"AC04", "CUST"})
+    assert first.codes_for("reason_codes") == frozenset({"AC04", "AGNT"})
+
+    current = store.index
+    _touch(path, "lookups: [unbalanced", 2_000_000)
+    assert not store.reload_if_changed()
+    assert store.index is current
+
+
+def test_reason_code_rule_reads_nested_lookups():
+    assert "AGNT" in get_lookup_index().codes_for("mt196_reason_codes")
+    assert mt196_rjcr_pdcr_reason_codes("/RJCR/AGNT") is None
+    assert mt196_rjcr_pdcr_reason_codes("/RJCR/") == "Reason code required when RJCR or PDCR is reported"
+    assert mt196_rjcr_pdcr_reason_codes("/CNCL/") is None
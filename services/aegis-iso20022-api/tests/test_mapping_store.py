@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.translator_core.mapping_store import MappingStore
+
+
+def _write_store(root: Path, mapping: dict) -> Path:
+    (root / "iso-bootstrap").mkdir()
+    (root / "mappings").mkdir()
+    (root / "iso-bootstrap" / "pairs.yaml").write_text(
+        """pairs:
+- mt_code: MT103
+  target_version: pacs.008.001.13
+  out_json: mappings/mt103.json
+- mt_code: MT195
+  target_version: camt.026.001.10
+  out_json: mappings/missing.json
+  variant: unable_to_apply
+""",
+        encoding="utf-8",
+    )
+    mapping_path = root / "mappings" / "mt103.json"
+    mapping_path.write_text(json.dumps(mapping), encoding="utf-8")
+    return mapping_path
+
+
+def _bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_profiles_are_preloaded(tmp_path: Path):
+    mapping_path = _write_store(tmp_path, {"blocks": []})
+    store = MappingStore(service_root=tmp_path)
+    mapping_path.unlink()
+
+    mapping, mx_type, _xsd_dir = store.load_profile("MT103")
+    assert mapping == {"blocks": []}
+    assert mx_type == "pacs.008.001.13"
+    assert store.load_profile("MT999") == (None, None, None)
+
+
+def test_missing_mapping_raises_on_lookup(tmp_path: Path):
+    _write_store(tmp_path, {"blocks": []})
+    store = MappingStore(service_root=tmp_path)
+    with pytest.raises(FileNotFoundError):
+        store.load_profile("MT195", variant="unable_to_apply")
+
+
+def test_reload_if_changed_swaps_snapshot(tmp_path: Path):
+    mapping_path = _write_store(tmp_path, {"blocks": []})
+    store = MappingStore(service_root=tmp_path)
+    assert store.reload_if_changed() is False
+
+    mapping_path.write_text(json.dumps({"blocks": [{"mappings": []}]}), encoding="utf-8")
+    _bump_mtime(mapping_path)
+    assert store.reload_if_changed() is True
+
+    mapping, _mx_type, _xsd_dir = store.load_profile("MT103")
+    assert mapping == {"blocks": [{"mappings": []}]}
+
+
+def test_failed_reload_keeps_previous_snapshot(tmp_path: Path):
+    _write_store(tmp_path, {"blocks": []})
+    store = MappingStore(service_root=tmp_path)
+    pairs_yaml = tmp_path / "iso-bootstrap" / "pairs.yaml"
+    pairs_yaml.write_text("pairs: [", encoding="utf-8")
+    _bump_mtime(pairs_yaml)
+
+    assert store.reload_if_changed() is False
+    mapping, _mx_type, _xsd_dir = store.load_profile("MT103")
+    assert mapping == {"blocks": []}
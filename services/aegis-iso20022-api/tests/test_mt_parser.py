@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from src.prevalidator_core import PrevalidationEngine
+from src.translator_core.detector import Detector
+from src.translator_core.mt_parser import MTParser
+from src.translator_core.parsed_message import ParsedMessage
+
+RAW = (
+    "{1:F01BANKDEFFXXXX0000000000}{2:I940BANKUS33XXXXN}{4:\n"
+    ":20:STMT1\n"
+    ":61:2510301030C10,00NTRFREF1\n"
+    ":86:/EREF/E2E1\n"
+    "-\n"
+    ":61:2510301030C20,00NTRFREF2\n"
+    ":62F:C251030EUR30,00\n"
+    "-}"
+)
+
+
+def test_tokens_are_offsets_into_raw():
+    parsed = MTParser().parse("MT940", RAW)
+    assert [tag for tag, _start, _end in parsed["tokens"]] == ["20", "61", "86", "61", "62F"]
+    assert parsed["order"] == ["20", "61", "86", "61", "62F"]
+    start, end = parsed["fields"].spans("86")[0]
+    assert RAW[start:end].strip().startswith("/EREF/E2E1")
+
+
+def test_fields_are_cleaned_on_access():
+    fields = MTParser().parse("MT940", RAW)["fields"]
+    assert fields["61"] == ["2510301030C10,00NTRFREF1", "2510301030C20,00NTRFREF2"]
+    assert fields["86"] == ["/EREF/E2E1"]
+    assert fields["62F"] == ["C251030EUR30,00"]
+    assert fields.get("32A") is None
+    assert "20" in fields and len(fields) == 4
+
+
+def test_blocks_and_missing_block4_fallback():
+    parsed = MTParser().parse("MT940", RAW)
+    assert parsed["blocks"]["2"] == "I940BANKUS33XXXXN"
+    bare = MTParser().parse("MT103", ":20:REF\n:23B:CRED")
+    assert dict(bare["fields"]) == {"20": ["REF"], "23B": ["CRED"]}
+
+
+def test_detector_reuses_parse_result():
+    parsed = MTParser().parse("", RAW)
+    assert Detector().detect(RAW, parsed=parsed) == Detector().detect(RAW)
+
+
+def test_parsed_message_detects_once_and_caches_text():
+    message = ParsedMessage.from_raw(RAW)
+    assert message.mt_type == "MT940"
+    assert message.field_text("86") == "/EREF/E2E1"
+    assert message.field_text("86") is message.field_text("86")
+    assert message.field_text("72") == ""
+    assert message.block_text("2") == "I940BANKUS33XXXXN"
+    assert ParsedMessage.from_raw(RAW, force_type="MT950").mt_type == "MT950"
+
+
+def test_prevalidation_reuses_parsed_message(monkeypatch):
+    message = ParsedMessage.from_raw(RAW, force_type="MT103")
+    monkeypatch.setattr(ParsedMessage, "from_raw", classmethod(lambda cls, *a, **k: pytest.fail("re-parsed")))
+    result = PrevalidationEngine().validate(RAW, parsed=message)
+    assert result.mt_type == "MT103"
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from lxml import etree
+
+from src.translator_core.mx_builder import MXBuilder
+
+NS = "urn:iso:std:iso:20022:tech:xsd:camt.053.001.08"
+STMT = "/Document/BkToCstmrStmt/Stmt"
+
+
+def _build(flat: dict) -> etree._Element:
+    return etree.fromstring(MXBuilder().build("camt.053.001.08", flat).encode())
+
+
+def test_repeated_values_become_siblings():
+    doc = _build({f"{STMT}/Ntry/AddtlNtryInf": ["first", "second"], f"{STMT}/Ntry/Amt": ["1.00"]})
+    ntry = doc.find(f"{{{NS}}}BkToCstmrStmt/{{{NS}}}Stmt/{{{NS}}}Ntry")
+    assert [child.text for child in ntry] == ["first", "second", "1.00"]
+
+
+def test_indexed_occurrences_share_prefixes():
+    doc = _build(
+        {
+            f"{STMT}/Ntry[2]/Amt": ["2.00"],
+            f"{STMT}/Ntry/Amt": ["1.00"],
+            f"{STMT}/Ntry[1]/Amt/@Ccy": ["EUR"],
+            f"{STMT}/Ntry[2]/Amt/@Ccy": ["USD"],
+        }
+    )
+    amounts = doc.findall(f".//{{{NS}}}Ntry/{{{NS}}}Amt")
+    assert [(amt.text, amt.get("Ccy")) for amt in amounts] == [("1.00", "EUR"), ("2.00", "USD")]
+    assert len(doc.findall(f".//{{{NS}}}Stmt")) == 1
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.prevalidator_core import PrevalidationEngine
+from src.prevalidator_core.network_rules import compile_network_rules
+
+MT103_HEADER = "{1:F01AAAAUS33XXXX0000000000}{2:I103BBBBNZ2XXXXN}"
+
+
+def _mt103(*lines: str, header: str = MT103_HEADER) -> str:
+    body = "\n".join([":20:REF1", ":32A:250921USD100,00", ":50K:/123\nJOHN", ":59:/456\nJANE", ":71A:SHA", *lines])
+    return f"{header}{{4:\n{body}\n-}}"
+
+
+def _codes(raw: str) -> list:
+    result = PrevalidationEngine().validate(raw)
+    return [(e.field, e.code) for e in result.errors]
+
+
+def test_mt103_rules_compile_without_skips_and_share_subexpressions():
+    engine = PrevalidationEngine()
+    plan = engine.get_network_plan("MT103")
+    assert plan.skipped == ()
+    assert {check.rule_id for check in plan.checks} == {f"C{n}" for n in range(1, 19)}
+    # "23B in SPRI/SSTD/SPAY" guards C4-C8, C11 and C12 but is one slot.
+    assert len({check.guard for check in plan.checks if check.rule_id in ("C4", "C6", "C8", "C12")}) == 1
+    assert engine.get_network_plan("MT103") is plan
+    assert engine.get_network_plan("MT192").checks == ()
+
+
+def test_currency_and_switch_rules():
+    assert _codes(_mt103(":23B:CRED")) == []
+    assert _codes(_mt103(":23B:CRED", ":33B:EUR90,00")) == [("36", "D75")]
+    assert _codes(_mt103(":23B:CRED", ":33B:USD100,00", ":36:1,0")) == [("36", "D75")]
+    assert _codes(_mt103(":23B:SPRI", ":23E:PHOB", ":23E:CHQB")) == [("23E", "E01"), ("59a", "E18")]
+    assert _codes(_mt103(":23B:SSTD", ":23E:SDVA", ":57A:BANKDEFF")) == [("23E", "E02")]
+
+
+def test_option_and_presence_rules():
+    assert _codes(_mt103(":23B:CRED", ":55A:BANKDEFF")) == [("53a", "E06"), ("54a", "E06")]
+    assert _codes(_mt103(":23B:SPRI", ":53D:NAME", ":56A:BANKDEFF", ":57A:BANKGB22")) == [("53a", "E03"), ("56a", "E16")]
+    assert _codes(_mt103(":23B:SSTD", ":56C:123", ":57A:BANKDEFF")) == [("56a", "E17")]
+    assert _codes(_mt103(":23B:SSTD", ":56C://SC123456", ":57A:BANKDEFF")) == []
+
+
+def test_bic_country_rule_reads_headers():
+    european = "{1:F01AAAADEFFXXXX0000000000}{2:I103BBBBFRPPXXXXN}"
+    assert _codes(_mt103(":23B:CRED", header=european)) == [("33B", "D49")]
+    assert _codes(_mt103(":23B:CRED", ":33B:USD100,00", header=european)) == []
+
+
+def test_unsupported_rule_shapes_are_reported_not_guessed():
+    plan = compile_network_rules(
+        [
+            {"id": "C1", "sequence": "B", "conditions": {"field_36": "present"}},
+            {"id": "C2", "exclusivity": {"fields": ["21R", "21F"]}},
+            {"id": "C3", "error_code": "X", "conditions": {"field_20": "present"}, "enforcement": {"field_21": "mandatory"}},
+        ]
+    )
+    assert [rule_id for rule_id, _reason in plan.skipped] == ["C1", "C2"]
+    assert [e.code for e in plan.validate({"20": ["A"]})] == ["X"]
+    assert plan.validate({"20": ["A"], "21": ["B"]}) == []
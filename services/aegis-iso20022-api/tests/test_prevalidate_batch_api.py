@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+for path in (ROOT, ROOT / "src", CURRENT):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from category1_samples import CATEGORY1_SAMPLES  # noqa: E402
+from src.prevalidator_core import PrevalidationEngine  # noqa: E402
+from src.translator_api.routes import app  # noqa: E402  pylint: disable=wrong-import-position
+
+MT103 = CATEGORY1_SAMPLES["MT103"]["mt_raw"]
+BROKEN_MT103 = MT103.replace(":23B:CRED", ":23B:SPRI\n:23E:CHQB")
+
+
+def _ndjson(*entries: dict) -> bytes:
+    return "\n".join(json.dumps(entry) for entry in entries).encode("utf-8")
+
+
+def test_validate_many_matches_validate_per_message():
+    engine = PrevalidationEngine()
+    items = [(sample["mt_raw"], sample.get("force_type")) for sample in CATEGORY1_SAMPLES.values()]
+    items += [(BROKEN_MT103, None), (MT103.replace(":20:REF123456\n", ""), None), ("garbage", None), (MT103, "MT999")]
+    expected = [engine.validate(raw, force_type=force_type).to_dict() for raw, force_type in items]
+    assert [result.to_dict() for result in engine.validate_many(items)] == expected
+
+
+def test_batch_columnar_response_from_ndjson():
+    client = TestClient(app)
+    body = _ndjson({"mt_raw": MT103}, {"mt_raw": BROKEN_MT103}, {"mt_raw": MT103, "force_type": "MT999"})
+    response = client.post("/prevalidate/batch", content=body, headers={"content-type": "application/x-ndjson"}, params={"chunk_size": 2})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["sources"] == ["request"]
+    assert payload["mt_types"] == ["MT103", "MT999"]
+    assert payload["messages"] == {"source": [0, 0, 0], "index": [1, 2, 3], "mt_type": [0, 0, 1], "valid": [True, False, False], "error_count": [0, 2, 1]}
+    assert payload["errors"]["row"] == [1, 1, 2]
+    assert payload["errors"]["code"] == ["E01", "E18", None]
+    assert payload["summary"] == {"total": 3, "valid": 1, "invalid": 2, "by_type": {"MT103": {"valid": 1, "invalid": 1}, "MT999": {"valid": 0, "invalid": 1}}}
+
+
+def test_batch_streams_ndjson_from_batch_file():
+    client = TestClient(app)
+    data = f"HDR|ID=1\n{MT103}\n$\n{BROKEN_MT103}\nTRL|COUNT=2\n".encode("utf-8")
+    response = client.post("/prevalidate/batch", files={"file": ("batch.dat", data)}, params={"responseFileFormat": "ndjson"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["type"], line.get("index"), line.get("valid")) for line in lines] == [("result", 1, True), ("result", 2, False), ("summary", None, 1)]
+    assert lines[-1] == {"type": "summary", "total": 2, "valid": 1, "invalid": 1}
+
+
+def test_batch_rejects_bad_input():
+    client = TestClient(app)
+    assert client.post("/prevalidate/batch", content=b"").status_code == 400
+    assert client.post("/prevalidate/batch", content=b'{"mt_raw": ""}').status_code == 400
+    assert client.post("/prevalidate/batch", content=b"[]").status_code == 400
+    assert client.post("/prevalidate/batch", content=_ndjson({"mt_raw": MT103, "force_type": 5})).status_code == 400
+    assert client.post("/prevalidate/batch", files={"file": ("batch.csv", b"x")}).status_code == 400
+    assert client.post("/prevalidate/batch", content=_ndjson({"mt_raw": MT103}), params={"chunk_size": 0}).status_code == 400
+
+
+def test_ndjson_stream_keeps_results_before_a_bad_line():
+    client = TestClient(app)
+    body = _ndjson({"mt_raw": MT103}, {"mt_raw": BROKEN_MT103}) + b"\n{not json\n" + _ndjson({"mt_raw": MT103})
+    response = client.post("/prevalidate/batch", content=body, params={"responseFileFormat": "ndjson"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["type"], line.get("index")) for line in lines] == [("result", 1), ("result", 2), ("error", None), ("summary", None)]
+    assert lines[2]["detail"].startswith("Line 3")
+    assert lines[-1] == {"type": "summary", "total": 2, "valid": 1, "invalid": 1}
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.prevalidator_core import PrevalidationEngine
+from src.prevalidator_core.plan import compile_definitions
+
+DEFINITIONS = [
+    {"tag": "20", "presence": "mandatory", "validations": [{"rule": "no_leading_or_trailing_slash_or_double_slash", "error_code": "T26"}]},
+    {"tag": "59a", "presence": "mandatory", "validations": [{"rule": "payee_account_must_not_be_present", "error_code": "E10"}]},
+    {"tag": "70", "presence": "optional", "validations": [{"rule": "not_implemented_yet", "error_code": "X"}]},
+    {"tag": "21", "presence": "mandatory"},
+]
+
+
+def test_plan_resolves_option_letters_and_drops_unknown_rules():
+    plan = compile_definitions(DEFINITIONS)
+    assert [check.tag for check in plan.checks] == ["20", "59a", "21"]
+
+    # Presence errors come first; the exact 59A key wins over the 59F option scan.
+    errors = plan.validate({"20": ["/REF"], "59F": ["/123\nNAME"], "59A": ["BANKDEFF"]})
+    assert [(e.field, e.code, e.occurrence) for e in errors] == [("21", "PRESENCE", None), ("20", "T26", 1)]
+
+    errors = plan.validate({"20": ["REF"], "21": ["X"], "59F": ["/123\nNAME"], "59K": ["ACME"]})
+    assert [(e.field, e.code, e.occurrence) for e in errors] == [("59a", "E10", 1)]
+
+
+def test_engine_reuses_plan_per_type():
+    engine = PrevalidationEngine()
+    assert engine.get_plan("MT103") is engine.get_plan("MT103")
+    assert engine.get_plan("MT103") is not engine.get_plan("MT101")
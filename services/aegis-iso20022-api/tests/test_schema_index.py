@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.translator_core import schema_index
+from src.translator_core.schema_index import SchemaIndex, index_path_for
+from src.translator_core.xsd_validator import _resolve_schema_path
+
+NS = "urn:iso:std:iso:20022:tech:xsd:{}"
+
+
+def _write_schema(directory: Path, filename: str, mx_type: str) -> Path:
+    path = directory / filename
+    path.write_text(
+        f'<?xml version="1.0"?><xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" '
+        f'targetNamespace="{NS.format(mx_type)}"><xs:element name="Document" type="xs:string"/></xs:schema>',
+        encoding="utf-8",
+    )
+    return path
+
+
+def _bump_mtime(directory: Path) -> None:
+    stat = directory.stat()
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_lookup_by_namespace_is_persisted_next_to_directory(tmp_path: Path, monkeypatch):
+    xsd_dir = tmp_path / "xsd"
+    xsd_dir.mkdir()
+    _write_schema(xsd_dir, "pacs008.xsd", "pacs.008.001.13")
+    (xsd_dir / "broken.xsd").write_text("<not xml", encoding="utf-8")
+
+    index = SchemaIndex()
+    assert index.lookup(xsd_dir, NS.format("pacs.008.001.13")) == xsd_dir / "pacs008.xsd"
+    assert index.lookup(xsd_dir, NS.format("camt.053.001.08")) is None
+    assert index.builds == 1
+    assert index_path_for(xsd_dir).exists()
+    assert sorted(p.name for p in xsd_dir.iterdir()) == ["broken.xsd", "pacs008.xsd"]
+
+    # A fresh process reuses the on-disk index without reading any XSD.
+    monkeypatch.setattr(schema_index, "read_target_namespace", lambda path: (_ for _ in ()).throw(AssertionError))
+    fresh = SchemaIndex()
+    assert fresh.lookup(xsd_dir, NS.format("pacs.008.001.13")) == xsd_dir / "pacs008.xsd"
+    assert fresh.builds == 0
+
+
+def test_directory_change_rebuilds_index(tmp_path: Path):
+    index = SchemaIndex()
+    _write_schema(tmp_path, "a.xsd", "pacs.008.001.13")
+    assert index.lookup(tmp_path, NS.format("camt.053.001.08")) is None
+    _write_schema(tmp_path, "statement.xsd", "camt.053.001.08")
+    _bump_mtime(tmp_path)
+    assert index.lookup(tmp_path, NS.format("camt.053.001.08")) == tmp_path / "statement.xsd"
+    assert index.builds == 2
+
+
+def test_resolve_schema_path_prefers_exact_filename(tmp_path: Path):
+    _write_schema(tmp_path, "camt.053.001.08.xsd", "camt.053.001.08")
+    _write_schema(tmp_path, "payments.xsd", "pacs.008.001.13")
+    assert _resolve_schema_path(str(tmp_path), "camt.053.001.08") == tmp_path / "camt.053.001.08.xsd"
+    assert _resolve_schema_path(str(tmp_path), "pacs.008.001.13") == tmp_path / "payments.xsd"
+    assert _resolve_schema_path(str(tmp_path / "missing"), "pacs.008.001.13") is None
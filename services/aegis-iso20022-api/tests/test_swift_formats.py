@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+CURRENT = Path(__file__).resolve().parent
+ROOT = CURRENT.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.prevalidator_core import PrevalidationEngine
+from src.prevalidator_core.formats import compile_format
+from src.prevalidator_core.plan import compile_definitions
+from src.prevalidator_core.rules import value_must_use_x_charset
+
+
+def test_formats_check_length_charset_and_structure():
+    assert compile_format("16x") is compile_format("16x")
+    assert compile_format("16x")("REF-123/A") is None
+    assert compile_format("16x")("R" * 17) == "Value does not match format 16x"
+    assert compile_format("16x")("REF_1") == "Character '_' not allowed in X charset"
+    assert compile_format("6!n3!a15d")("250921USD12345,67") is None
+    assert compile_format("6!n3!a15d")("250921USD12345") is not None
+    assert compile_format("4!a2!a2!c[3!c]")("BANKDEFFXXX") is None
+    assert compile_format("4!a2!a2!c[3!c]")("BANKDEFFXX") is not None
+    assert compile_format("4!c[/30x]")("PHOB/+49 69 1234") is None
+
+
+def test_multiline_formats():
+    party = compile_format("[/34x] 4*35x")
+    assert party("JOHN DOE\nNEW YORK") is None
+    assert party("/123456\nJOHN DOE\r\nNEW YORK") is None
+    assert party("/123456\n" + "\n".join(["LINE"] * 5)) is not None
+    assert compile_format("35x 4*(1!n/33x)")("/DE123\n1/JOHN\n2/MAIN STREET") is None
+    assert compile_format("35x 4*(1!n/33x)")("/DE123\nJOHN") is not None
+    assert compile_format("3!n 6!n [4!n6!n]")("103\n250921") is None
+    assert compile_format("not a format") is None
+
+
+def test_plan_checks_option_formats_only_when_enabled():
+    definitions = [
+        {"tag": "20", "presence": "mandatory", "format": "16x"},
+        {"tag": "53a", "presence": "optional", "option_A": {"format": "[/1!a][/34x] 4!a2!a2!c[3!c]"}, "option_B": {"format": "[/1!a][/34x] 35x"}},
+    ]
+    fields = {"20": ["REF1"], "53A": ["/D/123\nBANKDEFF"], "53B": ["/123\nTOO LONG LOCATION " + "X" * 30]}
+    assert compile_definitions(definitions).validate(fields) == []
+    errors = compile_definitions(definitions, check_formats=True).validate(fields)
+    assert [(e.field, e.code, e.occurrence) for e in errors] == [("53a", "FORMAT", 1)]
+
+
+def test_engine_reads_format_flag(monkeypatch):
+    monkeypatch.setenv("PREVALIDATE_FORMAT_CHECKS", "true")
+    assert PrevalidationEngine().check_formats
+    monkeypatch.delenv("PREVALIDATE_FORMAT_CHECKS")
+    assert not PrevalidationEngine().check_formats
+
+
+def test_x_charset_rule_uses_lookups_charset():
+    assert value_must_use_x_charset("ABC/123 (A).'+?:-,\nDEF") is None
+    assert value_must_use_x_charset("ABC@DEF") == "Character '@' not allowed in X charset"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import re
+
+from src.translator_core import transformer
+from src.translator_core.transformer import (
+    TRANSFORMS,
+    Transformer,
+    compile_mapping,
+    get_mapping_plan,
+    register_transform,
+    run_transform,
+)
+
+MAPPING = {
+    "meta": {"mx_root": "FIToFICstmrCdtTrf"},
+    "defaults": {"GrpHdr/NbOfTxs": {"value": "1"}},
+    "blocks": [
+        {
+            "target_root": "CdtTrfTxInf",
+            "mappings": [
+                {
+                    "source": "32A",
+                    "target": "IntrBkSttlmAmt",
+                    "transform": [
+                        {"fn": "regex_extract", "args": {"pattern": "^(\\d{6})([A-Z]{3})(.+)$", "group": 3}},
+                        {"fn": "to_decimal"},
+                    ],
+                },
+                {
+                    "source": "32A",
+                    "target": "IntrBkSttlmAmt/@Ccy",
+                    "transform": {"fn": "regex_extract", "args": {"pattern": "^(\\d{6})([A-Z]{3})(.+)$", "group": 2}},
+                },
+                {
+                    "source": "59",
+                    "target": "CdtrAcct/Id/IBAN",
+                    "transform": [
+                        {"fn": "regex_extract", "args": {"pattern": "^/([^\\n]+)", "group": 1}},
+                        {"fn": "iban_normalize"},
+                    ],
+                    "on_fail": "CdtrAcct/Id/Othr/Id",
+                },
+                {
+                    "switch": [
+                        {"if": {"exists": "57A"}, "mappings": [{"source": "57A", "target": "CdtrAgt/FinInstnId/BICFI"}]},
+                    ],
+                    "default": [{"target": "CdtrAgt/FinInstnId/Othr/Id", "value": "NOTPROVIDED"}],
+                },
+            ],
+        }
+    ],
+    "validations": [{"path": "CdtTrfTxInf/IntrBkSttlmAmt", "required": True}],
+}
+
+ROOT = "/Document/FIToFICstmrCdtTrf"
+
+
+def test_plan_resolves_absolute_paths_and_attributes():
+    parsed = {"fields": {"32A": ["250921USD12345,67"], "59": ["/123\nJOHN DOE"], "57A": ["BANKUS33XXX"]}}
+    flat, audit = Transformer().apply(MAPPING, parsed)
+    assert flat[f"{ROOT}/GrpHdr/NbOfTxs"] == ["1"]
+    assert flat[f"{ROOT}/CdtTrfTxInf/IntrBkSttlmAmt"] == ["12345.67"]
+    assert flat[f"{ROOT}/CdtTrfTxInf/IntrBkSttlmAmt/@Ccy"] == ["USD"]
+    assert flat[f"{ROOT}/CdtTrfTxInf/CdtrAcct/Id/Othr/Id"] == ["/123\nJOHN DOE"]
+    assert flat[f"{ROOT}/CdtTrfTxInf/CdtrAgt/FinInstnId/BICFI"] == ["BANKUS33XXX"]
+    assert audit["errors"] == []
+
+
+def test_plan_switch_falls_back_to_default():
+    plan = compile_mapping(MAPPING, "FIToFICstmrCdtTrf")
+    flat = plan.execute({"32A": ["250921EUR1,00"]})
+    assert flat[f"{ROOT}/CdtTrfTxInf/CdtrAgt/FinInstnId/Othr/Id"] == ["NOTPROVIDED"]
+
+
+def test_plan_is_cached_per_mapping_object():
+    first = get_mapping_plan(MAPPING, "FIToFICstmrCdtTrf")
+    assert get_mapping_plan(MAPPING, "FIToFICstmrCdtTrf") is first
+    assert get_mapping_plan(dict(MAPPING), "FIToFICstmrCdtTrf") is not first
+
+
+def test_registered_transform_is_dispatched():
+    @register_transform("test_reverse")
+    def _reverse_factory(_args):
+        return lambda val: str(val)[::-1] if val is not None else None
+
+    try:
+        assert run_transform(["test_reverse", "upper"], "abc") == "CBA"
+    finally:
+        TRANSFORMS.pop("test_reverse", None)
+
+
+def test_repeated_regex_extract_is_matched_once_per_message(monkeypatch):
+    searches = []
+
+    class CountingPattern:
+        def __init__(self, pattern):
+            self._regex = re.compile(pattern, flags=re.M | re.S)
+
+        def search(self, text):
+            searches.append(text)
+            return self._regex.search(text)
+
+    patterns = {}
+    monkeypatch.setattr(
+        transformer, "compile_pattern", lambda pattern: patterns.setdefault(pattern, CountingPattern(pattern))
+    )
+    plan = compile_mapping(MAPPING, "FIToFICstmrCdtTrf")
+    plan.execute({"32A": ["250921USD12345,67"]})
+    plan.execute({"32A": ["250921USD12345,67"]})
+    assert searches == ["250921USD12345,67", "250921USD12345,67"]
+
+
+def test_mapping_overrides_default_and_lines_repeat():
+    mapping = {
+        "meta": {"mx_root": "FIToFICstmrCdtTrf"},
+        "defaults": {"GrpHdr/MsgId": {"value": "$now"}},
+        "blocks": [
+            {
+                "mappings": [
+                    {"source": "20", "target": "GrpHdr/MsgId"},
+                    {"source": "59", "target": "CdtTrfTxInf/Cdtr/PstlAdr/AdrLine", "transform": "lines"},
+                ]
+            }
+        ],
+    }
+    flat = compile_mapping(mapping, "FIToFICstmrCdtTrf").execute({"20": ["REF1"], "59": ["1 MAIN ST\nLONDON"]})
+    assert flat[f"{ROOT}/GrpHdr/MsgId"] == ["REF1"]
+    assert flat[f"{ROOT}/CdtTrfTxInf/Cdtr/PstlAdr/AdrLine"] == ["1 MAIN ST", "LONDON"]
@@ -6,6 +6,7 @@ from pathlib import Path
 import pytest
 
 from src.translator_core import xsd_validator
+from src.translator_core.schema_cache import SchemaCache, get_schema_cache
 from src.translator_core.xsd_validator import XSDValidator, xmlschema  # type: ignore
 
 
@@ -59,36 +60,189 @@ def test_request_xmlschema_without_dependency(monkeypatch):
     monkeypatch.delenv("XSD_VALIDATOR_BACKEND", raising=False)
 
 
-def test_remote_backend(monkeypatch, tmp_path: Path):
+class _FakeValidatorService:
+    """In-process stand-in for the aegis-xsd-validator sidecar."""
+
+    def __init__(self, registry: bool = True, batch: bool = True):
+        self.registry = registry
+        self.batch = batch
+        self.schemas: set = set()
+        self.requests: list = []
+
+    def __call__(self, request):
+        import hashlib
+        import re as _re
+
+        import httpx
+
+        body = request.read()
+        self.requests.append((request.method, request.url.path, body))
+        if request.url.path == "/schemas":
+            if not self.registry:
+                return httpx.Response(404, json={"detail": "Not Found"})
+            xsd = _re.search(rb'name="xsd"; filename="[^"]*"\r\n[^\r]*\r\n\r\n(.*?)\r\n--', body, _re.S).group(1)
+            schema_id = hashlib.sha256(xsd).hexdigest()
+            self.schemas.add(schema_id)
+            return httpx.Response(200, json={"schema_id": schema_id})
+        match = _re.search(rb'name="schema_id"\r\n\r\n([0-9a-f]+)', body)
+        if match and match.group(1).decode() not in self.schemas:
+            return httpx.Response(404, json={"detail": f"Unknown schema_id {match.group(1).decode()}"})
+        if not match:
+            assert b'name="xsd"' in body
+        documents = body.count(b'name="xml"')
+        if request.url.path == "/validate/batch":
+            if not self.batch:
+                return httpx.Response(404, json={"detail": "Not Found"})
+            return httpx.Response(200, json={"results": [{"ok": True, "errors": []}] * documents})
+        assert documents == 1
+        return httpx.Response(200, json={"ok": True, "errors": []})
+
+
+@pytest.fixture
+def remote_service(monkeypatch):
     if xsd_validator.httpx is None:
         pytest.skip("httpx not available")
+    import httpx
 
+    service = _FakeValidatorService()
+    monkeypatch.setenv("XSD_VALIDATOR_BACKEND", "remote")
+    monkeypatch.setenv("XSD_VALIDATOR_ENDPOINT", "http://validator.local/validate")
+    xsd_validator.close_remote_client()
+    monkeypatch.setattr(xsd_validator, "_REMOTE_CLIENT", httpx.Client(transport=httpx.MockTransport(service)))
+    yield service
+    xsd_validator.close_remote_client()
+
+
+def test_remote_backend_registers_schema_once(remote_service, tmp_path: Path):
+    (tmp_path / "sample.xsd").write_text(
+        '<?xml version="1.0"?><xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"></xs:schema>', encoding="utf-8"
+    )
+    for _ in range(2):
+        validator = XSDValidator(str(tmp_path), "sample")
+        assert validator.validate("<Document><Value>1</Value></Document>") == (True, [])
+    assert [(method, path) for method, path, _ in remote_service.requests] == [
+        ("PUT", "/schemas"),
+        ("POST", "/validate"),
+        ("POST", "/validate"),
+    ]
+    assert all(b'name="xsd"' not in body for method, _, body in remote_service.requests if method == "POST")
+
+    # A restarted service has forgotten the schema: register again and retry once.
+    remote_service.schemas.clear()
+    assert validator.validate("<Document/>") == (True, [])
+    assert [path for _, path, _ in remote_service.requests[3:]] == ["/validate", "/schemas", "/validate"]
+
+
+def test_remote_backend_validates_documents_in_one_call(remote_service, tmp_path: Path):
+    from src.translator_core.mx_builder import MXBuilder
+
+    _write_statement_schema(tmp_path)
+    validator = XSDValidator(str(tmp_path), "camt.053.001.08")
+    documents = [MXBuilder().build_document("camt.053.001.08", {"/Document/Amt": [str(n)]}) for n in range(5)]
+    assert validator.validate_documents(documents) == [(True, [])] * 5
+    assert [path for _, path, _ in remote_service.requests] == ["/schemas", "/validate/batch"]
+
+
+def test_remote_backend_falls_back_for_older_services(remote_service, tmp_path: Path):
+    from src.translator_core.mx_builder import MXBuilder
+
+    remote_service.registry = False
+    remote_service.batch = False
+    _write_statement_schema(tmp_path)
+    validator = XSDValidator(str(tmp_path), "camt.053.001.08")
+    documents = [MXBuilder().build_document("camt.053.001.08", {"/Document/Amt": [str(n)]}) for n in range(2)]
+    assert validator.validate_documents(documents) == [(True, [])] * 2
+    assert [path for _, path, _ in remote_service.requests] == ["/schemas", "/validate/batch", "/validate", "/validate"]
+
+
+def test_schema_cache_reuses_compiled_schema(tmp_path: Path):
     _write_sample_schema(tmp_path)
+    cache = get_schema_cache()
+    before = cache.stats()
+    first = XSDValidator(str(tmp_path), "sample")
+    second = XSDValidator(str(tmp_path), "sample")
+    after = cache.stats()
+    assert first.backend.schema is second.backend.schema
+    assert after.misses == before.misses + 1
+    assert after.hits == before.hits + 1
 
-    class DummyResponse:
-        def __init__(self, payload):
-            self.status_code = 200
-            self._payload = payload
-            self.text = ""
 
-        def json(self):
-            return self._payload
+def test_schema_cache_recompiles_when_schema_changes(tmp_path: Path):
+    _write_sample_schema(tmp_path)
+    schema_file = tmp_path / "sample.xsd"
+    first = XSDValidator(str(tmp_path), "sample")
+    stat = schema_file.stat()
+    os.utime(schema_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = XSDValidator(str(tmp_path), "sample")
+    assert first.backend.schema is not second.backend.schema
+
+
+def test_schema_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = SchemaCache(max_size=1)
+    for name in ("a", "b"):
+        directory = tmp_path / name
+        directory.mkdir()
+        _write_sample_schema(directory)
+        cache.get_or_compile("test", directory / "sample.xsd", lambda path: object())
+    stats = cache.stats()
+    assert stats.size == 1
+    assert stats.evictions == 1
+    assert stats.compile_count == 2
+
+
+def test_warm_schema_cache_counts_loaded_schemas_past_remote_targets(monkeypatch, tmp_path: Path):
+    _write_sample_schema(tmp_path)
+    monkeypatch.setenv("XSD_VALIDATOR_ENDPOINT", "http://xsd-validator/validate")
+    select = xsd_validator._select_backend
+    monkeypatch.setattr(
+        xsd_validator,
+        "_select_backend",
+        lambda name, mx_type: xsd_validator.RemoteBackend(mx_type) if mx_type == "remote" else select("lxml", mx_type),
+    )
+    monkeypatch.setattr(xsd_validator, "_resolve_schema_path", lambda xsd_dir, mx_type: tmp_path / "sample.xsd")
+    targets = [(str(tmp_path), "sample"), (str(tmp_path), "remote"), (str(tmp_path), "sample")]
+    assert xsd_validator.warm_schema_cache(targets) == 2
 
-    def fake_post(url, data=None, files=None, timeout=None):  # pylint: disable=unused-argument
-        assert "engine" in data
-        assert "mx_type" in data
-        assert "xml" in files
-        return DummyResponse({"ok": True, "errors": []})
 
-    monkeypatch.setenv("XSD_VALIDATOR_BACKEND", "remote")
-    monkeypatch.setenv("XSD_VALIDATOR_ENDPOINT", "http://validator.local/validate")
-    monkeypatch.setattr(xsd_validator.httpx, "post", fake_post)
+def test_warm_schema_cache_skips_schemas_that_fail_to_compile(monkeypatch, tmp_path: Path, caplog):
+    _write_sample_schema(tmp_path)
+    broken = tmp_path / "broken.xsd"
+    broken.write_text("<xs:schema", encoding="utf-8")
+    monkeypatch.setenv("XSD_VALIDATOR_BACKEND", "lxml")
+    monkeypatch.setattr(xsd_validator, "_resolve_schema_path", lambda xsd_dir, mx_type: tmp_path / f"{mx_type}.xsd")
+    with caplog.at_level("WARNING", logger=xsd_validator.__name__):
+        assert xsd_validator.warm_schema_cache([(str(tmp_path), "sample"), (str(tmp_path), "broken")]) == 1
+    assert "XSD warm-up failed for broken" in caplog.text
 
-    try:
-        validator = XSDValidator(str(tmp_path), "sample")
-        ok, errors = validator.validate("<Document><Value>1</Value></Document>")
-        assert ok is True
-        assert errors == []
-    finally:
-        monkeypatch.delenv("XSD_VALIDATOR_BACKEND", raising=False)
-        monkeypatch.delenv("XSD_VALIDATOR_ENDPOINT", raising=False)
+
+def _write_statement_schema(directory: Path) -> None:
+    (directory / "camt.053.001.08.xsd").write_text(
+        """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="urn:iso:std:iso:20022:tech:xsd:camt.053.001.08"
+           elementFormDefault="qualified">
+  <xs:element name="Document">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Amt" type="xs:decimal" maxOccurs="unbounded"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+""",
+        encoding="utf-8",
+    )
+
+
+@pytest.mark.parametrize("backend", ["lxml", "auto"])
+def test_validate_document_matches_text_validation(monkeypatch, tmp_path: Path, backend: str):
+    from src.translator_core.mx_builder import MXBuilder
+
+    _write_statement_schema(tmp_path)
+    monkeypatch.setenv("XSD_VALIDATOR_BACKEND", backend)
+    validator = XSDValidator(str(tmp_path), "camt.053.001.08")
+    for amounts in (["1.00", "2.00"], ["1.00", "abc"]):
+        flat = {"/Document/Amt": amounts}
+        document = MXBuilder().build_document("camt.053.001.08", flat)
+        assert validator.validate_document(document) == validator.validate(MXBuilder().build("camt.053.001.08", flat))
+    assert validator.validate_document(MXBuilder().build_document("camt.053.001.08", {"/Document/Amt": ["1"]}))[0]
@@ -1,13 +1,50 @@
 from __future__ import annotations
 
-from typing import Optional
+import io
+import os
+import time
+from typing import List, Optional
+from xml.etree import ElementTree
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
 
 import xmlschema
 import logging
+
+from .schema_registry import LatencyStats, SchemaRegistry
+from .validation_pool import PoolSaturated, ValidationPool
+
 app = FastAPI(title="Aegis XSD Validation Service")
 
+XMLSCHEMA_ENGINES = {"xmlschema", "xmlschema11"}
+SAXON_ENGINES = {"saxon-sim", "saxon"}
+
+schema_registry = SchemaRegistry(
+    lambda xsd_bytes: xmlschema.XMLSchema11(xsd_bytes),
+    max_size=int(os.getenv("XSD_SCHEMA_CACHE_SIZE", "32")),
+)
+latency = LatencyStats()
+validation_pool = ValidationPool(
+    workers=int(os.getenv("VALIDATION_WORKERS", str(os.cpu_count() or 1))),
+    max_queue=int(os.getenv("VALIDATION_QUEUE_SIZE", "64")),
+    retry_after=int(os.getenv("VALIDATION_RETRY_AFTER", "1")),
+)
+
+
+@app.exception_handler(PoolSaturated)
+async def shed_load(_request: Request, exc: PoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.on_event("shutdown")
+def shutdown_validation_pool():
+    validation_pool.shutdown()
+
 
 def _read_upload(upload: Optional[UploadFile]) -> Optional[bytes]:
     if upload is None:
@@ -17,14 +54,41 @@ def _read_upload(upload: Optional[UploadFile]) -> Optional[bytes]:
     return content
 
 
-def _validate_xmlschema(xsd_bytes: bytes, xml_bytes: bytes) -> dict:
-    schema = xmlschema.XMLSchema11(xsd_bytes)
+def _register(xsd_bytes: bytes, mx_type: str = ""):
+    try:
+        return schema_registry.register(xsd_bytes, mx_type)
+    except xmlschema.XMLSchemaException as exc:  # type: ignore[attr-defined]
+        raise HTTPException(status_code=400, detail=f"Invalid XSD: {exc}") from exc
+
+
+def _resolve_schema(schema_id: str, xsd_bytes: Optional[bytes], mx_type: str):
+    """Return ``(schema_id, compiled schema)`` from a registered id or inline XSD bytes."""
+    if schema_id:
+        entry = schema_registry.get(schema_id)
+        if entry is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Unknown schema_id {schema_id}; register the XSD with PUT /schemas",
+            )
+        return schema_id, entry.schema
+    if xsd_bytes is None:
+        raise HTTPException(status_code=400, detail="XSD file or schema_id is required for xmlschema engine")
+    schema_id, entry, _cached = _register(xsd_bytes, mx_type)
+    return schema_id, entry.schema
+
+
+def _validate_xmlschema(schema, xml_bytes: bytes) -> dict:
+    if not xml_bytes.strip():
+        return {"engine": "xmlschema", "ok": False, "errors": ["XML document is empty"]}
     try:
-        schema.validate(xml_bytes)
+        # A file object, so xmlschema never takes the payload for a path or URL.
+        schema.validate(io.BytesIO(xml_bytes))
         return {"engine": "xmlschema", "ok": True, "errors": []}
     except xmlschema.XMLSchemaValidationError as exc:  # type: ignore[attr-defined]
         logging.warning("XML Schema validation failed: %s", exc)
         return {"engine": "xmlschema", "ok": False, "errors": ["XML schema validation failed"]}
+    except (xmlschema.XMLResourceError, ElementTree.ParseError) as exc:  # type: ignore[attr-defined]
+        return {"engine": "xmlschema", "ok": False, "errors": [f"XML document is not well-formed: {exc}"]}
 
 
 def _validate_saxon_sim(xml_bytes: bytes) -> dict:
@@ -44,30 +108,107 @@ def _validate_saxon_sim(xml_bytes: bytes) -> dict:
     return {"engine": "saxon-sim", "ok": True, "errors": []}
 
 
-@app.post("/validate")
-async def validate(
-    engine: str = Form(...),
-    mx_type: str = Form(""),
-    xsd: UploadFile | None = File(None),
-    xml: UploadFile = File(...),
-):
+def _register_upload(xsd: UploadFile, mx_type: str) -> dict:
+    xsd_bytes = _read_upload(xsd)
+    if not xsd_bytes:
+        raise HTTPException(status_code=400, detail="XSD payload is required")
+    schema_id, entry, cached = _register(xsd_bytes, mx_type)
+    return {
+        "schema_id": schema_id,
+        "mx_type": entry.mx_type or mx_type,
+        "cached": cached,
+        "compile_ms": round(entry.compile_ms, 3),
+    }
+
+
+def _validate_upload(engine: str, mx_type: str, schema_id: str, xsd: Optional[UploadFile], xml: UploadFile) -> dict:
     xsd_bytes = _read_upload(xsd)
     xml_bytes = _read_upload(xml)
     if xml_bytes is None:
         raise HTTPException(status_code=400, detail="XML payload is required")
 
     engine_normalized = engine.lower()
+    started = time.perf_counter()
 
-    if engine_normalized in {"xmlschema", "xmlschema11"}:
-        if xsd_bytes is None:
-            raise HTTPException(status_code=400, detail="XSD file is required for xmlschema engine")
-        result = _validate_xmlschema(xsd_bytes, xml_bytes)
+    if engine_normalized in XMLSCHEMA_ENGINES:
+        schema_id, schema = _resolve_schema(schema_id, xsd_bytes, mx_type)
+        result = _validate_xmlschema(schema, xml_bytes)
         result["mx_type"] = mx_type
+        result["schema_id"] = schema_id
+        latency.record("validate", (time.perf_counter() - started) * 1000.0)
         return result
 
-    if engine_normalized in {"saxon-sim", "saxon"}:
+    if engine_normalized in SAXON_ENGINES:
         result = _validate_saxon_sim(xml_bytes)
         result["mx_type"] = mx_type
+        latency.record("validate", (time.perf_counter() - started) * 1000.0)
         return result
 
     raise HTTPException(status_code=400, detail=f"Unsupported validation engine '{engine}'")
+
+
+def _validate_uploads(
+    engine: str, mx_type: str, schema_id: str, xsd: Optional[UploadFile], xml: List[UploadFile]
+) -> dict:
+    xsd_bytes = _read_upload(xsd)
+    documents = [_read_upload(upload) or b"" for upload in xml]
+
+    engine_normalized = engine.lower()
+    started = time.perf_counter()
+
+    if engine_normalized in XMLSCHEMA_ENGINES:
+        schema_id, schema = _resolve_schema(schema_id, xsd_bytes, mx_type)
+        results = [_validate_xmlschema(schema, xml_bytes) for xml_bytes in documents]
+    elif engine_normalized in SAXON_ENGINES:
+        results = [_validate_saxon_sim(xml_bytes) for xml_bytes in documents]
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported validation engine '{engine}'")
+
+    latency.record("validate_batch", (time.perf_counter() - started) * 1000.0, documents=len(documents))
+    return {
+        "engine": results[0]["engine"] if results else engine_normalized,
+        "mx_type": mx_type,
+        "schema_id": schema_id or None,
+        "results": [{"ok": result["ok"], "errors": result["errors"]} for result in results],
+    }
+
+
+@app.put("/schemas")
+async def register_schema(
+    xsd: UploadFile = File(...),
+    mx_type: str = Form(""),
+):
+    """Compile and cache a schema; later requests reference it by the returned ``schema_id``."""
+    return await validation_pool.run(_register_upload, xsd, mx_type)
+
+
+@app.post("/validate")
+async def validate(
+    engine: str = Form(...),
+    mx_type: str = Form(""),
+    schema_id: str = Form(""),
+    xsd: UploadFile | None = File(None),
+    xml: UploadFile = File(...),
+):
+    return await validation_pool.run(_validate_upload, engine, mx_type, schema_id, xsd, xml)
+
+
+@app.post("/validate/batch")
+async def validate_batch(
+    engine: str = Form(...),
+    mx_type: str = Form(""),
+    schema_id: str = Form(""),
+    xsd: UploadFile | None = File(None),
+    xml: List[UploadFile] = File(...),
+):
+    """Validate many XML payloads against one schema; ``results`` keeps the upload order."""
+    return await validation_pool.run(_validate_uploads, engine, mx_type, schema_id, xsd, xml)
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "schema_cache": schema_registry.stats(),
+        "latency": latency.snapshot(),
+        "pool": validation_pool.stats(),
+    }
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def schema_id_for(xsd_bytes: bytes) -> str:
+    """Schemas are addressed by the SHA-256 of their bytes."""
+    return hashlib.sha256(xsd_bytes).hexdigest()
+
+
+@dataclass
+class SchemaEntry:
+    schema: Any
+    mx_type: str
+    size: int
+    compile_ms: float
+    registered_at: float
+
+
+class SchemaRegistry:
+    """
+    Thread-safe, bounded LRU of compiled schemas keyed by schema id.
+
+    Compilation runs outside the registry lock, at most once per schema id at a
+    time, so a large ISO 20022 XSD being compiled does not block lookups of
+    schemas that are already cached.
+    """
+
+    def __init__(self, compile_fn: Callable[[bytes], Any], max_size: int = 32) -> None:
+        self.compile_fn = compile_fn
+        self.max_size = max(1, int(max_size))
+        self._entries: "OrderedDict[str, SchemaEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compile_count = 0
+        self.compile_ms_total = 0.0
+
+    def get(self, schema_id: str) -> Optional[SchemaEntry]:
+        with self._lock:
+            entry = self._entries.get(schema_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(schema_id)
+            self.hits += 1
+            return entry
+
+    def register(self, xsd_bytes: bytes, mx_type: str = "") -> Tuple[str, SchemaEntry, bool]:
+        """Compile and cache ``xsd_bytes`` unless already cached; returns ``(schema_id, entry, cached)``."""
+        schema_id = schema_id_for(xsd_bytes)
+        entry = self.get(schema_id)
+        if entry is not None:
+            return schema_id, entry, True
+        with self._lock:
+            key_lock = self._key_locks.setdefault(schema_id, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(schema_id)
+            if entry is not None:
+                return schema_id, entry, True
+            started = time.perf_counter()
+            schema = self.compile_fn(xsd_bytes)
+            compile_ms = (time.perf_counter() - started) * 1000.0
+            entry = SchemaEntry(schema, mx_type, len(xsd_bytes), compile_ms, time.time())
+            with self._lock:
+                self._entries[schema_id] = entry
+                self._entries.move_to_end(schema_id)
+                self.compile_count += 1
+                self.compile_ms_total += compile_ms
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                self._key_locks.pop(schema_id, None)
+        return schema_id, entry, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "compile_count": self.compile_count,
+                "compile_ms_total": round(self.compile_ms_total, 3),
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+class LatencyStats:
+    """Per-operation call counts and cumulative/max latency."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict[str, float]] = {}
+
+    def record(self, operation: str, elapsed_ms: float, documents: int = 1) -> None:
+        with self._lock:
+            op = self._ops.setdefault(operation, {"count": 0, "documents": 0, "total_ms": 0.0, "max_ms": 0.0})
+            op["count"] += 1
+            op["documents"] += documents
+            op["total_ms"] += elapsed_ms
+            op["max_ms"] = max(op["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "count": int(op["count"]),
+                    "documents": int(op["documents"]),
+                    "total_ms": round(op["total_ms"], 3),
+                    "avg_ms": round(op["total_ms"] / op["count"], 3) if op["count"] else 0.0,
+                    "max_ms": round(op["max_ms"], 3),
+                }
+                for name, op in self._ops.items()
+            }
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Validation queue is full")
+        self.retry_after = retry_after
+
+
+class ValidationPool:
+    """
+    Runs blocking upload reads, schema compilation and validation off the event
+    loop on a fixed set of worker threads.
+
+    At most ``workers`` calls run at once and at most ``max_queue`` more wait for
+    a worker; anything beyond that is refused immediately with ``PoolSaturated``
+    so callers can shed load instead of piling up requests.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int = 1) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = max(1, retry_after)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="xsd-validate")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated(self.retry_after)
+            self._admitted += 1
+        try:
+            future = self._executor.submit(self._call, fn, args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the work itself ends, not when the awaiting request does:
+        # a client that disconnects cancels this coroutine, but a call that already
+        # started keeps its worker until it finishes.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._admitted - self._in_flight),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src import app as app_module  # noqa: E402
+from src.app import app  # noqa: E402
+from src.validation_pool import PoolSaturated, ValidationPool  # noqa: E402
+
+SCHEMA = b"""<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="Document">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Value" type="xs:string"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+VALID = b"<Document><Value>ok</Value></Document>"
+INVALID = b"<Document><Other/></Document>"
+
+
+def _register(client: TestClient) -> str:
+    response = client.put("/schemas", files={"xsd": ("sample.xsd", SCHEMA)}, data={"mx_type": "sample"})
+    assert response.status_code == 200
+    return response.json()["schema_id"]
+
+
+def _xml_files(*documents: bytes) -> list:
+    return [("xml", (f"doc{n}.xml", document)) for n, document in enumerate(documents)]
+
+
+def test_register_schema_is_cached_by_hash():
+    client = TestClient(app)
+    schema_id = _register(client)
+    again = client.put("/schemas", files={"xsd": ("sample.xsd", SCHEMA)}).json()
+    assert again["schema_id"] == schema_id
+    assert again["cached"] is True
+    assert client.put("/schemas", files={"xsd": ("bad.xsd", b"<xs:schema")}).status_code == 400
+
+
+def test_validate_batch_keeps_upload_order():
+    client = TestClient(app)
+    schema_id = _register(client)
+    response = client.post(
+        "/validate/batch",
+        data={"engine": "xmlschema", "schema_id": schema_id},
+        files=_xml_files(VALID, INVALID, VALID),
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["schema_id"] == schema_id
+    assert [result["ok"] for result in payload["results"]] == [True, False, True]
+
+
+def test_unknown_schema_id_is_404():
+    client = TestClient(app)
+    response = client.post(
+        "/validate/batch", data={"engine": "xmlschema", "schema_id": "0" * 64}, files=_xml_files(VALID)
+    )
+    assert response.status_code == 404
+    assert "Unknown schema_id" in response.json()["detail"]
+
+
+def test_malformed_documents_fail_only_their_own_item():
+    client = TestClient(app)
+    schema_id = _register(client)
+    response = client.post(
+        "/validate/batch",
+        data={"engine": "xmlschema", "schema_id": schema_id},
+        files=_xml_files(VALID, b"not xml", b"", b"<Document>", VALID),
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["ok"] for result in results] == [True, False, False, False, True]
+    assert results[1]["errors"][0].startswith("XML document is not well-formed")
+    assert results[2]["errors"] == ["XML document is empty"]
+
+    single = client.post("/validate", data={"engine": "xmlschema", "schema_id": schema_id}, files=_xml_files(b"not xml"))
+    assert single.status_code == 200
+    assert single.json()["ok"] is False
+
+
+def test_saturated_pool_sheds_load_with_retry_after(monkeypatch):
+    pool = ValidationPool(workers=1, max_queue=0, retry_after=7)
+    monkeypatch.setattr(app_module, "validation_pool", pool)
+    release = threading.Event()
+    real_register = app_module._register_upload
+
+    def blocking_register(xsd, mx_type):
+        release.wait(5)
+        return real_register(xsd, mx_type)
+
+    monkeypatch.setattr(app_module, "_register_upload", blocking_register)
+    first = threading.Thread(target=_register, args=(TestClient(app),))
+    first.start()
+    try:
+        deadline = time.monotonic() + 5
+        while pool.stats()["in_flight"] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        client = TestClient(app)
+        response = client.put("/schemas", files={"xsd": ("sample.xsd", SCHEMA)})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+        stats = client.get("/metrics").json()["pool"]
+        assert (stats["in_flight"], stats["queue_depth"], stats["rejected"]) == (1, 0, 1)
+    finally:
+        release.set()
+        first.join(5)
+    pool.shutdown()
+
+
+def test_cancelled_call_keeps_its_slot_until_the_worker_finishes():
+    pool = ValidationPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker is still busy, so the pool must still count it as admitted.
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        deadline = time.monotonic() + 5
+        while (pool.stats()["in_flight"] or pool.stats()["queue_depth"]) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert await pool.run(lambda: "ok") == "ok"
+
+    asyncio.run(scenario())
+    pool.shutdown()